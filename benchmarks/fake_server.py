@@ -0,0 +1,81 @@
+"""Local HTTP servers for the benchmarks and tests: a quiet keep-alive handler and an OpenAI stand-in."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+
+def chat_completion(content: str) -> dict:
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "fake",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11},
+    }
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    """A keep-alive HTTP/1.1 request handler that does not log its requests."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def reply(self, status: int, body: bytes = b"", headers: dict[str, str] | None = None) -> None:
+        """Send a response with a body, which is left out for HEAD requests."""
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def reply_json(self, status: int, payload: object, headers: dict[str, str] | None = None) -> None:
+        self.reply(status, json.dumps(payload).encode(), {"Content-Type": "application/json", **(headers or {})})
+
+    def read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class FakeOpenAIHandler(QuietHandler):
+    """Answers every chat completion request with a canned response, or an error if `status` is not 200."""
+
+    status = 200
+    content = "ok"
+    delay = 0.0
+
+    def do_POST(self) -> None:
+        self.read_body()
+        time.sleep(self.delay)
+        if self.status == 200:
+            self.reply_json(200, chat_completion(self.content))
+        else:
+            self.reply_json(self.status, {"error": {"message": f"status {self.status}"}})
+
+
+def fake_openai_handler(status: int = 200, content: str = "ok", delay: float = 0.0) -> type[FakeOpenAIHandler]:
+    return type("Handler", (FakeOpenAIHandler,), {"status": status, "content": content, "delay": delay})
+
+
+def start_server(handler: type[BaseHTTPRequestHandler]) -> ThreadingHTTPServer:
+    """Serve the handler on a free local port from a daemon thread."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def server_url(server: ThreadingHTTPServer) -> str:
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def start_fake_server() -> ThreadingHTTPServer:
+    return start_server(FakeOpenAIHandler)
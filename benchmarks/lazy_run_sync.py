@@ -0,0 +1,58 @@
+"""Compare the per-call overhead of sync runs on a fresh event loop vs. the shared background loop.
+
+The model talks to a local OpenAI-compatible server, so the numbers include connection setup:
+a fresh loop per call has to open a new connection every time (plus a TLS handshake against a
+real endpoint), while the background loop keeps its pooled connections warm.
+
+Usage:
+    python benchmarks/lazy_run_sync.py [num_calls]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from concurrent.futures import wait
+
+from agents import OpenAIChatCompletionsModel
+from agents import set_tracing_disabled
+from fake_server import start_fake_server
+
+from agentize.lazy import lazy_run
+from agentize.lazy import lazy_run_sync
+from agentize.lazy import lazy_submit
+from agentize.model import get_openai_client
+
+
+def report(label: str, elapsed: float, num_calls: int) -> None:
+    print(f"{label:<28} {elapsed / num_calls * 1e6:10.1f} us/call")
+
+
+def main() -> None:
+    num_calls = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    set_tracing_disabled(True)
+
+    server = start_fake_server()
+    client = get_openai_client(base_url=f"http://127.0.0.1:{server.server_port}/v1", api_key="fake")
+    model = OpenAIChatCompletionsModel("fake", openai_client=client)
+
+    start = time.perf_counter()
+    for _ in range(num_calls):
+        asyncio.run(lazy_run("hello", model=model))
+    report("fresh loop per call", time.perf_counter() - start, num_calls)
+
+    start = time.perf_counter()
+    for _ in range(num_calls):
+        lazy_run_sync("hello", model=model, background=True)
+    report("background loop", time.perf_counter() - start, num_calls)
+
+    start = time.perf_counter()
+    wait([lazy_submit("hello", model=model) for _ in range(num_calls)])
+    report("background loop (submitted)", time.perf_counter() - start, num_calls)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
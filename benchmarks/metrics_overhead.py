@@ -0,0 +1,76 @@
+"""Measure the per-call overhead of the metrics instrumentation of models and tools.
+
+Both are timed against a no-op, so the numbers are the cost of recording a call and nothing else.
+
+Usage:
+    python benchmarks/metrics_overhead.py [num_calls]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from typing import Any
+
+from agents import Model
+from agents import ModelResponse
+from agents import Usage
+
+from agentize.metrics import InstrumentedModel
+from agentize.metrics import instrument_tool
+
+RESPONSE = ModelResponse(output=[], usage=Usage(requests=1, input_tokens=10, output_tokens=1), response_id=None)
+
+
+class NoopModel(Model):
+    model = "noop"
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        return RESPONSE
+
+    def stream_response(self, *args: Any, **kwargs: Any) -> Any:
+        raise NotImplementedError
+
+
+def noop_tool(query: str) -> str:
+    return query
+
+
+async def time_model(model: Model, num_calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(num_calls):
+        await model.get_response()  # type: ignore[call-arg]
+    return time.perf_counter() - start
+
+
+def time_tool(tool: Any, num_calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(num_calls):
+        tool("query")
+    return time.perf_counter() - start
+
+
+def report(label: str, plain: float, instrumented: float, num_calls: int) -> None:
+    overhead = (instrumented - plain) / num_calls * 1e6
+    print(
+        f"{label:<8} plain {plain / num_calls * 1e6:6.2f} us/call, instrumented {instrumented / num_calls * 1e6:6.2f}"
+        f" us/call, overhead {overhead:5.2f} us/call"
+    )
+
+
+def main() -> None:
+    num_calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    model = NoopModel()
+    plain = asyncio.run(time_model(model, num_calls))
+    instrumented = asyncio.run(time_model(InstrumentedModel(model), num_calls))
+    report("model", plain, instrumented, num_calls)
+
+    plain = time_tool(noop_tool, num_calls)
+    instrumented = time_tool(instrument_tool(noop_tool), num_calls)
+    report("tool", plain, instrumented, num_calls)
+
+
+if __name__ == "__main__":
+    main()
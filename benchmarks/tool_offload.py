@@ -0,0 +1,74 @@
+"""Measure how responsive the event loop stays while blocking tools run concurrently.
+
+A heartbeat task sleeps for a fixed interval and records how late it wakes up, while a batch of
+tool calls that block for a while (like a sync HTTP request) runs with `asyncio.gather`. A tool
+called on the loop stalls every other task; an offloaded tool only costs a thread hop.
+
+Usage:
+    python benchmarks/tool_offload.py [num_calls] [block_ms]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+
+from agentize.offload import offload
+
+INTERVAL = 0.005
+
+
+def blocking_tool(seconds: float) -> str:
+    time.sleep(seconds)
+    return "ok"
+
+
+async def on_loop(seconds: float) -> str:
+    # what an async wrapper around a sync tool does without offloading
+    return blocking_tool(seconds)
+
+
+async def measure(tool: Callable[[float], Awaitable[str]], num_calls: int, seconds: float) -> tuple[float, list[float]]:
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def heartbeat() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(INTERVAL)
+            lags.append(time.perf_counter() - start - INTERVAL)
+
+    task = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(tool(seconds) for _ in range(num_calls)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await task
+    return elapsed, lags
+
+
+def report(label: str, elapsed: float, lags: list[float]) -> None:
+    lags_ms = sorted(lag * 1e3 for lag in lags) or [0.0]
+    p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+    print(
+        f"{label:<16} wall {elapsed * 1e3:8.1f} ms, heartbeats {len(lags):5d},"
+        f" lag median {statistics.median(lags_ms):7.2f} ms, p99 {p99:7.2f} ms, max {lags_ms[-1]:7.2f} ms"
+    )
+
+
+def main() -> None:
+    num_calls = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    seconds = (float(sys.argv[2]) if len(sys.argv) > 2 else 50.0) / 1e3
+
+    report("on loop", *asyncio.run(measure(on_loop, num_calls, seconds)))
+    report("offload", *asyncio.run(measure(offload()(blocking_tool), num_calls, seconds)))
+    report("offload (max 4)", *asyncio.run(measure(offload(max_concurrency=4)(blocking_tool), num_calls, seconds)))
+
+
+if __name__ == "__main__":
+    main()
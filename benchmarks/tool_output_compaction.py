@@ -0,0 +1,106 @@
+"""Measure the tokens saved and the time spent compacting representative tool outputs.
+
+The payloads mimic what the tools return: DuckDuckGo results dumped with `indent=2`, a scraped
+article with navigation, images and inline base64 images, and a TripPlus response with its many
+null and empty fields. Tokens are estimated the same way as the compaction layer does.
+
+Usage:
+    python benchmarks/tool_output_compaction.py [num_calls]
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import random
+import sys
+import time
+
+from agentize.compaction import OutputPolicy
+from agentize.compaction import compact_output
+from agentize.utils import estimate_tokens
+
+WORDS = [
+    "the", "of", "and", "to", "in", "is", "that", "for", "it", "as", "with", "was",
+    "on", "be", "by", "this", "are", "from", "at", "or", "an", "which", "have", "not",
+]  # fmt: skip
+
+
+def sentence(rng: random.Random, length: int = 18) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize() + "."
+
+
+def search_results(rng: random.Random) -> str:
+    results = [
+        {"title": sentence(rng, 8), "href": f"https://example.com/articles/{i}", "body": sentence(rng, 40)}
+        for i in range(10)
+    ]
+    return json.dumps(results, indent=2)
+
+
+def scraped_page(rng: random.Random) -> str:
+    image = base64.b64encode(rng.randbytes(6_000)).decode()
+    navigation = "\n".join(f"* [Section {i}](https://example.com/section/{i})" for i in range(30))
+    paragraphs = "\n\n\n".join(" ".join(sentence(rng) for _ in range(6)) + "   " for _ in range(40))
+    return (
+        f"{navigation}\n\n![logo](https://example.com/logo.png)\n\n# Article\n\n"
+        f"![hero](data:image/png;base64,{image})\n\n<!-- ad slot -->\n\n{paragraphs}\n\n\n\n{navigation}\n"
+    )
+
+
+def award_response(rng: random.Random) -> str:
+    items = [
+        {
+            "origin": "TPE",
+            "destination": "NRT",
+            "type": "ow",
+            "cabin": "c",
+            "bookmark_id": None,
+            "bookmarked": False,
+            "route_stop_desc": [],
+            "tags": [{"type": "info", "text": sentence(rng, 12), "status": None, "description": None}],
+            "resources": {"type": "none", "items": []},
+            "miles": rng.randrange(20_000, 80_000, 500),
+            "miles_desc": "",
+            "program_code": f"P{i % 12}",
+            "program_name": f"Program {i % 12}",
+            "program_link": None,
+            "program_link_desc": None,
+            "program_tel": None,
+            "program_email": None,
+            "program_expiration_desc": None,
+            "operating_program_code": None,
+            "operating_program_name": f"Program {i % 12}",
+            "level": "saver",
+            "systems": [],
+            "routes": [],
+        }
+        for i in range(60)
+    ]
+    return json.dumps({"meta": {"count": len(items), "referral_products": []}, "items": items})
+
+
+def main() -> None:
+    num_calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rng = random.Random(0)
+    payloads = {
+        "search": (search_results(rng), OutputPolicy(max_tokens=2000)),
+        "scrape": (scraped_page(rng), OutputPolicy(max_tokens=8000)),
+        "award": (award_response(rng), OutputPolicy(max_tokens=3000)),
+    }
+
+    for label, (payload, policy) in payloads.items():
+        start = time.perf_counter()
+        for _ in range(num_calls):
+            text = compact_output(payload, policy)
+        elapsed = (time.perf_counter() - start) / num_calls
+
+        before, after = estimate_tokens(payload), estimate_tokens(text)
+        print(
+            f"{label:<8} {before:6d} -> {after:6d} tokens, saved {1 - after / before:6.1%},"
+            f" {elapsed * 1e3:6.2f} ms/call{' (truncated)' if 'tokens omitted]' in text else ''}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ from dotenv import load_dotenv
 from agentize.model import get_openai_model
 from agentize.tools.firecrawl import search
 from agentize.tools.markitdown import markitdown_scrape_tool
+from agentize.tools.markitdown import scrape_many_tool
 from agentize.utils import configure_langfuse
 
 PROMPT = """
@@ -20,7 +21,7 @@ PROMPT = """
 
 你的任務是：
 1. 使用 `search_hwchiu_blog` 根據使用者需求主題搜尋相關文章。
-2. 對搜尋到的每篇文章，自動使用 `markitdown_scrape` 取得 Markdown 原始內容。
+2. 將搜尋到的所有文章網址一次交給 `scrape_many`，取得每篇文章的 Markdown 原始內容。
 3. 從每篇文章內容中萃取摘要、技術重點與建議閱讀對象，幫助使用者快速吸收重點資訊。
 
 # Instructions
@@ -28,7 +29,7 @@ PROMPT = """
 ## 自動化搜尋與摘要流程
 - 當使用者輸入任何技術主題或關鍵字（如 Kubernetes、Golang、BPF 等），你應該立即：
   1. 使用 `search_hwchiu_blog` 搜尋相關文章。
-  2. 對每篇搜尋結果，使用 `markitdown_scrape` 自動抓取其 Markdown 原文。
+  2. 將所有搜尋結果的網址一次交給 `scrape_many`，自動抓取其 Markdown 原文。
   3. 根據內容撰寫摘要與分析。
 - 不需等候使用者點選文章才抓取內容，應主動完成整套流程。
 
@@ -42,13 +43,13 @@ PROMPT = """
 
 ## 工具行為規則
 - `search_hwchiu_blog` 用於根據主題搜尋多篇相關文章。
-- `markitdown_scrape` 用於每篇搜尋結果的網址，不可省略。
+- `scrape_many` 用於一次抓取所有搜尋結果的網址，不可省略；只有單一網址時才使用 `markitdown_scrape`。
 - 若工具失敗或網頁格式異常，應清楚說明原因並給出下一步建議。
 
 # Reasoning Steps / Workflow
 1. **解析技術主題**：明確了解使用者想學習的方向或問題。
 2. **搜尋相關文章**：使用 `search_hwchiu_blog` 搜尋。
-3. **對所有搜尋結果抓文**：對每篇搜尋結果呼叫 `markitdown_scrape`。
+3. **對所有搜尋結果抓文**：以所有搜尋結果的網址呼叫一次 `scrape_many`。
 4. **逐篇產出摘要**：針對每篇文章萃取主題摘要與技術重點。
 5. **彙整回傳資訊**：以列表方式呈現所有摘要，供使用者深入閱讀。
 6. **支援後續延伸查詢**：若使用者想深入某篇或擴展主題，持續支援。
@@ -56,7 +57,7 @@ PROMPT = """
 
 
 @function_tool
-def search_hwchiu_blog(query: str) -> str:
+async def search_hwchiu_blog(query: str) -> str:
     """Use this function to search for blog posts on hwchiu.com.
 
     Every query will be prefixed with "hwchiu.com" to ensure that the search is limited to the blog.
@@ -64,7 +65,7 @@ def search_hwchiu_blog(query: str) -> str:
     Args:
         query (str): The query to search for.
     """
-    return str(search(query=f"hwchiu.com {query}"))
+    return str(await search(query=f"hwchiu.com {query}"))
 
 
 class OpenAIAgent:
@@ -78,7 +79,7 @@ class OpenAIAgent:
                 parallel_tool_calls=True,
             ),
             instructions=PROMPT,
-            tools=[markitdown_scrape_tool, search_hwchiu_blog],
+            tools=[scrape_many_tool, markitdown_scrape_tool, search_hwchiu_blog],
         )
         self.messages: list[TResponseInputItem] = []
 
@@ -4,11 +4,30 @@ from typing import Final
 
 from loguru import logger
 
+from .cache import ResponseCache
+from .compaction import OutputPolicy
+from .compaction import compact_tool
+from .hedging import HedgedModel
+from .hedging import HedgingPolicy
 from .lazy import lazy_run
+from .lazy import lazy_run_many
+from .lazy import lazy_run_stream
 from .lazy import lazy_run_sync
+from .lazy import lazy_submit
+from .metrics import InstrumentedModel
+from .metrics import get_metrics_registry
+from .metrics import instrument_tool
+from .metrics import serve_metrics
+from .model import aclose_openai_clients
 from .model import get_openai_client
 from .model import get_openai_model
 from .model import get_openai_model_settings
+from .offload import offload
+from .pipeline import ResearchPipeline
+from .pipeline import ResearchPrompts
+from .pipeline import ResearchSettings
+from .router import Endpoint
+from .router import RouterModel
 
 LOGURU_LEVEL: Final[str] = os.getenv("LOGURU_LEVEL", "INFO")
 logger.configure(handlers=[{"sink": sys.stderr, "level": LOGURU_LEVEL}])
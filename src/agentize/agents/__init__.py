@@ -1 +1,5 @@
 from .dummy_agent import get_dummy_agent
+from .registry import AgentRegistry
+from .registry import get_agent
+from .registry import get_agent_registry
+from .registry import get_output_schema
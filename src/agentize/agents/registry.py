@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from collections.abc import Sequence
+from functools import cache
+from functools import lru_cache
+from typing import Any
+
+from agents import Agent
+from agents import AgentOutputSchema
+from agents import AgentOutputSchemaBase
+from agents import Model
+from agents import ModelSettings
+from agents import Tool
+
+from ..model import get_openai_model
+
+
+@lru_cache(maxsize=256)
+def get_output_schema(output_type: Any, strict_json_schema: bool = True) -> AgentOutputSchemaBase:
+    """Return the compiled output schema of the type, building its strict JSON schema only once."""
+    return AgentOutputSchema(output_type, strict_json_schema=strict_json_schema)
+
+
+class AgentRegistry:
+    """A bounded LRU of constructed agents.
+
+    Agents are immutable during runs, so the same instance can be shared by every run with the same
+    name, instructions, model, settings, tools and output type. Shared agents also carry a compiled
+    output schema, which saves regenerating the strict JSON schema of the output type on every run.
+
+    Args:
+        maxsize (int): The maximum number of agents kept.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._agents: OrderedDict[Hashable, Agent] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def get(
+        self,
+        name: str,
+        instructions: str | None = None,
+        model: Model | None = None,
+        model_settings: ModelSettings | None = None,
+        tools: Sequence[Tool] = (),
+        output_type: Any = None,
+    ) -> Agent:
+        """Return the agent built from the given template, constructing it on the first call.
+
+        Args:
+            name (str): The name of the agent.
+            instructions (str | None): The instructions for the agent.
+            model (Model | None): The model to use for the agent.
+            model_settings (ModelSettings | None): The settings for the model.
+            tools (Sequence[Tool]): The tools available to the agent.
+            output_type (type[Any] | None): The type of output of the agent.
+        """
+        model = model or get_openai_model()
+        model_settings = model_settings or ModelSettings()
+
+        # models and tools are keyed by identity, the entry keeps them alive so ids are never reused
+        key = (
+            name,
+            instructions,
+            id(model),
+            json.dumps(model_settings.to_json_dict(), sort_keys=True, default=str),
+            tuple(id(tool) for tool in tools),
+            output_type,
+        )
+        with self._lock:
+            agent = self._agents.get(key)
+            if agent is not None:
+                self._agents.move_to_end(key)
+                self.hits += 1
+                return agent
+
+        agent = Agent(
+            name=name,
+            instructions=instructions,
+            model=model,
+            model_settings=model_settings,
+            tools=list(tools),
+            output_type=get_output_schema(output_type) if output_type not in (None, str) else None,
+        )
+        with self._lock:
+            self.misses += 1
+            self._agents[key] = agent
+            while len(self._agents) > self.maxsize:
+                self._agents.popitem(last=False)
+        return agent
+
+    def clear(self) -> None:
+        with self._lock:
+            self._agents.clear()
+
+
+@cache
+def get_agent_registry() -> AgentRegistry:
+    return AgentRegistry()
+
+
+def get_agent(
+    name: str,
+    instructions: str | None = None,
+    model: Model | None = None,
+    model_settings: ModelSettings | None = None,
+    tools: Sequence[Tool] = (),
+    output_type: type[Any] | None = None,
+) -> Agent:
+    """Return a shared agent from the default registry. See `AgentRegistry.get`."""
+    return get_agent_registry().get(
+        name=name,
+        instructions=instructions,
+        model=model,
+        model_settings=model_settings,
+        tools=tools,
+        output_type=output_type,
+    )
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import threading
+from collections.abc import Coroutine
+from concurrent.futures import Future
+from functools import cache
+from typing import Any
+from typing import TypeVar
+
+from loguru import logger
+
+from .model import aclose_openai_clients
+
+T = TypeVar("T")
+
+
+class BackgroundLoop:
+    """A long-lived event loop running in a daemon thread.
+
+    Sync callers submit coroutines from any thread and get `concurrent.futures.Future` objects
+    back. Since the loop outlives every call, pooled connections stay warm between calls instead
+    of being torn down with a fresh loop each time.
+    """
+
+    def __init__(self, name: str = "agentize-loop") -> None:
+        self.name = name
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self.start()
+        assert self._loop is not None
+        return self._loop
+
+    def start(self) -> None:
+        with self._lock:
+            if self.running:
+                return
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._loop = loop
+            self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> Future[T]:
+        """Schedule the coroutine on the background loop and return a future for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """Run the coroutine on the background loop and block until it finishes."""
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("Cannot block on the background loop from its own thread, await the coroutine instead.")
+        return self.submit(coro).result(timeout)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Cancel pending work, close pooled connections and stop the loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or thread is None or not thread.is_alive():
+                return
+
+            future = asyncio.run_coroutine_threadsafe(_drain(), loop)
+            try:
+                future.result(timeout)
+            except Exception as e:
+                logger.warning(f"Failed to shut down the background loop cleanly: {e}")
+
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            if not thread.is_alive():
+                loop.close()
+            self._loop, self._thread = None, None
+
+
+async def _drain() -> None:
+    current = asyncio.current_task()
+    tasks = [task for task in asyncio.all_tasks() if task is not current]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await aclose_openai_clients()
+
+
+@cache
+def get_background_loop() -> BackgroundLoop:
+    """Return the shared background loop, which is shut down at interpreter exit."""
+    background_loop = BackgroundLoop()
+    background_loop.start()
+    atexit.register(background_loop.shutdown)
+    return background_loop
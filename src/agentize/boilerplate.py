@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from collections.abc import Iterable
+from collections.abc import Iterator
+
+_FENCE = re.compile(r"\s{0,3}(```|~~~)")
+_IMAGE = re.compile(r"!\[[^\]\n]*\]\([^)\n]*\)")
+_DATA_URI = re.compile(r"data:[\w/+.-]+;base64,[A-Za-z0-9+/=]*")
+_EMPTY_LINK = re.compile(r"\[\s*\]\([^)\n]*\)")
+_LINK = re.compile(r"\[([^\]\n]*)\]\([^)\n]*\)")
+_SPACES = re.compile(r"(?<=\S)[ \t]{2,}")
+_WORD_CHAR = re.compile(r"\w")
+
+# short lines that are navigation, consent or footer text on any site
+_BOILERPLATE = re.compile(
+    r"\b(?:we|this (?:site|website)) uses? cookies\b"
+    r"|\baccept (?:all )?cookies\b"
+    r"|\bcookie (?:policy|settings|preferences|consent)\b"
+    r"|^\W*skip to (?:main )?content\W*$"
+    r"|\ball rights reserved\b"
+    r"|^\W*(?:copyright\b|©)"
+    r"|\b(?:subscribe to|sign up for) (?:our|the) newsletter\b",
+    re.IGNORECASE,
+)
+MAX_BOILERPLATE_CHARS = 300
+
+
+def strip_images(text: str) -> str:
+    """Remove the images and inline data URIs of markdown, which are noise to a model reading it as text."""
+    return _DATA_URI.sub("", _IMAGE.sub("", text))
+
+
+def _is_link_line(line: str, min_density: float) -> bool:
+    """Whether most of the text of the line is link text, as in menus, tag clouds and related posts."""
+    link_chars = 0
+    for match in _LINK.finditer(line):
+        link_chars += len(_WORD_CHAR.findall(match.group(1))) or 1
+    if not link_chars:
+        return False
+    plain_chars = len(_WORD_CHAR.findall(_LINK.sub("", line)))
+    return link_chars / (link_chars + plain_chars) >= min_density
+
+
+class MarkdownCleaner:
+    """A single pass filter of the boilerplate in markdown converted from web pages, fed one line at a time.
+
+    - images and data URIs are dropped, and runs of spaces inside lines collapsed
+    - runs of `min_link_run` or more lines made mostly of links (navigation, link lists) are dropped
+    - short cookie banner, newsletter and copyright lines are dropped
+    - lines of at least `min_duplicate_chars` characters seen before (repeated headers and footers) are dropped
+    - blank lines are collapsed, and code fences are passed through untouched
+
+    Every line is looked at a bounded number of times, and the seen lines are kept as 8-byte digests,
+    so cleaning runs in linear time over documents of any size.
+
+    Args:
+        min_link_run (int): The minimum number of consecutive link lines dropped as a block.
+        min_link_density (float): The share of the word characters of a line in links to make it a link line.
+        min_duplicate_chars (int): The minimum length of a line to be dropped as a duplicate.
+    """
+
+    def __init__(self, min_link_run: int = 3, min_link_density: float = 0.7, min_duplicate_chars: int = 20) -> None:
+        self.min_link_run = min_link_run
+        self.min_link_density = min_link_density
+        self.min_duplicate_chars = min_duplicate_chars
+        self._in_fence = False
+        self._seen: set[bytes] = set()
+        self._pending: list[str] = []
+        self._pending_links = 0
+        self._blank = True
+
+    def _emit(self, line: str) -> Iterator[str]:
+        if not line:
+            if self._blank:
+                return
+            self._blank = True
+            yield "\n"
+        else:
+            self._blank = False
+            yield line + "\n"
+
+    def _flush(self) -> Iterator[str]:
+        pending, links = self._pending, self._pending_links
+        self._pending, self._pending_links = [], 0
+        if links >= self.min_link_run:
+            yield from self._emit("")
+            return
+        for line in pending:
+            yield from self._emit(line)
+
+    def _is_duplicate(self, line: str) -> bool:
+        if len(line) < self.min_duplicate_chars or line.lstrip().startswith("|"):
+            return False
+        digest = hashlib.blake2b(" ".join(line.split()).casefold().encode(), digest_size=8).digest()
+        if digest in self._seen:
+            return True
+        self._seen.add(digest)
+        return False
+
+    def feed(self, line: str) -> Iterator[str]:
+        """Clean one line and yield the lines it releases, which may be held back to judge a run of links."""
+        line = line.rstrip()
+        if _FENCE.match(line):
+            yield from self._flush()
+            self._in_fence = not self._in_fence
+            yield from self._emit(line)
+            return
+        if self._in_fence:
+            yield line + "\n"
+            return
+
+        if not line:
+            if self._pending:
+                self._pending.append(line)
+            else:
+                yield from self._emit(line)
+            return
+
+        cleaned = _SPACES.sub(" ", _EMPTY_LINK.sub("", strip_images(line))).rstrip()
+        if not cleaned.strip() or (len(cleaned) <= MAX_BOILERPLATE_CHARS and _BOILERPLATE.search(cleaned)):
+            return
+        if _is_link_line(cleaned, self.min_link_density):
+            self._pending.append(cleaned)
+            self._pending_links += 1
+            return
+
+        yield from self._flush()
+        if not self._is_duplicate(cleaned):
+            yield from self._emit(cleaned)
+
+    def close(self) -> Iterator[str]:
+        """Yield the lines still held back at the end of the document."""
+        yield from self._flush()
+
+
+def clean_lines(lines: Iterable[str], cleaner: MarkdownCleaner | None = None) -> Iterator[str]:
+    """Stream markdown lines through a `MarkdownCleaner`."""
+    cleaner = cleaner or MarkdownCleaner()
+    for line in lines:
+        yield from cleaner.feed(line)
+    yield from cleaner.close()
+
+
+def clean_markdown(text: str, cleaner: MarkdownCleaner | None = None) -> str:
+    """Remove the boilerplate of markdown converted from a web page, see `MarkdownCleaner`."""
+    cleaned = "".join(clean_lines(text.splitlines(), cleaner)).rstrip()
+    return cleaned + "\n" if cleaned else ""
@@ -0,0 +1,429 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from functools import cache
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from agents import Model
+from agents import ModelSettings
+from loguru import logger
+from openai import AsyncOpenAI
+from pydantic import TypeAdapter
+
+from .utils import PathLike
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    revalidations: int = 0
+    """Stale entries confirmed unchanged by the origin server (a 304 response)."""
+
+    coalesced: int = 0
+    """Lookups that waited for an identical request already in flight."""
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class MemoryTier:
+    """An in-process LRU of raw cache values with optional expiry."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._items: OrderedDict[str, tuple[float | None, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.time():
+                del self._items[key]
+                return None
+
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, expires_at: float | None = None) -> int:
+        """Store the value and return the number of evicted entries."""
+        with self._lock:
+            self._items[key] = (expires_at, value)
+            self._items.move_to_end(key)
+
+            evicted = 0
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+class DiskTier:
+    """A persistent SQLite store with TTL and size-based (least recently used) eviction."""
+
+    def __init__(self, path: PathLike, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)")
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get(self, key: str) -> tuple[bytes, float | None] | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, size, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+
+            value, size, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_bytes -= size
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return value, expires_at
+
+    def set(self, key: str, value: bytes, expires_at: float | None = None) -> int:
+        """Store the value and return the number of evicted entries."""
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._total_bytes -= row[0]
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), expires_at, time.time()),
+            )
+            self._total_bytes += len(value)
+            return self._evict()
+
+    def _evict(self) -> int:
+        evicted = 0
+
+        now = time.time()
+        count, size = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (now,),
+        ).fetchone()
+        if count:
+            self._conn.execute("DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            self._total_bytes -= size
+            evicted += count
+
+        while self._total_bytes > self.max_bytes:
+            row = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at LIMIT 1").fetchone()
+            if row is None:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            self._total_bytes -= row[1]
+            evicted += 1
+        return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._total_bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """A two-tier cache for agent responses.
+
+    Lookups go to an in-process LRU first and fall back to an optional SQLite file, so repeated
+    calls with the same instructions, input, model and output type are answered without an LLM
+    round trip.
+
+    Args:
+        path (PathLike | None): The SQLite file for the persistent tier. Memory only if None.
+        max_entries (int): The maximum number of entries kept in memory.
+        max_bytes (int): The maximum total size of the values kept on disk.
+        ttl (float | None): The time to live of an entry in seconds. Entries never expire if None.
+    """
+
+    def __init__(
+        self,
+        path: PathLike | None = None,
+        max_entries: int = 1024,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: float | None = 24 * 60 * 60,
+    ) -> None:
+        self.ttl = ttl
+        self.memory = MemoryTier(max_entries=max_entries)
+        self.disk = DiskTier(path, max_bytes=max_bytes) if path is not None else None
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> bytes | None:
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats.memory_hits += 1
+            self.stats.bytes_read += len(value)
+            return value
+
+        if self.disk is not None:
+            item = self.disk.get(key)
+            if item is not None:
+                value, expires_at = item
+                self.stats.disk_hits += 1
+                self.stats.bytes_read += len(value)
+                self.stats.evictions += self.memory.set(key, value, expires_at=expires_at)
+                return value
+
+        self.stats.misses += 1
+        return None
+
+    def set(self, key: str, value: bytes) -> None:
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+
+        self.stats.bytes_written += len(value)
+        self.stats.evictions += self.memory.set(key, value, expires_at=expires_at)
+        if self.disk is not None:
+            self.stats.evictions += self.disk.set(key, value, expires_at=expires_at)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+    def make_key(
+        self,
+        input: str,
+        instructions: str | None,
+        model: Model,
+        model_settings: ModelSettings,
+        output_type: Any,
+    ) -> str | None:
+        """Build the cache key of a lazy run from everything that affects its response.
+
+        Returns None if the model and its endpoint cannot be identified, since such runs must not share
+        cached responses with other models.
+        """
+        identity = _model_identity(model)
+        if identity is None:
+            logger.debug(f"Not caching the runs of {type(model).__name__}, which has no model name")
+            return None
+
+        payload = {
+            "input": input,
+            "instructions": instructions,
+            "model": identity,
+            "model_settings": model_settings.to_json_dict(),
+            "output_schema": _output_schema(output_type) if output_type is not None else None,
+        }
+        data = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def load(self, key: str, output_type: Any) -> Any | None:
+        """Return the cached output rehydrated into the output type, or None on a miss."""
+        value = self.get(key)
+        if value is None:
+            return None
+
+        try:
+            if output_type is None:
+                return json.loads(value)
+            return _type_adapter(output_type).validate_json(value)
+        except ValueError as e:
+            logger.warning(f"Failed to load cached response {key}: {e}")
+            return None
+
+    def save(self, key: str, output: Any, output_type: Any) -> None:
+        if output_type is None:
+            value = json.dumps(output, ensure_ascii=False).encode("utf-8")
+        else:
+            value = _type_adapter(output_type).dump_json(output)
+        self.set(key, value)
+
+
+@dataclass
+class ScrapeEntry:
+    url: str
+    markdown: str
+    etag: str | None = None
+    last_modified: str | None = None
+    fetched_at: float = field(default_factory=time.time)
+
+    def conditional_headers(self) -> dict[str, str]:
+        """The headers that ask the origin server to answer 304 if the document has not changed."""
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ScrapeCache:
+    """A two-tier cache of scraped documents converted to markdown.
+
+    Entries are fresh for a TTL that can be set per domain. Stale entries are kept (until evicted
+    by size) with their ETag and Last-Modified validators, so the scraper can revalidate them with a
+    conditional request and reuse the stored markdown when the server answers 304.
+
+    Args:
+        path (PathLike | None): The SQLite file for the persistent tier. Memory only if None.
+        max_entries (int): The maximum number of entries kept in memory.
+        max_bytes (int): The maximum total size of the entries kept on disk.
+        ttl (float): The seconds an entry is fresh, unless its domain has a TTL of its own.
+        domain_ttls (Mapping[str, float] | None): The TTLs by domain, which also apply to its subdomains.
+    """
+
+    def __init__(
+        self,
+        path: PathLike | None = None,
+        max_entries: int = 256,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: float = 60 * 60,
+        domain_ttls: Mapping[str, float] | None = None,
+    ) -> None:
+        self.ttl = ttl
+        self.domain_ttls = {domain.lower(): value for domain, value in (domain_ttls or {}).items()}
+        self.memory = MemoryTier(max_entries=max_entries)
+        self.disk = DiskTier(path, max_bytes=max_bytes) if path is not None else None
+        self.stats = CacheStats()
+
+    def ttl_for(self, url: str) -> float:
+        host = (urlsplit(url).hostname or "").lower()
+        while host:
+            if host in self.domain_ttls:
+                return self.domain_ttls[host]
+            _, _, host = host.partition(".")
+        return self.ttl
+
+    def is_fresh(self, entry: ScrapeEntry) -> bool:
+        return time.time() - entry.fetched_at < self.ttl_for(entry.url)
+
+    def get(self, url: str, source: str = "markitdown") -> ScrapeEntry | None:
+        """Return the stored entry of the URL, fresh or stale, or None on a miss."""
+        key = f"{source}:{url}"
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats.memory_hits += 1
+        elif self.disk is not None and (item := self.disk.get(key)) is not None:
+            value = item[0]
+            self.stats.disk_hits += 1
+            self.stats.evictions += self.memory.set(key, value)
+        else:
+            self.stats.misses += 1
+            return None
+
+        self.stats.bytes_read += len(value)
+        try:
+            return ScrapeEntry(**json.loads(value))
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Failed to load cached document {url}: {e}")
+            return None
+
+    def set(self, entry: ScrapeEntry, source: str = "markitdown") -> None:
+        key = f"{source}:{entry.url}"
+        value = json.dumps(asdict(entry), ensure_ascii=False).encode("utf-8")
+
+        self.stats.bytes_written += len(value)
+        self.stats.evictions += self.memory.set(key, value)
+        if self.disk is not None:
+            self.stats.evictions += self.disk.set(key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+
+@cache
+def get_scrape_cache() -> ScrapeCache:
+    """Return the shared scrape cache, persisted under AGENTIZE_CACHE_DIR (~/.cache/agentize by default)."""
+    cache_dir = Path(os.getenv("AGENTIZE_CACHE_DIR", "~/.cache/agentize")).expanduser()
+    return ScrapeCache(cache_dir / "scrape.sqlite")
+
+
+def _model_identity(model: Model) -> str | None:
+    """Identify the model name and endpoint answering a run, None if the model has no name.
+
+    Instrumented and hedged models are unwrapped (with the alternate of a hedge), and OpenAI models add
+    the base URL of their client, so one model name served by different endpoints gets different keys.
+    """
+    wrapped = getattr(model, "wrapped", None)
+    if isinstance(wrapped, Model):
+        identities = []
+        for inner in dict.fromkeys([wrapped, getattr(model, "alternate", wrapped)]):
+            identity = _model_identity(inner)
+            if identity is None:
+                return None
+            identities.append(identity)
+        return " | ".join(identities)
+
+    name = getattr(model, "model", None)
+    if not isinstance(name, str):
+        return None
+    client = getattr(model, "_client", None)
+    return f"{name} @ {client.base_url}" if isinstance(client, AsyncOpenAI) else name
+
+
+@cache
+def _type_adapter(output_type: Any) -> TypeAdapter:
+    return TypeAdapter(output_type)
+
+
+@cache
+def _output_schema(output_type: Any) -> str:
+    schema = _type_adapter(output_type).json_schema()
+    return json.dumps(schema, sort_keys=True)
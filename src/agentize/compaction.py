@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from dataclasses import replace
+from typing import Any
+from typing import TypeVar
+
+from loguru import logger
+from pydantic import BaseModel
+
+from .boilerplate import strip_images
+from .metrics import get_metrics_registry
+from .utils import CHARS_PER_TOKEN
+from .utils import estimate_tokens
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_HTML_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+_TRAILING_SPACE = re.compile(r"[ \t]+$", re.MULTILINE)
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+@dataclass(frozen=True)
+class OutputPolicy:
+    """How the output of a tool is compacted before it reaches the model.
+
+    Args:
+        max_tokens (int | None): The maximum number of (estimated) tokens of the output, unlimited if None.
+        minify_json (bool): Serialize JSON without indentation or spaces.
+        drop_empty (bool): Drop null and empty fields of JSON objects and arrays.
+        strip_markdown (bool): Drop images, data URIs and HTML comments of text, and collapse blank lines.
+    """
+
+    max_tokens: int | None = 4000
+    minify_json: bool = True
+    drop_empty: bool = True
+    strip_markdown: bool = True
+
+
+def drop_empty(value: Any) -> Any:
+    """Recursively drop the null, empty string, empty array and empty object members of a JSON value."""
+    if isinstance(value, dict):
+        items = ((key, drop_empty(item)) for key, item in value.items())
+        return {key: item for key, item in items if item not in (None, "", [], {})}
+    if isinstance(value, list):
+        return [item for item in map(drop_empty, value) if item not in (None, "", [], {})]
+    return value
+
+
+def strip_markdown(text: str) -> str:
+    """Drop the parts of markdown a model cannot read (images, data URIs, HTML comments) and extra whitespace."""
+    text = strip_images(text)
+    text = _HTML_COMMENT.sub("", text)
+    text = _TRAILING_SPACE.sub("", text)
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+def truncate(text: str, max_tokens: int) -> str:
+    """Cut the text to at most `max_tokens` tokens, preferably at a line break, ending with a truncation marker."""
+    total = estimate_tokens(text)
+    if total <= max_tokens:
+        return text
+
+    # the marker has a fixed size, so its budget is taken out first
+    budget = max(max_tokens - estimate_tokens(_marker(total, total)), 0)
+    low, high = 0, min(len(text), budget * CHARS_PER_TOKEN)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+
+    kept = text[:low]
+    line_break = kept.rfind("\n")
+    if line_break > len(kept) * 0.8:
+        kept = kept[:line_break]
+    return kept + _marker(total - estimate_tokens(kept), total)
+
+
+def _marker(omitted: int, total: int) -> str:
+    return f"\n\n[truncated: ~{omitted} of ~{total} tokens omitted]"
+
+
+def _parse_json(text: str) -> Any:
+    stripped = text.lstrip()
+    if not stripped.startswith(("{", "[")):
+        return None
+    try:
+        return json.loads(stripped)
+    except ValueError:
+        return None
+
+
+def compact_output(output: Any, policy: OutputPolicy | None = None) -> str:
+    """Compact the output of a tool into the text sent to the model.
+
+    JSON (a JSON string, a dict, a list or a pydantic model) is re-serialized, other text is stripped
+    of markdown boilerplate, and both are truncated to the token budget.
+    """
+    policy = policy or OutputPolicy()
+
+    value: Any = None
+    if isinstance(output, str):
+        value = _parse_json(output)
+    elif isinstance(output, BaseModel):
+        value = output.model_dump(mode="json")
+    elif isinstance(output, dict | list):
+        value = output
+
+    if value is not None:
+        if policy.drop_empty:
+            value = drop_empty(value)
+        separators = (",", ":") if policy.minify_json else None
+        text = json.dumps(value, ensure_ascii=False, indent=None if policy.minify_json else 2, separators=separators)
+    else:
+        text = output if isinstance(output, str) else str(output)
+        if policy.strip_markdown:
+            text = strip_markdown(text)
+
+    if policy.max_tokens is not None:
+        text = truncate(text, policy.max_tokens)
+    return text
+
+
+def compact_tool(policy: OutputPolicy | None = None, **overrides: Any) -> Callable[[F], F]:
+    """Compact the output of a tool function, sync or async, with an output policy.
+
+    Apply it under `function_tool`, so the agent sees the compacted output while direct callers of
+    the undecorated function keep the full one. The tokens returned and saved per tool are counted
+    in the metrics registry.
+
+    Args:
+        policy (OutputPolicy | None): The output policy, the default one if None.
+        **overrides: Fields of the policy to override, e.g. `max_tokens`.
+    """
+    policy = replace(policy or OutputPolicy(), **overrides)
+
+    def decorator(func: F) -> F:
+        name = func.__name__
+
+        def compact(output: Any) -> str:
+            text = compact_output(output, policy)
+            original = estimate_tokens(output if isinstance(output, str) else str(output))
+            returned = estimate_tokens(text)
+            saved = max(original - returned, 0)
+
+            registry = get_metrics_registry()
+            registry.tool_output_tokens.inc(name, "returned", amount=returned)
+            registry.tool_output_tokens.inc(name, "saved", amount=saved)
+            logger.debug(f"Compacted the output of {name} from ~{original} to ~{returned} tokens")
+            return text
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> str:
+                return compact(await func(*args, **kwargs))
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> str:
+            return compact(func(*args, **kwargs))
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
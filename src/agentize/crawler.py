@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import re
+from collections.abc import AsyncIterator
+from collections.abc import Iterable
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import PurePosixPath
+from urllib.parse import parse_qsl
+from urllib.parse import urlencode
+from urllib.parse import urljoin
+from urllib.parse import urlsplit
+from urllib.parse import urlunsplit
+from urllib.robotparser import RobotFileParser
+
+import httpx
+from loguru import logger
+
+from .cache import ScrapeEntry
+from .firecrawl_client import FirecrawlError
+from .firecrawl_client import get_firecrawl_client
+from .scraper import Page
+from .scraper import Scraper
+from .scraper import get_scraper
+
+ROBOTS_USER_AGENT = "agentize"
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# links to files the scraper cannot turn into text
+SKIPPED_SUFFIXES = frozenset(
+    {
+        ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico", ".css", ".js", ".json", ".xml",
+        ".zip", ".gz", ".tar", ".mp3", ".mp4", ".webm", ".woff", ".woff2", ".ttf",
+    }
+)  # fmt: skip
+_TRACKING_PARAM = re.compile(r"utm_\w+|fbclid|gclid")
+
+
+def normalize_crawl_url(url: str) -> str | None:
+    """Normalize an http(s) URL for crawling, or return None for other URLs.
+
+    The scheme and host are lowercased, default ports, fragments and tracking parameters are dropped,
+    and the remaining query parameters are sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    try:
+        port = parts.port
+    except ValueError:
+        return None
+
+    netloc = parts.hostname if port in (None, DEFAULT_PORTS[scheme]) else f"{parts.hostname}:{port}"
+    path = re.sub(r"/{2,}", "/", parts.path) or "/"
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    query = urlencode(sorted((key, value) for key, value in params if not _TRACKING_PARAM.fullmatch(key)))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+class SeenSet:
+    """A set of URLs kept as 8-byte digests, ignoring trailing slashes."""
+
+    def __init__(self) -> None:
+        self._digests: set[bytes] = set()
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+    def add(self, url: str) -> bool:
+        """Add the URL and return whether it was new."""
+        parts = urlsplit(url)
+        key = urlunsplit(parts._replace(path=parts.path.rstrip("/")))
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        if digest in self._digests:
+            return False
+        self._digests.add(digest)
+        return True
+
+
+class _LinkParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.base: str | None = None
+        self.links: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag not in ("a", "base"):
+            return
+        href = dict(attrs).get("href")
+        if href is None:
+            return
+        if tag == "base":
+            self.base = self.base or href
+        else:
+            self.links.append(href)
+
+
+def extract_links(page: Page) -> list[str]:
+    """Return the normalized http(s) links of an HTML page, in document order."""
+    if page.content_type not in (None, "text/html", "application/xhtml+xml"):
+        return []
+
+    parser = _LinkParser()
+    parser.feed(page.content.decode(page.charset or "utf-8", errors="replace"))
+    base = urljoin(page.url, parser.base) if parser.base else page.url
+
+    links = []
+    for href in parser.links:
+        url = normalize_crawl_url(urljoin(base, href))
+        if url is not None and PurePosixPath(urlsplit(url).path).suffix.lower() not in SKIPPED_SUFFIXES:
+            links.append(url)
+    return links
+
+
+@dataclass(frozen=True)
+class CrawlSettings:
+    """The budgets and limits of a crawl.
+
+    Args:
+        max_depth (int): The maximum number of links followed from a seed.
+        max_pages (int): The maximum number of pages fetched.
+        max_bytes (int): The total size of downloaded documents after which no more pages are fetched.
+        concurrency (int): The maximum number of pages fetched at once. Requests to one host are
+            further limited by the settings of the scraper.
+        same_host (bool): Only follow links to the hosts of the seeds.
+        respect_robots (bool): Skip the URLs that robots.txt disallows.
+    """
+
+    max_depth: int = 3
+    max_pages: int = 200
+    max_bytes: int = 100 * 1024 * 1024
+    concurrency: int = 16
+    same_host: bool = True
+    respect_robots: bool = True
+
+
+@dataclass
+class CrawlPage:
+    url: str
+    depth: int
+    markdown: str | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class Crawler:
+    """A concurrent crawler that streams the pages of a site as markdown.
+
+    URLs are normalized and deduplicated with a compact seen-set, and admitted to the frontier only
+    while the page budget lasts, so the frontier stays bounded. Pages are fetched and converted by
+    the shared scraper, which limits the requests to every host, and stored in its cache.
+
+    Args:
+        settings (CrawlSettings | None): The budgets of the crawl, the defaults if None.
+        scraper (Scraper | None): The scraper to fetch pages with, the shared one if None.
+    """
+
+    def __init__(self, settings: CrawlSettings | None = None, scraper: Scraper | None = None) -> None:
+        self.settings = settings or CrawlSettings()
+        self.scraper = scraper or get_scraper()
+        self.seen = SeenSet()
+        self.admitted = 0
+        self.bytes_fetched = 0
+        self._hosts: set[str] = set()
+        self._robots: dict[str, asyncio.Task[RobotFileParser | None]] = {}
+        self._frontier: asyncio.Queue[tuple[str, int]] = asyncio.Queue()
+
+    def _admit(self, url: str, depth: int) -> None:
+        if depth > self.settings.max_depth or self.admitted >= self.settings.max_pages:
+            return
+        if self.settings.same_host and urlsplit(url).netloc not in self._hosts:
+            return
+        if self.seen.add(url):
+            self.admitted += 1
+            self._frontier.put_nowait((url, depth))
+
+    async def _fetch_robots(self, origin: str) -> RobotFileParser | None:
+        parser = RobotFileParser(f"{origin}/robots.txt")
+        try:
+            page = await self.scraper.fetch(f"{origin}/robots.txt")
+        except httpx.HTTPStatusError as e:
+            # like urllib: no robots.txt allows everything, an unauthorized one disallows everything
+            unauthorized = e.response.status_code in (401, 403)
+            parser.parse(["User-agent: *", "Disallow: /"] if unauthorized else [])
+            return parser
+        except (httpx.HTTPError, ValueError) as e:
+            logger.debug(f"Failed to fetch {origin}/robots.txt, crawling without it: {e}")
+            return None
+        parser.parse(page.content.decode(page.charset or "utf-8", errors="replace").splitlines())
+        return parser
+
+    async def _allowed(self, url: str) -> bool:
+        if not self.settings.respect_robots:
+            return True
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        task = self._robots.get(origin)
+        if task is None:
+            task = self._robots[origin] = asyncio.ensure_future(self._fetch_robots(origin))
+        parser = await task
+        return parser is None or parser.can_fetch(ROBOTS_USER_AGENT, url)
+
+    async def _crawl_one(self, url: str, depth: int) -> CrawlPage | None:
+        if self.bytes_fetched >= self.settings.max_bytes:
+            return None
+        if not await self._allowed(url):
+            logger.debug(f"Skipping {url}, disallowed by robots.txt")
+            return None
+
+        try:
+            page = await self.scraper.fetch(url)
+            self.bytes_fetched += len(page.content)
+            # the links are read from the HTML, since the markdown of the page has its navigation removed
+            for link in extract_links(page):
+                self._admit(link, depth + 1)
+            markdown = await self.scraper.convert(page)
+        except (httpx.HTTPError, ValueError) as e:
+            return CrawlPage(url, depth, error=f"{type(e).__name__}: {e}")
+
+        self.seen.add(normalize_crawl_url(page.url) or page.url)
+        if self.scraper.cache is not None and page.cacheable:
+            self.scraper.cache.set(ScrapeEntry(url, markdown, etag=page.etag, last_modified=page.last_modified))
+        return CrawlPage(url, depth, markdown=markdown)
+
+    async def _work(self, results: asyncio.Queue[CrawlPage]) -> None:
+        while True:
+            url, depth = await self._frontier.get()
+            try:
+                page = await self._crawl_one(url, depth)
+                if page is not None:
+                    await results.put(page)
+            except Exception as e:
+                await results.put(CrawlPage(url, depth, error=f"{type(e).__name__}: {e}"))
+            finally:
+                self._frontier.task_done()
+
+    async def crawl(self, seeds: Iterable[str]) -> AsyncIterator[CrawlPage]:
+        """Crawl from the seed URLs and yield every page as soon as it is fetched, failed pages included.
+
+        Stopping the iteration early cancels the crawl.
+        """
+        for seed in seeds:
+            url = normalize_crawl_url(seed)
+            if url is None:
+                raise ValueError(f"Not an http(s) URL: {seed}")
+            self._hosts.add(urlsplit(url).netloc)
+            self._admit(url, 0)
+
+        results: asyncio.Queue[CrawlPage] = asyncio.Queue()
+        workers = [asyncio.create_task(self._work(results)) for _ in range(self.settings.concurrency)]
+        done = asyncio.create_task(self._frontier.join())
+        get: asyncio.Task[CrawlPage] | None = None
+        try:
+            while True:
+                get = asyncio.create_task(results.get())
+                await asyncio.wait([get, done], return_when=asyncio.FIRST_COMPLETED)
+                if not get.done():
+                    get.cancel()
+                    break
+                yield get.result()
+            while not results.empty():
+                yield results.get_nowait()
+        finally:
+            tasks = [*workers, done, *self._robots.values(), *([get] if get is not None else [])]
+            for task in tasks:
+                task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def map_seeds(url: str, limit: int | None = None) -> list[str]:
+    """Return the URL and the URLs of its host that Firecrawl maps, or only the URL if mapping fails."""
+    try:
+        links = await get_firecrawl_client().map(url)
+    except FirecrawlError as e:
+        logger.info(f"Failed to map {url} with Firecrawl, crawling from the URL only: {e}")
+        links = []
+
+    host = urlsplit(normalize_crawl_url(url) or url).netloc
+    same_host = [link for link in links if urlsplit(normalize_crawl_url(link) or link).netloc == host]
+    return [url, *same_host[:limit]]
+
+
+async def crawl(
+    url: str,
+    settings: CrawlSettings | None = None,
+    use_map: bool = False,
+    scraper: Scraper | None = None,
+) -> AsyncIterator[CrawlPage]:
+    """Crawl a site from a URL and yield its pages as they are fetched.
+
+    Args:
+        url (str): The seed URL.
+        settings (CrawlSettings | None): The budgets of the crawl, the defaults if None.
+        use_map (bool): Also seed the crawl with the URLs Firecrawl maps for the site, which finds
+            pages that are not linked within `max_depth` of the seed.
+        scraper (Scraper | None): The scraper to fetch pages with, the shared one if None.
+    """
+    settings = settings or CrawlSettings()
+    seeds = await map_seeds(url, limit=settings.max_pages) if use_map else [url]
+    async for page in Crawler(settings, scraper).crawl(seeds):
+        yield page
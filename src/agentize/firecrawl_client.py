@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections.abc import Sequence
+from email.utils import parsedate_to_datetime
+from functools import cache
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from .model import HTTPSettings
+from .model import LoopAwareTransport
+
+DEFAULT_API_URL = "https://api.firecrawl.dev"
+
+
+class FirecrawlError(Exception):
+    pass
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    """The delay the server asked for in its Retry-After header, in seconds."""
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class FirecrawlClient:
+    """An async client of the Firecrawl v1 API with pooled connections.
+
+    Rate-limited (429) and failed (5xx, connection error) requests are retried with exponential
+    backoff, waiting as long as the server's Retry-After header asks for.
+
+    Args:
+        api_key (str): The Firecrawl API key.
+        api_url (str | None): The API endpoint, from FIRECRAWL_API_URL or the Firecrawl cloud if None.
+        max_retries (int): The maximum number of retries of a request.
+        backoff (float): The delay before the first retry in seconds, doubled for every retry.
+        max_backoff (float): The maximum delay between retries in seconds.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_url: str | None = None,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ) -> None:
+        self.api_url = (api_url or os.getenv("FIRECRAWL_API_URL") or DEFAULT_API_URL).rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        http_settings = HTTPSettings(read_timeout=120.0)
+        self._transport = LoopAwareTransport(http_settings)
+        self.client = httpx.AsyncClient(
+            base_url=self.api_url,
+            transport=self._transport,
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=http_settings.timeout,
+        )
+
+    async def _request(self, method: str, path: str, json: dict[str, Any] | None = None) -> dict[str, Any]:
+        for attempt in range(self.max_retries + 1):
+            delay = min(self.backoff * 2**attempt, self.max_backoff)
+            try:
+                response = await self.client.request(method, path, json=json)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise FirecrawlError(f"Failed to request {path}: {e}") from e
+                logger.debug(f"Retrying {path} in {delay:.2f}s: {e}")
+            else:
+                if response.status_code != 429 and response.status_code < 500:
+                    return self._parse(path, response)
+                if attempt == self.max_retries:
+                    return self._parse(path, response)
+
+                retry_after = _retry_after(response)
+                if retry_after is not None:
+                    delay = min(retry_after, self.max_backoff)
+                logger.debug(f"Retrying {path} in {delay:.2f}s: status {response.status_code}")
+            await asyncio.sleep(delay)
+
+        raise AssertionError("unreachable")
+
+    @staticmethod
+    def _parse(path: str, response: httpx.Response) -> dict[str, Any]:
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+        if response.is_error or not data.get("success", True):
+            error = data.get("error") or response.reason_phrase
+            raise FirecrawlError(f"Failed to request {path}, got status {response.status_code}: {error}")
+        return data
+
+    async def scrape(self, url: str, formats: Sequence[str] = ("markdown",)) -> dict[str, Any]:
+        """Scrape a URL and return the document, e.g. its `markdown`."""
+        data = await self._request("POST", "/v1/scrape", {"url": url, "formats": list(formats)})
+        return data.get("data") or {}
+
+    async def batch_scrape(
+        self,
+        urls: Sequence[str],
+        formats: Sequence[str] = ("markdown",),
+        poll_interval: float = 1.0,
+        timeout: float = 300.0,
+    ) -> dict[str, dict[str, Any]]:
+        """Scrape many URLs as one batch job and return the documents by URL.
+
+        URLs that failed to scrape are missing from the result.
+        """
+        job = await self._request("POST", "/v1/batch/scrape", {"urls": list(urls), "formats": list(formats)})
+        path = f"/v1/batch/scrape/{job['id']}"
+
+        deadline = time.monotonic() + timeout
+        while True:
+            status = await self._request("GET", path)
+            if status.get("status") == "completed":
+                break
+            if status.get("status") == "failed":
+                raise FirecrawlError(f"Batch scrape {job['id']} failed")
+            if time.monotonic() > deadline:
+                raise FirecrawlError(f"Batch scrape {job['id']} did not complete in {timeout}s")
+            await asyncio.sleep(poll_interval)
+
+        documents = list(status.get("data") or [])
+        # large results are paginated
+        while status.get("next"):
+            status = await self._request("GET", status["next"])
+            documents.extend(status.get("data") or [])
+
+        requested = set(urls)
+        results = {}
+        for document in documents:
+            metadata = document.get("metadata") or {}
+            url = metadata.get("sourceURL") or metadata.get("url")
+            if url in requested:
+                results[url] = document
+        return results
+
+    async def search(self, query: str, limit: int = 3) -> list[dict[str, Any]]:
+        data = await self._request("POST", "/v1/search", {"query": query, "limit": limit})
+        return data.get("data") or []
+
+    async def map(self, url: str) -> list[str]:
+        data = await self._request("POST", "/v1/map", {"url": url})
+        return data.get("links") or []
+
+    async def aclose(self) -> None:
+        """Close the connections pooled on the running event loop."""
+        await self._transport.aclose()
+
+
+@cache
+def _get_firecrawl_client(api_key: str, api_url: str | None) -> FirecrawlClient:
+    return FirecrawlClient(api_key, api_url=api_url)
+
+
+def get_firecrawl_client(api_key: str | None = None) -> FirecrawlClient:
+    """Return the shared client of the API key, from FIRECRAWL_API_KEY if None."""
+    return _get_firecrawl_client(api_key or os.getenv("FIRECRAWL_API_KEY", ""), os.getenv("FIRECRAWL_API_URL"))
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+
+from agents import Model
+from agents import ModelResponse
+from loguru import logger
+
+
+@dataclass(frozen=True)
+class HedgingPolicy:
+    """When to send a duplicate of a slow request.
+
+    Args:
+        percentile (float): The percentile of recent latencies after which a request is hedged.
+        max_hedge_rate (float): The maximum fraction of requests that may be hedged, bounding extra cost.
+        min_samples (int): The latencies to observe before hedging starts.
+        window (int): The number of recent latencies the percentile is computed over.
+        min_delay (float): The lower bound of the hedge delay in seconds.
+    """
+
+    percentile: float = 0.95
+    max_hedge_rate: float = 0.05
+    min_samples: int = 20
+    window: int = 200
+    min_delay: float = 0.05
+
+
+@dataclass
+class HedgeStats:
+    requests: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    primary_wins: int = 0
+
+    @property
+    def hedge_rate(self) -> float:
+        return self.hedges / self.requests if self.requests else 0.0
+
+    @property
+    def hedge_win_rate(self) -> float:
+        """The fraction of hedged requests answered by the hedge."""
+        return self.hedge_wins / self.hedges if self.hedges else 0.0
+
+
+class HedgedModel(Model):
+    """A model that hedges slow requests to cut tail latency.
+
+    If a request has not returned once it has taken longer than the policy's percentile of recently
+    observed latencies, a duplicate is sent to the alternate model (or the same model, e.g. a
+    `RouterModel` that will pick another endpoint). The first successful response wins and the other
+    request is cancelled. Streamed responses are passed through without hedging.
+
+    Args:
+        model (Model): The model to send requests to.
+        policy (HedgingPolicy | None): When to hedge, the default policy if None.
+        alternate (Model | None): The model to send hedges to, the same model if None.
+    """
+
+    def __init__(self, model: Model, policy: HedgingPolicy | None = None, alternate: Model | None = None) -> None:
+        self.wrapped = model
+        self.policy = policy or HedgingPolicy()
+        self.alternate = alternate or model
+        self.model = getattr(model, "model", type(model).__name__)
+        self.stats = HedgeStats()
+        self._latencies: deque[float] = deque(maxlen=self.policy.window)
+
+    def hedge_delay(self) -> float | None:
+        """The seconds to wait before hedging, or None if there are too few samples to tell."""
+        if len(self._latencies) < self.policy.min_samples:
+            return None
+
+        latencies = sorted(self._latencies)
+        index = min(int(self.policy.percentile * len(latencies)), len(latencies) - 1)
+        return max(latencies[index], self.policy.min_delay)
+
+    def _can_hedge(self) -> bool:
+        return self.stats.hedges < self.policy.max_hedge_rate * self.stats.requests
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        self.stats.requests += 1
+        start = time.perf_counter()
+        primary = asyncio.create_task(self.wrapped.get_response(*args, **kwargs))
+        tasks = {primary}
+        try:
+            delay = self.hedge_delay()
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self._can_hedge():
+                response = await primary
+                self.stats.primary_wins += 1
+                self._latencies.append(time.perf_counter() - start)
+                return response
+
+            logger.debug(f"Hedging request after {delay:.3f}s")
+            self.stats.hedges += 1
+            hedge_start = time.perf_counter()
+            hedge = asyncio.create_task(self.alternate.get_response(*args, **kwargs))
+            tasks.add(hedge)
+
+            pending = set(tasks)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task_error = task.exception()
+                    if task_error is not None:
+                        error = error or task_error
+                        continue
+
+                    if task is hedge:
+                        self.stats.hedge_wins += 1
+                        self._latencies.append(time.perf_counter() - hedge_start)
+                    else:
+                        self.stats.primary_wins += 1
+                        self._latencies.append(time.perf_counter() - start)
+                    return task.result()
+
+            assert error is not None
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        return self.wrapped.stream_response(*args, **kwargs)
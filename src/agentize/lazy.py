@@ -1,15 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import time
+from collections.abc import AsyncGenerator
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import Future
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Generic
 from typing import TypeVar
+from typing import cast
 
 from agents import Agent
 from agents import Model
 from agents import ModelSettings
+from agents import RawResponsesStreamEvent
 from agents import Runner
+from aiolimiter import AsyncLimiter
+from openai.types.responses import ResponseTextDeltaEvent
+from pydantic import BaseModel
+from pydantic import TypeAdapter
+from pydantic import ValidationError
 
+from .agents.registry import get_agent
+from .background import get_background_loop
+from .cache import ResponseCache
 from .model import get_openai_model
+from .utils import estimate_tokens
+from .utils import parse_partial_json
 
 T = TypeVar("T")
 
 
+@dataclass
+class TextDelta:
+    delta: str
+
+
+@dataclass
+class PartialOutput:
+    output: Any
+    """The output type built from the fields that are complete and valid so far."""
+
+    fields: set[str]
+    """The names of the fields set on the partial output."""
+
+
+@dataclass
+class FinalOutput(Generic[T]):
+    output: T
+
+
+LazyStreamEvent = TextDelta | PartialOutput | FinalOutput
+
+
+@dataclass
+class BatchResult(Generic[T]):
+    index: int
+    input: str
+    output: T | None = None
+    error: Exception | None = None
+    latency: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchStats:
+    submitted: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    input_tokens: int = 0
+    total_latency: float = 0.0
+    started_at: float = field(default_factory=time.perf_counter)
+    finished_at: float | None = None
+
+    @property
+    def completed(self) -> int:
+        return self.succeeded + self.failed
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Completed runs per second."""
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.completed if self.completed else 0.0
+
+
 def _create_agent(
     instructions: str | None = None,
     name: str = "lazy_run",
@@ -17,9 +109,7 @@ def _create_agent(
     model_settings: ModelSettings | None = None,
     output_type: type[T] | None = None,
 ) -> Agent:
-    model = model or get_openai_model()
-    model_settings = model_settings or ModelSettings()
-    return Agent(
+    return get_agent(
         name=name,
         instructions=instructions,
         model=model,
@@ -28,6 +118,28 @@ def _create_agent(
     )
 
 
+def _load_cached(
+    cache: ResponseCache | None,
+    input: str,
+    instructions: str | None,
+    model: Model,
+    model_settings: ModelSettings,
+    output_type: type[T] | None,
+) -> tuple[str | None, Any]:
+    """Return the cache key of a run and its cached output, None for both without a cache or a cacheable model."""
+    if cache is None:
+        return None, None
+    key = cache.make_key(input, instructions, model, model_settings, output_type)
+    if key is None:
+        return None, None
+    return key, cache.load(key, output_type)
+
+
+def _save_cached(cache: ResponseCache | None, key: str | None, output: Any, output_type: type[T] | None) -> None:
+    if cache is not None and key is not None:
+        cache.save(key, output, output_type)
+
+
 async def lazy_run(
     input: str,
     instructions: str | None = None,
@@ -35,6 +147,7 @@ async def lazy_run(
     model: Model | None = None,
     model_settings: ModelSettings | None = None,
     output_type: type[T] | None = None,
+    cache: ResponseCache | None = None,
 ) -> T:
     """Run the agent with the given input and instructions.
 
@@ -45,8 +158,15 @@ async def lazy_run(
         model (Model | None): The model to use for the agent.
         model_settings (ModelSettings | None): The settings for the model.
         output_type (type[T] | None): The type of output to return.
+        cache (ResponseCache | None): The cache to answer repeated runs from.
     """
+    model = model or get_openai_model()
     model_settings = model_settings or ModelSettings()
+
+    key, cached = _load_cached(cache, input, instructions, model, model_settings, output_type)
+    if cached is not None:
+        return cached
+
     result = await Runner.run(
         starting_agent=_create_agent(
             instructions=instructions,
@@ -58,9 +178,9 @@ async def lazy_run(
         input=input,
     )
 
-    if output_type is None:
-        return result.final_output
-    return result.final_output_as(output_type)
+    output = result.final_output if output_type is None else result.final_output_as(output_type)
+    _save_cached(cache, key, output, output_type)
+    return output
 
 
 def lazy_run_sync(
@@ -70,6 +190,8 @@ def lazy_run_sync(
     model: Model | None = None,
     model_settings: ModelSettings | None = None,
     output_type: type[T] | None = None,
+    cache: ResponseCache | None = None,
+    background: bool = False,
 ) -> str | T:
     """Run the agent with the given input and instructions.
 
@@ -80,8 +202,27 @@ def lazy_run_sync(
         model (Model | None): The model to use for the agent.
         model_settings (ModelSettings | None): The settings for the model.
         output_type (type[T] | None): The type of output to return.
+        cache (ResponseCache | None): The cache to answer repeated runs from.
+        background (bool): Run on the shared background loop instead of a fresh event loop per call.
     """
+    if background:
+        return lazy_submit(
+            input=input,
+            instructions=instructions,
+            name=name,
+            model=model,
+            model_settings=model_settings,
+            output_type=output_type,
+            cache=cache,
+        ).result()
+
+    model = model or get_openai_model()
     model_settings = model_settings or ModelSettings()
+
+    key, cached = _load_cached(cache, input, instructions, model, model_settings, output_type)
+    if cached is not None:
+        return cached
+
     result = Runner.run_sync(
         starting_agent=_create_agent(
             instructions=instructions,
@@ -93,6 +234,264 @@ def lazy_run_sync(
         input=input,
     )
 
-    if output_type is None:
-        return result.final_output
-    return result.final_output_as(output_type)
+    output = result.final_output if output_type is None else result.final_output_as(output_type)
+    _save_cached(cache, key, output, output_type)
+    return output
+
+
+async def lazy_run_stream(
+    input: str,
+    instructions: str | None = None,
+    name: str = "lazy_run_stream",
+    model: Model | None = None,
+    model_settings: ModelSettings | None = None,
+    output_type: type[T] | None = None,
+    cache: ResponseCache | None = None,
+) -> AsyncIterator[LazyStreamEvent]:
+    """Run the agent and stream its output as it is generated.
+
+    Yields a `TextDelta` for every chunk of text. When the output type is a pydantic model, a
+    `PartialOutput` is also yielded whenever more of its fields become valid, so e.g. a summary
+    can be shown before the rest of the object arrives. The stream ends with a `FinalOutput`.
+
+    Args:
+        input (str): The input to the agent.
+        instructions (str | None): The instructions for the agent.
+        name (str): The name of the agent.
+        model (Model | None): The model to use for the agent.
+        model_settings (ModelSettings | None): The settings for the model.
+        output_type (type[T] | None): The type of output to return.
+        cache (ResponseCache | None): The cache to answer repeated runs from.
+    """
+    model = model or get_openai_model()
+    model_settings = model_settings or ModelSettings()
+
+    key, cached = _load_cached(cache, input, instructions, model, model_settings, output_type)
+    if cached is not None:
+        yield FinalOutput(cached)
+        return
+
+    result = Runner.run_streamed(
+        starting_agent=_create_agent(
+            instructions=instructions,
+            name=name,
+            model=model,
+            model_settings=model_settings,
+            output_type=output_type,
+        ),
+        input=input,
+    )
+
+    partial_type = output_type if isinstance(output_type, type) and issubclass(output_type, BaseModel) else None
+    text = ""
+    fields: dict[str, Any] = {}
+    async for event in result.stream_events():
+        if not (isinstance(event, RawResponsesStreamEvent) and isinstance(event.data, ResponseTextDeltaEvent)):
+            continue
+
+        text += event.data.delta
+        yield TextDelta(event.data.delta)
+
+        if partial_type is not None:
+            partial_fields = _validate_partial_fields(partial_type, parse_partial_json(text))
+            if partial_fields != fields:
+                fields = partial_fields
+                yield PartialOutput(output=partial_type.model_construct(**fields), fields=set(fields))
+
+    output = result.final_output if output_type is None else result.final_output_as(output_type)
+    _save_cached(cache, key, output, output_type)
+    yield FinalOutput(output)
+
+
+def _validate_partial_fields(output_type: type[BaseModel], data: Any) -> dict[str, Any]:
+    if not isinstance(data, dict):
+        return {}
+
+    fields: dict[str, Any] = {}
+    for name, adapter in _field_adapters(output_type).items():
+        if name not in data:
+            continue
+        try:
+            fields[name] = adapter.validate_python(data[name])
+        except ValidationError:
+            continue
+    return fields
+
+
+@functools.cache
+def _field_adapters(output_type: type[BaseModel]) -> dict[str, TypeAdapter]:
+    return {name: TypeAdapter(cast(Any, field.annotation)) for name, field in output_type.model_fields.items()}
+
+
+def lazy_submit(
+    input: str,
+    instructions: str | None = None,
+    name: str = "lazy_submit",
+    model: Model | None = None,
+    model_settings: ModelSettings | None = None,
+    output_type: type[T] | None = None,
+    cache: ResponseCache | None = None,
+) -> Future[T]:
+    """Submit a run to the shared background loop and return a future for its output.
+
+    Sync callers can submit many runs at once and wait on the futures, e.g. with
+    `concurrent.futures.as_completed`.
+
+    Args:
+        input (str): The input to the agent.
+        instructions (str | None): The instructions for the agent.
+        name (str): The name of the agent.
+        model (Model | None): The model to use for the agent.
+        model_settings (ModelSettings | None): The settings for the model.
+        output_type (type[T] | None): The type of output to return.
+        cache (ResponseCache | None): The cache to answer repeated runs from.
+    """
+    return get_background_loop().submit(
+        lazy_run(
+            input=input,
+            instructions=instructions,
+            name=name,
+            model=model,
+            model_settings=model_settings,
+            output_type=output_type,
+            cache=cache,
+        )
+    )
+
+
+async def lazy_run_many(
+    inputs: Iterable[str],
+    instructions: str | None = None,
+    name: str = "lazy_run_many",
+    model: Model | None = None,
+    model_settings: ModelSettings | None = None,
+    output_type: type[T] | None = None,
+    cache: ResponseCache | None = None,
+    concurrency: int = 8,
+    requests_per_minute: float | None = None,
+    tokens_per_minute: float | None = None,
+    ordered: bool = True,
+    stats: BatchStats | None = None,
+) -> AsyncIterator[BatchResult[T]]:
+    """Run the agent on many inputs with bounded concurrency and rate limits.
+
+    A failed run is yielded as a result carrying its error instead of cancelling the batch.
+
+    Args:
+        inputs (Iterable[str]): The inputs to the agent.
+        instructions (str | None): The instructions for the agent.
+        name (str): The name of the agent.
+        model (Model | None): The model to use for the agent.
+        model_settings (ModelSettings | None): The settings for the model.
+        output_type (type[T] | None): The type of output to return.
+        cache (ResponseCache | None): The cache to answer repeated runs from.
+        concurrency (int): The maximum number of runs in flight.
+        requests_per_minute (float | None): The maximum number of runs started per minute.
+        tokens_per_minute (float | None): The maximum number of estimated input tokens sent per minute.
+        ordered (bool): Yield results in input order if True, otherwise as they complete.
+        stats (BatchStats | None): Collects the aggregate throughput of the batch if given.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got: {concurrency}")
+
+    model = model or get_openai_model()
+    model_settings = model_settings or ModelSettings()
+    stats = stats if stats is not None else BatchStats()
+
+    request_limiter = AsyncLimiter(requests_per_minute, 60) if requests_per_minute else None
+    token_limiter = AsyncLimiter(tokens_per_minute, 60) if tokens_per_minute else None
+
+    async def run(index: int, input: str) -> BatchResult[T]:
+        if request_limiter is not None:
+            await request_limiter.acquire()
+        if token_limiter is not None:
+            tokens = estimate_tokens(input) + estimate_tokens(instructions or "")
+            await token_limiter.acquire(min(tokens, token_limiter.max_rate))
+            stats.input_tokens += tokens
+
+        start = time.perf_counter()
+        try:
+            output = await lazy_run(
+                input=input,
+                instructions=instructions,
+                name=name,
+                model=model,
+                model_settings=model_settings,
+                output_type=output_type,
+                cache=cache,
+            )
+        except Exception as e:
+            return BatchResult(index=index, input=input, error=e, latency=time.perf_counter() - start)
+        return BatchResult(index=index, input=input, output=output, latency=time.perf_counter() - start)
+
+    queue: asyncio.Queue[BatchResult[T]] = asyncio.Queue()
+    pending = enumerate(inputs)
+    workers = [asyncio.create_task(_batch_worker(pending, run, queue, stats)) for _ in range(concurrency)]
+    drained = _drain(queue, workers)
+    results = _in_order(drained) if ordered else drained
+    try:
+        async for result in results:
+            yield result
+    finally:
+        # closing the outer generator does not close the one it iterates
+        await results.aclose()
+        await drained.aclose()
+        stats.finished_at = time.perf_counter()
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def _batch_worker(
+    pending: Iterator[tuple[int, str]],
+    run: Callable[[int, str], Awaitable[BatchResult[T]]],
+    queue: asyncio.Queue[BatchResult[T]],
+    stats: BatchStats,
+) -> None:
+    for index, input in pending:
+        stats.submitted += 1
+        result = await run(index, input)
+        if result.ok:
+            stats.succeeded += 1
+        else:
+            stats.failed += 1
+        stats.total_latency += result.latency
+        await queue.put(result)
+
+
+async def _drain(
+    queue: asyncio.Queue[BatchResult[T]], workers: list[asyncio.Task[None]]
+) -> AsyncGenerator[BatchResult[T], None]:
+    """Yield results as workers produce them until every worker has finished."""
+    done: asyncio.Future[Any] = asyncio.gather(*workers)
+    get: asyncio.Future[Any] | None = None
+    try:
+        while not (done.done() and queue.empty()):
+            get = asyncio.create_task(queue.get())
+            await asyncio.wait({get, done}, return_when=asyncio.FIRST_COMPLETED)
+            if get.done():
+                yield get.result()
+            else:
+                get.cancel()
+
+        # surface unexpected worker errors, e.g. from iterating the inputs
+        await done
+    finally:
+        # the consumer stopped early: stop the workers and retrieve the cancellation of the gather
+        if get is not None:
+            get.cancel()
+        if not done.done():
+            done.cancel()
+            await asyncio.wait({done})
+        if not done.cancelled():
+            done.exception()
+
+
+async def _in_order(results: AsyncIterator[BatchResult[T]]) -> AsyncGenerator[BatchResult[T], None]:
+    buffer: dict[int, BatchResult[T]] = {}
+    next_index = 0
+    async for result in results:
+        buffer[result.index] = result
+        while next_index in buffer:
+            yield buffer.pop(next_index)
+            next_index += 1
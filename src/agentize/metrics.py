@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from collections.abc import Sequence
+from functools import cache
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Any
+from typing import TypeVar
+
+from agents import Model
+from agents import ModelResponse
+from openai.types.responses import ResponseCompletedEvent
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: the count of every bucket (the last one is +Inf), the sum and the count
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            item = self._values.get(labels)
+            if item is None:
+                item = ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+                self._values[labels] = item
+            counts, total = item
+            counts[index] += 1
+            total[0] += value
+            total[1] += 1
+
+    def count(self, *labels: str) -> int:
+        item = self._values.get(labels)
+        return int(item[1][1]) if item is not None else 0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, (total, count)) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip([*self.buckets, float("inf")], counts, strict=True):
+                    cumulative += bucket_count
+                    le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total:g}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count:g}")
+        return lines
+
+
+class MetricsRegistry:
+    """An in-process registry of counters and histograms with a Prometheus text exposition."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._lock = threading.Lock()
+
+        self.model_requests = self.counter(
+            "agentize_model_requests_total",
+            "Model calls by model and status (ok, error, cancelled).",
+            ["model", "status"],
+        )
+        self.model_latency = self.histogram(
+            "agentize_model_latency_seconds", "Latency of model calls in seconds.", ["model"]
+        )
+        self.model_tokens = self.counter(
+            "agentize_model_tokens_total",
+            "Tokens used by model calls by kind (input, output, cached).",
+            ["model", "kind"],
+        )
+        self.model_retries = self.counter(
+            "agentize_model_retries_total", "HTTP requests retried by the OpenAI clients.", ["host"]
+        )
+        self.tool_calls = self.counter(
+            "agentize_tool_calls_total", "Tool calls by tool and status (ok, error, cancelled).", ["tool", "status"]
+        )
+        self.tool_latency = self.histogram(
+            "agentize_tool_latency_seconds", "Latency of tool calls in seconds.", ["tool"]
+        )
+        self.tool_output_tokens = self.counter(
+            "agentize_tool_output_tokens_total",
+            "Estimated tokens of compacted tool outputs by kind (returned, saved).",
+            ["tool", "kind"],
+        )
+
+    def _register(self, metric: Counter | Histogram) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} is already registered as a {type(existing).__name__}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+@cache
+def get_metrics_registry() -> MetricsRegistry:
+    return MetricsRegistry()
+
+
+def serve_metrics(port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve the default registry at http://host:port/metrics from a daemon thread."""
+    registry = get_metrics_registry()
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="agentize-metrics", daemon=True).start()
+    return server
+
+
+def record_usage(model: str, usage: Any) -> None:
+    registry = get_metrics_registry()
+    registry.model_tokens.inc(model, "input", amount=getattr(usage, "input_tokens", 0) or 0)
+    registry.model_tokens.inc(model, "output", amount=getattr(usage, "output_tokens", 0) or 0)
+
+    details = getattr(usage, "input_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", 0) if details is not None else 0
+    if cached_tokens:
+        registry.model_tokens.inc(model, "cached", amount=cached_tokens)
+
+
+class InstrumentedModel(Model):
+    """A model that records latency, token usage and errors of every call in the metrics registry."""
+
+    def __init__(self, model: Model) -> None:
+        self.wrapped = model
+        self.model = str(getattr(model, "model", type(model).__name__))
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        registry = get_metrics_registry()
+        start = time.perf_counter()
+        try:
+            response = await self.wrapped.get_response(*args, **kwargs)
+        except asyncio.CancelledError:
+            # e.g. the losing request of a hedge, which did not fail
+            registry.model_requests.inc(self.model, "cancelled")
+            raise
+        except Exception:
+            registry.model_requests.inc(self.model, "error")
+            raise
+        finally:
+            registry.model_latency.observe(time.perf_counter() - start, self.model)
+
+        registry.model_requests.inc(self.model, "ok")
+        record_usage(self.model, response.usage)
+        return response
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        registry = get_metrics_registry()
+        start = time.perf_counter()
+        try:
+            async for event in self.wrapped.stream_response(*args, **kwargs):
+                if isinstance(event, ResponseCompletedEvent):
+                    record_usage(self.model, event.response.usage)
+                yield event
+        except (asyncio.CancelledError, GeneratorExit):
+            # the consumer stopped reading the stream
+            registry.model_requests.inc(self.model, "cancelled")
+            raise
+        except Exception:
+            registry.model_requests.inc(self.model, "error")
+            raise
+        finally:
+            registry.model_latency.observe(time.perf_counter() - start, self.model)
+        registry.model_requests.inc(self.model, "ok")
+
+
+def instrument_tool(func: F) -> F:
+    """Record the latency and outcome of every call of a tool function, sync or async.
+
+    The wrapper keeps the signature and docstring, so `function_tool` generates the same schema.
+    """
+    name = func.__name__
+
+    def record(start: float, status: str) -> None:
+        registry = get_metrics_registry()
+        registry.tool_latency.observe(time.perf_counter() - start, name)
+        registry.tool_calls.inc(name, status)
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                record(start, "cancelled")
+                raise
+            except Exception:
+                record(start, "error")
+                raise
+            record(start, "ok")
+            return result
+
+        return async_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            record(start, "error")
+            raise
+        record(start, "ok")
+        return result
+
+    return wrapper  # type: ignore[return-value]
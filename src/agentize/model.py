@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import os
+import threading
+from dataclasses import dataclass
 from functools import cache
 from typing import Literal
 
+import httpx
 from agents import Model
 from agents import ModelSettings
 from agents import OpenAIChatCompletionsModel
@@ -11,11 +14,124 @@ from agents import OpenAIResponsesModel
 from loguru import logger
 from openai import AsyncAzureOpenAI
 from openai import AsyncOpenAI
+from openai import DefaultAsyncHttpxClient
 from openai.types import ChatModel
 
+from .hedging import HedgedModel
+from .hedging import HedgingPolicy
+from .metrics import InstrumentedModel
+from .metrics import get_metrics_registry
+from .utils import LoopLocal
+
+
+@dataclass(frozen=True)
+class HTTPSettings:
+    """Connection pool and timeout settings of the HTTP transport under the OpenAI clients."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0
+    http2: bool = False
+    connect_timeout: float = 5.0
+    read_timeout: float = 600.0
+
+    @classmethod
+    def from_env(cls) -> HTTPSettings:
+        return cls(
+            max_connections=int(os.getenv("OPENAI_HTTP_MAX_CONNECTIONS", cls.max_connections)),
+            max_keepalive_connections=int(
+                os.getenv("OPENAI_HTTP_MAX_KEEPALIVE_CONNECTIONS", cls.max_keepalive_connections)
+            ),
+            keepalive_expiry=float(os.getenv("OPENAI_HTTP_KEEPALIVE_EXPIRY", cls.keepalive_expiry)),
+            http2=os.getenv("OPENAI_HTTP2", "false").lower() in ("1", "true", "yes"),
+            connect_timeout=float(os.getenv("OPENAI_HTTP_CONNECT_TIMEOUT", cls.connect_timeout)),
+            read_timeout=float(os.getenv("OPENAI_HTTP_READ_TIMEOUT", cls.read_timeout)),
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+
+
+class LoopAwareTransport(httpx.AsyncBaseTransport):
+    """An HTTP transport that keeps one connection pool per event loop.
+
+    Pooled connections are bound to the event loop that opened them, so a single pool shared
+    by `Runner.run_sync` calls (each on a fresh loop) ends up with broken connections. This
+    transport lazily opens a pool for every running loop and drops it once the loop is closed.
+    """
+
+    def __init__(self, settings: HTTPSettings) -> None:
+        self.settings = settings
+        self._pools = LoopLocal(self._create_pool)
+
+    def _create_pool(self) -> httpx.AsyncHTTPTransport:
+        http2 = self.settings.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("h2 is not installed, falling back to HTTP/1.1. Install it with `pip install h2`.")
+                http2 = False
+        return httpx.AsyncHTTPTransport(limits=self.settings.limits, http2=http2)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        # the OpenAI SDK numbers its retries in this header
+        if request.headers.get("x-stainless-retry-count", "0") != "0":
+            get_metrics_registry().model_retries.inc(request.url.host)
+        return await self._pools.get().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Close the connection pool of the running event loop.
+
+        Pools of other loops cannot be closed from here; they are released with their loop.
+        """
+        pool = self._pools.pop()
+        if pool is not None:
+            await pool.aclose()
+
+
+_clients: dict[tuple[str | None, str | None, HTTPSettings], tuple[AsyncOpenAI, LoopAwareTransport]] = {}
+_clients_lock = threading.Lock()
+
+
+def get_openai_client(
+    base_url: str | None = None,
+    api_key: str | None = None,
+    http_settings: HTTPSettings | None = None,
+) -> AsyncOpenAI:
+    """Return the shared OpenAI client of an endpoint.
+
+    Clients are registered per endpoint and pool their connections per event loop, so the same
+    client can be used from `Runner.run`, `Runner.run_sync` and background threads.
+
+    Args:
+        base_url (str | None): The endpoint URL. Configured from environment variables if None.
+        api_key (str | None): The API key of the endpoint. Configured from environment variables if None.
+        http_settings (HTTPSettings | None): The transport settings. Read from environment variables if None.
+    """
+    http_settings = http_settings or HTTPSettings.from_env()
+    key = (base_url, api_key, http_settings)
+    with _clients_lock:
+        if key not in _clients:
+            transport = LoopAwareTransport(http_settings)
+            http_client = DefaultAsyncHttpxClient(transport=transport, timeout=http_settings.timeout)
+            _clients[key] = (_create_openai_client(base_url, api_key, http_client), transport)
+        return _clients[key][0]
+
+
+def _create_openai_client(base_url: str | None, api_key: str | None, http_client: httpx.AsyncClient) -> AsyncOpenAI:
+    if base_url is not None or api_key is not None:
+        return AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=http_client)
 
-@cache
-def get_openai_client() -> AsyncOpenAI:
     # OpenAI-compatible endpoints
     openai_proxy_api_key = os.getenv("OPENAI_PROXY_API_KEY")
     openai_proxy_base_url = os.getenv("OPENAI_PROXY_BASE_URL")
@@ -25,36 +141,56 @@ def get_openai_client() -> AsyncOpenAI:
             "OPENAI_PROXY_API_KEY and OPENAI_PROXY_BASE_URL are deprecated."
             "Use OPENAI_API_KEY and OPENAI_BASE_URL instead."
         )
-        return AsyncOpenAI(base_url=openai_proxy_base_url, api_key=openai_proxy_api_key)
+        return AsyncOpenAI(base_url=openai_proxy_base_url, api_key=openai_proxy_api_key, http_client=http_client)
 
     # Azure OpenAI-comatible endpoints
     azure_api_key = os.getenv("AZURE_OPENAI_API_KEY")
     if azure_api_key:
         logger.info("Using Azure OpenAI API key")
-        return AsyncAzureOpenAI(api_key=azure_api_key)
+        return AsyncAzureOpenAI(api_key=azure_api_key, http_client=http_client)
 
     logger.info("Using OpenAI API key")
-    return AsyncOpenAI()
+    return AsyncOpenAI(http_client=http_client)
+
+
+async def aclose_openai_clients() -> None:
+    """Close the connections that the registered clients pool on the running event loop.
+
+    The clients stay usable and open a new pool on their next request.
+    """
+    with _clients_lock:
+        transports = [transport for _, transport in _clients.values()]
+
+    for transport in transports:
+        await transport.aclose()
 
 
 @cache
 def get_openai_model(
     model: ChatModel | str | None = None,
     api_type: Literal["responses", "chat_completions"] = "responses",
+    hedging: HedgingPolicy | None = None,
 ) -> Model:
     if model is None:
         model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
     openai_client = get_openai_client()
 
+    openai_model: Model
     match api_type:
         case "responses":
-            return OpenAIResponsesModel(model, openai_client=openai_client)
+            openai_model = OpenAIResponsesModel(model, openai_client=openai_client)
         case "chat_completions":
-            return OpenAIChatCompletionsModel(model, openai_client=openai_client)
+            openai_model = OpenAIChatCompletionsModel(model, openai_client=openai_client)
         case _:
             raise ValueError(f"Invalid API type: {api_type}. Use 'responses' or 'chat_completions'.")
 
+    # instrumented under the hedge, so every attempt is recorded
+    openai_model = InstrumentedModel(openai_model)
+    if hedging is not None:
+        return HedgedModel(openai_model, policy=hedging)
+    return openai_model
+
 
 @cache
 def get_openai_model_settings():
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import os
+from collections.abc import Callable
+from collections.abc import Coroutine
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from typing import Any
+from typing import ParamSpec
+from typing import TypeVar
+
+from .utils import LoopLocal
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+@cache
+def get_tool_executor() -> ThreadPoolExecutor:
+    """Return the shared executor of offloaded tools, sized by AGENTIZE_TOOL_WORKERS (32 by default)."""
+    return ThreadPoolExecutor(
+        max_workers=int(os.getenv("AGENTIZE_TOOL_WORKERS", 32)),
+        thread_name_prefix="agentize-tool",
+    )
+
+
+def offload(
+    max_concurrency: int | None = None,
+    timeout: float | None = None,
+) -> Callable[[Callable[P, T]], Callable[P, Coroutine[Any, Any, T]]]:
+    """Run a blocking function in the shared tool executor instead of on the event loop.
+
+    Agents await the wrapper like any async tool, so a slow call does not stall the other tool
+    calls of a turn. Context variables, such as the seen URLs of a `search_run`, follow the call
+    into the worker thread.
+
+    Args:
+        max_concurrency (int | None): The maximum number of calls running at once, unbounded if None.
+        timeout (float | None): The seconds to wait for a call, no limit if None. A call that times out
+            cannot be interrupted, so it keeps its slot until its thread finishes.
+    """
+
+    def decorator(func: Callable[P, T]) -> Callable[P, Coroutine[Any, Any, T]]:
+        # asyncio semaphores are bound to the loop they are used on, so each loop gets its own
+        semaphores = (
+            LoopLocal(functools.partial(asyncio.Semaphore, max_concurrency)) if max_concurrency is not None else None
+        )
+
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+
+            semaphore = semaphores.get() if semaphores is not None else None
+            if semaphore is not None:
+                await semaphore.acquire()
+            try:
+                future = loop.run_in_executor(get_tool_executor(), call)
+            except BaseException:
+                if semaphore is not None:
+                    semaphore.release()
+                raise
+            if semaphore is not None:
+                future.add_done_callback(lambda _: semaphore.release())
+
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout)
+            except TimeoutError:
+                raise TimeoutError(f"{func.__name__} did not finish in {timeout}s") from None
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections.abc import Awaitable
+from collections.abc import Sequence
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import TypeVar
+
+from agents import Agent
+from agents import Model
+from agents import ModelSettings
+from agents import Runner
+from agents import Tool
+from agents import trace
+from loguru import logger
+
+from .agents import get_agent
+from .model import get_openai_model
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class ResearchPrompts:
+    """The prompts and output types of a research pipeline.
+
+    The plan type must have a `searches` list of items with `query` and `reason`, and the report type
+    a `markdown_report`, see `agentize.prompts.research` and `agentize.prompts.financial_research`.
+
+    Args:
+        name (str): The name of the workflow, used to name its trace and agents.
+        planner (str): The instructions of the agent that plans the searches.
+        plan_type (type[Any]): The output type of the planner.
+        search (str): The instructions of the agent that runs and summarizes one search.
+        writer (str): The instructions of the agent that writes the report, formatted with `lang` and `length`.
+        report_type (type[Any]): The output type of the writer.
+        verifier (str | None): The instructions of the agent that checks the report, no verification if None.
+        verification_type (type[Any] | None): The output type of the verifier.
+    """
+
+    name: str
+    planner: str
+    plan_type: type[Any]
+    search: str
+    writer: str
+    report_type: type[Any]
+    verifier: str | None = None
+    verification_type: type[Any] | None = None
+
+
+@dataclass(frozen=True)
+class ResearchSettings:
+    """The concurrency and deadlines of the stages of a research pipeline, in seconds or None for no limit.
+
+    Args:
+        plan_timeout (float | None): The deadline of planning. A failed plan falls back to searching the query.
+        search_concurrency (int): The maximum number of searches run at once.
+        search_timeout (float | None): The deadline of a single search.
+        search_deadline (float | None): The deadline of all searches, after which the unfinished ones are cancelled.
+        search_quorum (float): The share of searches after which the others only get `straggler_grace` more seconds.
+        straggler_grace (float | None): The seconds stragglers are waited for once the quorum is reached, or None
+            to wait for every search until `search_deadline`.
+        min_search_results (int): The minimum number of search summaries to write a report from.
+        write_timeout (float | None): The deadline of writing the report.
+        verify_timeout (float | None): The deadline of verifying the report.
+        lang (str): The working language of the report.
+        length (int): The minimum length of the report in words.
+    """
+
+    plan_timeout: float | None = 120.0
+    search_concurrency: int = 5
+    search_timeout: float | None = 90.0
+    search_deadline: float | None = 240.0
+    search_quorum: float = 0.8
+    straggler_grace: float | None = None
+    min_search_results: int = 1
+    write_timeout: float | None = 600.0
+    verify_timeout: float | None = 180.0
+    lang: str = "台灣繁體中文"
+    length: int = 1000
+
+
+@dataclass
+class StageTiming:
+    name: str
+    start: float
+    """The seconds from the start of the run to the start of the stage."""
+
+    duration: float = 0.0
+    completed: int = 0
+    failed: int = 0
+    cancelled: int = 0
+    """The tasks cancelled by a deadline."""
+
+    def __str__(self) -> str:
+        counts = f"{self.completed} ok, {self.failed} failed, {self.cancelled} cancelled"
+        return f"{self.name}: {self.duration:.2f}s at +{self.start:.2f}s ({counts})"
+
+
+@dataclass
+class ResearchResult:
+    """The outcome of a research run, which keeps whatever the stages produced before a failure.
+
+    Args:
+        query (str): The research query.
+        plan (Any | None): The search plan, None if planning failed.
+        search_results (list[str]): The summaries of the searches that finished, in the order of the plan.
+        report (Any | None): The report, None if it was not written.
+        verification (Any | None): The verification of the report, None if it was not verified.
+        timings (list[StageTiming]): The timing of every stage that ran, in order.
+        errors (list[str]): The failures of the stages.
+    """
+
+    query: str
+    plan: Any | None = None
+    search_results: list[str] = field(default_factory=list)
+    report: Any | None = None
+    verification: Any | None = None
+    timings: list[StageTiming] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.report is not None and not self.errors
+
+    @property
+    def elapsed(self) -> float:
+        return sum(timing.duration for timing in self.timings)
+
+
+def _describe(error: BaseException) -> str:
+    if isinstance(error, TimeoutError):
+        return "TimeoutError: deadline exceeded"
+    return f"{type(error).__name__}: {error}"
+
+
+class ResearchPipeline:
+    """A plan, search, write and verify research workflow with per-stage concurrency and deadlines.
+
+    The searches of the plan run concurrently up to `search_concurrency`. At `search_deadline`, or
+    `straggler_grace` seconds after `search_quorum` of them have finished if a grace is set, the
+    stragglers are cancelled and the report is written from the summaries at hand. A failed stage
+    does not lose the work of the previous ones: `run` returns a `ResearchResult` with the partial
+    results, the errors and the timing of every stage.
+
+    Args:
+        prompts (ResearchPrompts): The prompts and output types of the workflow.
+        settings (ResearchSettings | None): The concurrency and deadlines, the defaults if None.
+        search_tools (Sequence[Tool]): The tools the search agent must use.
+        writer_tools (Sequence[Tool]): The tools of the writer agent, e.g. to publish the report.
+        reasoning_model (Model | None): The model that plans, writes and verifies, o3-mini if None.
+        search_model (Model | None): The model that searches, gpt-4.1 if None.
+    """
+
+    def __init__(
+        self,
+        prompts: ResearchPrompts,
+        settings: ResearchSettings | None = None,
+        search_tools: Sequence[Tool] = (),
+        writer_tools: Sequence[Tool] = (),
+        reasoning_model: Model | None = None,
+        search_model: Model | None = None,
+    ) -> None:
+        self.prompts = prompts
+        self.settings = settings or ResearchSettings()
+        self.search_tools = list(search_tools)
+        self.writer_tools = list(writer_tools)
+        # models are created once, so the registry shares the agents between runs
+        self.reasoning_model = reasoning_model or get_openai_model("o3-mini", "chat_completions")
+        self.search_model = search_model or get_openai_model("gpt-4.1")
+
+    def _agent(
+        self, role: str, instructions: str, model: Model, tools: Sequence[Tool] = (), output_type: Any = None
+    ) -> Agent:
+        return get_agent(
+            name=f"{self.prompts.name}_{role}_agent",
+            instructions=instructions,
+            model=model,
+            tools=tools,
+            model_settings=ModelSettings(tool_choice="required") if tools else None,
+            output_type=output_type,
+        )
+
+    async def _run_stage(
+        self, result: ResearchResult, name: str, work: Awaitable[T], timeout: float | None
+    ) -> T | None:
+        started = time.perf_counter()
+        timing = StageTiming(name, start=result.elapsed)
+        result.timings.append(timing)
+        try:
+            output = await asyncio.wait_for(work, timeout)
+        except Exception as e:
+            logger.warning(f"Research stage {name} failed: {_describe(e)}")
+            result.errors.append(f"{name}: {_describe(e)}")
+            timing.failed = 1
+            return None
+        finally:
+            timing.duration = time.perf_counter() - started
+        timing.completed = 1
+        return output
+
+    async def plan(self, query: str) -> Any:
+        agent = self._agent("planner", self.prompts.planner, self.reasoning_model, output_type=self.prompts.plan_type)
+        result = await Runner.run(agent, f"Query: {query}")
+        return result.final_output_as(self.prompts.plan_type)
+
+    async def search(self, query: str, reason: str) -> str:
+        agent = self._agent("search", self.prompts.search, self.search_model, tools=self.search_tools)
+        result = await Runner.run(agent, f"Search term: {query}\nReason: {reason}")
+        return str(result.final_output)
+
+    async def _search_all(self, searches: Sequence[tuple[str, str]], timing: StageTiming) -> list[str]:
+        settings = self.settings
+        semaphore = asyncio.Semaphore(settings.search_concurrency)
+
+        async def search_one(query: str, reason: str) -> str:
+            async with semaphore:
+                return await asyncio.wait_for(self.search(query, reason), settings.search_timeout)
+
+        tasks = [asyncio.create_task(search_one(query, reason)) for query, reason in searches]
+        loop = asyncio.get_running_loop()
+        deadline = None if settings.search_deadline is None else loop.time() + settings.search_deadline
+        quorum = math.ceil(len(tasks) * settings.search_quorum)
+        pending = set(tasks)
+        try:
+            while pending:
+                timeout = None if deadline is None else max(deadline - loop.time(), 0)
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                if len(tasks) - len(pending) >= quorum and settings.straggler_grace is not None:
+                    grace_end = loop.time() + settings.straggler_grace
+                    deadline = grace_end if deadline is None else min(deadline, grace_end)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        results = []
+        dropped = []
+        for task, (query, _) in zip(tasks, searches, strict=True):
+            if task.cancelled():
+                timing.cancelled += 1
+                dropped.append(query)
+            elif (error := task.exception()) is not None:
+                logger.info(f"Search for {query!r} failed: {_describe(error)}")
+                timing.failed += 1
+            else:
+                timing.completed += 1
+                results.append(task.result())
+        if dropped:
+            logger.warning(f"Dropped {len(dropped)} unfinished searches at the deadline: {dropped}")
+        return results
+
+    async def _search_stage(self, result: ResearchResult, searches: Sequence[tuple[str, str]]) -> None:
+        started = time.perf_counter()
+        timing = StageTiming("search", start=result.elapsed)
+        result.timings.append(timing)
+        try:
+            result.search_results = await self._search_all(searches, timing)
+        finally:
+            timing.duration = time.perf_counter() - started
+
+        if timing.failed or timing.cancelled:
+            logger.info(f"Continuing with {timing.completed} of {len(searches)} searches")
+        if timing.completed < self.settings.min_search_results:
+            result.errors.append(f"search: {timing.completed} of {len(searches)} searches finished")
+
+    async def write(self, query: str, search_results: Sequence[str]) -> Any:
+        instructions = self.prompts.writer.format(lang=self.settings.lang, length=self.settings.length)
+        agent = self._agent(
+            "writer", instructions, self.reasoning_model, tools=self.writer_tools, output_type=self.prompts.report_type
+        )
+        result = await Runner.run(agent, f"Original query: {query}\nSummarized search results: {list(search_results)}")
+        return result.final_output_as(self.prompts.report_type)
+
+    async def verify(self, report: Any) -> Any:
+        assert self.prompts.verifier is not None and self.prompts.verification_type is not None
+        agent = self._agent(
+            "verifier", self.prompts.verifier, self.reasoning_model, output_type=self.prompts.verification_type
+        )
+        result = await Runner.run(agent, report.markdown_report)
+        return result.final_output_as(self.prompts.verification_type)
+
+    async def run(self, query: str) -> ResearchResult:
+        """Research the query and return the report with the results and timing of every stage.
+
+        Stage failures and deadlines are recorded in the result instead of raised. If planning fails the
+        query itself is searched, and a report is written only from at least `min_search_results` searches.
+        """
+        settings = self.settings
+        result = ResearchResult(query)
+        with trace(f"{self.prompts.name} workflow"):
+            result.plan = await self._run_stage(result, "plan", self.plan(query), settings.plan_timeout)
+            if result.plan is not None:
+                searches = [(item.query, item.reason) for item in result.plan.searches]
+            else:
+                searches = [(query, "The original query, since planning the searches failed.")]
+            logger.info(f"Running {len(searches)} searches")
+
+            await self._search_stage(result, searches)
+            if len(result.search_results) >= settings.min_search_results:
+                write = self.write(query, result.search_results)
+                result.report = await self._run_stage(result, "write", write, settings.write_timeout)
+
+            if result.report is not None and self.prompts.verifier is not None:
+                verify = self.verify(result.report)
+                result.verification = await self._run_stage(result, "verify", verify, settings.verify_timeout)
+
+        logger.info(f"Research of {query!r} took {result.elapsed:.2f}s: " + "; ".join(map(str, result.timings)))
+        return result
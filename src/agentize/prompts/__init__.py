@@ -1,2 +1,3 @@
 from .summary import summarize
+from .summary import summarize_hierarchical
 from .summary import summarize_tool
@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 
+from ..pipeline import ResearchPrompts
+
 # A sub‑agent focused on analyzing a company's fundamentals.
 FINANCIALS_PROMPT = (
     "You are a financial analyst focused on company fundamentals such as revenue, "
@@ -91,3 +93,15 @@ class VerificationResult(BaseModel):
 
     issues: str
     """If not verified, describe the main issues or concerns."""
+
+
+FINANCIAL_RESEARCH_PROMPTS = ResearchPrompts(
+    name="financial",
+    planner=PLANNER_PROMPT,
+    plan_type=FinancialSearchPlan,
+    search=SEARCH_PROMPT,
+    writer=WRITER_PROMPT,
+    report_type=FinancialReportData,
+    verifier=VERIFIER_PROMPT,
+    verification_type=VerificationResult,
+)
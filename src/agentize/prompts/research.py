@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 
+from ..pipeline import ResearchPrompts
+
 PLANNER_PROMPT = (
     "You are a helpful research assistant. Given a query, come up with a set of web searches"
     "to perform to best answer the query. Output between 5 and 20 terms to query for."
@@ -51,3 +53,13 @@ class ReportData(BaseModel):
 
     publish_link: str
     """The link to the published report on telegraph."""
+
+
+RESEARCH_PROMPTS = ResearchPrompts(
+    name="research",
+    planner=PLANNER_PROMPT,
+    plan_type=WebSearchPlan,
+    search=SEARCH_PROMPT,
+    writer=WRITER_PROMPT,
+    report_type=ReportData,
+)
@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
+from itertools import pairwise
+
 from agents import function_tool
+from loguru import logger
 from pydantic import BaseModel
 
+from ..compaction import truncate
 from ..lazy import lazy_run
+from ..lazy import lazy_run_many
+from ..text import split_markdown
+from ..utils import estimate_tokens
 
 INSTRUCTIONS = """
 Please generate the following in {lang} based on the provided content:
@@ -22,6 +30,17 @@ Please generate the following in {lang} based on the provided content:
 *Optional: If the subject matter is sensitive or controversial, ensure factual accuracy and neutral tone in your summary and insights.*
 """  # noqa
 
+REDUCE_INSTRUCTIONS = (
+    """
+The content consists of partial summaries of consecutive parts of one long document, in their original order.
+Combine them into a single result for the whole document, as if you had read it in full.
+"""
+    + INSTRUCTIONS
+)
+
+# documents longer than this are summarized chunk by chunk and the partial summaries merged
+CHUNK_TOKENS = 12_000
+
 
 class Step(BaseModel):
     explanation: str
@@ -61,6 +80,9 @@ async def summarize(text: str, lang: str, length: int = 200) -> Summary:
         lang (str): The language to use for the summary.
         length (int): The maximum length of the summary in words.
     """
+    if estimate_tokens(text) > CHUNK_TOKENS:
+        return await summarize_hierarchical(text, lang, length=length)
+
     return await lazy_run(
         input=text,
         instructions=INSTRUCTIONS.format(lang=lang, length=length),
@@ -68,4 +90,88 @@ async def summarize(text: str, lang: str, length: int = 200) -> Summary:
     )
 
 
+async def summarize_hierarchical(
+    text: str,
+    lang: str,
+    length: int = 200,
+    chunk_tokens: int = CHUNK_TOKENS,
+    concurrency: int = 8,
+) -> Summary:
+    """Summarize a text of any length with map-reduce.
+
+    The text is split into chunks on markdown boundaries and the chunks are summarized concurrently.
+    The partial summaries are then merged in groups that fit in a chunk, repeatedly, until a single
+    summary is left. Wall-clock time grows with the depth of the reduction, not the length of the text.
+
+    Args:
+        text (str): The text to summarize.
+        lang (str): The language to use for the summary.
+        length (int): The maximum length of the summary in words.
+        chunk_tokens (int): The maximum number of tokens sent in one request.
+        concurrency (int): The maximum number of requests in flight.
+    """
+    chunks = split_markdown(text, chunk_tokens)
+    if len(chunks) <= 1:
+        return await lazy_run(
+            input=text,
+            instructions=INSTRUCTIONS.format(lang=lang, length=length),
+            output_type=Summary,
+        )
+
+    logger.debug(f"Summarizing {len(chunks)} chunks")
+    summaries = await _summarize_many(chunks, INSTRUCTIONS.format(lang=lang, length=length), concurrency)
+
+    reduce_instructions = REDUCE_INSTRUCTIONS.format(lang=lang, length=length)
+    while True:
+        groups = _group_summaries(summaries, chunk_tokens)
+        if len(groups) == 1:
+            return await lazy_run(input=groups[0], instructions=reduce_instructions, output_type=Summary)
+
+        logger.debug(f"Merging {len(summaries)} summaries in {len(groups)} groups")
+        summaries = await _summarize_many(groups, reduce_instructions, concurrency)
+
+
+async def _summarize_many(inputs: Sequence[str], instructions: str, concurrency: int) -> list[Summary]:
+    summaries = []
+    errors = []
+    async for result in lazy_run_many(inputs, instructions=instructions, output_type=Summary, concurrency=concurrency):
+        if result.ok and result.output is not None:
+            summaries.append(result.output)
+        else:
+            logger.warning(f"Failed to summarize part {result.index + 1} of {len(inputs)}: {result.error}")
+            errors.append(result.error)
+
+    # a few missing parts still leave a useful summary, but not every part
+    if not summaries:
+        assert errors[0] is not None
+        raise errors[0]
+    return summaries
+
+
+def _format_partial(index: int, summary: Summary) -> str:
+    insights = "\n".join(f"- {insight.strip()}" for insight in summary.insights)
+    return f"## Part {index}\n\n{summary.summary.strip()}\n\n{insights}\n\n{' '.join(summary.hashtags)}\n\n"
+
+
+def _group_summaries(summaries: Sequence[Summary], max_tokens: int) -> list[str]:
+    """Pack the partial summaries, in order, into inputs of at most `max_tokens` tokens.
+
+    Every group needs at least two summaries to merge, or the reduction would never finish, so if no two
+    neighbouring summaries fit in one input together, they are all cut to half of it.
+    """
+    partials = [truncate(_format_partial(index, summary), max_tokens) for index, summary in enumerate(summaries, 1)]
+    if len(partials) > 1 and all(estimate_tokens(a + b) > max_tokens for a, b in pairwise(partials)):
+        partials = [truncate(partial, max_tokens // 2) for partial in partials]
+
+    groups: list[str] = []
+    current = ""
+    for partial in partials:
+        if current and estimate_tokens(current + partial) > max_tokens:
+            groups.append(current)
+            current = ""
+        current += partial
+    groups.append(current)
+    return groups
+
+
 summarize_tool = function_tool(summarize)
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+from typing import Literal
+
+from agents import Model
+from agents import ModelResponse
+from agents import OpenAIChatCompletionsModel
+from agents import OpenAIResponsesModel
+from loguru import logger
+from openai import APIConnectionError
+from openai import APIStatusError
+
+from .metrics import InstrumentedModel
+from .model import HTTPSettings
+from .model import get_openai_client
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether another endpoint may succeed where this one failed: connection errors, 429 and 5xx."""
+    if isinstance(error, APIConnectionError):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+@dataclass
+class Endpoint:
+    name: str
+    model: Model
+    weight: float = 1.0
+
+    @classmethod
+    def from_openai(
+        cls,
+        name: str,
+        model: str,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        api_type: Literal["responses", "chat_completions"] = "chat_completions",
+        http_settings: HTTPSettings | None = None,
+        weight: float = 1.0,
+    ) -> Endpoint:
+        """Create an endpoint for an OpenAI-compatible deployment.
+
+        The client does not retry on its own, so a failing request moves on to the next endpoint at once.
+        """
+        client = get_openai_client(base_url=base_url, api_key=api_key, http_settings=http_settings)
+        client = client.with_options(max_retries=0)
+
+        match api_type:
+            case "responses":
+                return cls(name, InstrumentedModel(OpenAIResponsesModel(model, openai_client=client)), weight=weight)
+            case "chat_completions":
+                return cls(
+                    name, InstrumentedModel(OpenAIChatCompletionsModel(model, openai_client=client)), weight=weight
+                )
+            case _:
+                raise ValueError(f"Invalid API type: {api_type}. Use 'responses' or 'chat_completions'.")
+
+
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    failures: int = 0
+    in_flight: int = 0
+    latency: float | None = None
+    """The EWMA of successful request latency in seconds."""
+
+    error_rate: float = 0.0
+    """The EWMA of the failure indicator, between 0 and 1."""
+
+    consecutive_failures: int = 0
+    opened_at: float | None = None
+    """When the circuit breaker opened, None while the endpoint is healthy."""
+
+    @property
+    def healthy(self) -> bool:
+        return self.opened_at is None
+
+
+class RouterModel(Model):
+    """A model that spreads requests across several OpenAI-compatible endpoints.
+
+    Each request goes to the healthy endpoint with the lowest expected cost, estimated from an EWMA
+    of its latency and error rate and from the requests already in flight. Connection errors, 429
+    and 5xx responses fail over to the next endpoint transparently. An endpoint that fails
+    `failure_threshold` times in a row is ejected for `cooldown` seconds, then receives one trial
+    request before it is trusted again.
+
+    Args:
+        endpoints (Sequence[Endpoint]): The endpoints to route between.
+        alpha (float): The EWMA smoothing factor of latency and error rate.
+        failure_threshold (int): The consecutive failures that open an endpoint's circuit.
+        cooldown (float): The seconds an open circuit waits before a trial request.
+        model (str | None): The model name reported to caches, defaults to the first endpoint's model.
+    """
+
+    def __init__(
+        self,
+        endpoints: Sequence[Endpoint],
+        alpha: float = 0.2,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        model: str | None = None,
+    ) -> None:
+        if not endpoints:
+            raise ValueError("RouterModel needs at least one endpoint")
+
+        self.endpoints = list(endpoints)
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.model = model or str(getattr(self.endpoints[0].model, "model", self.endpoints[0].name))
+        self._stats = {endpoint.name: EndpointStats() for endpoint in self.endpoints}
+
+    def stats(self) -> dict[str, EndpointStats]:
+        return self._stats
+
+    def _is_available(self, endpoint: Endpoint, now: float) -> bool:
+        stats = self._stats[endpoint.name]
+        if stats.opened_at is None:
+            return True
+        # half-open: a single trial request once the cooldown is over
+        return now - stats.opened_at >= self.cooldown and stats.in_flight == 0
+
+    def _score(self, endpoint: Endpoint) -> float:
+        stats = self._stats[endpoint.name]
+        if stats.latency is None:
+            # unmeasured endpoints go first so every endpoint gets a latency estimate
+            return stats.in_flight
+        return stats.latency * (1 + 4 * stats.error_rate) * (1 + stats.in_flight) / endpoint.weight
+
+    def select(self, exclude: set[str] | None = None) -> list[Endpoint]:
+        """Return the candidate endpoints for a request, best first."""
+        exclude = exclude or set()
+        now = time.monotonic()
+        candidates = [e for e in self.endpoints if e.name not in exclude]
+        available = [e for e in candidates if self._is_available(e, now)]
+        if available:
+            return sorted(available, key=self._score)
+        # every circuit is open, so try the endpoint that has been resting the longest
+        return sorted(candidates, key=lambda e: self._stats[e.name].opened_at or 0.0)
+
+    def _record_success(self, endpoint: Endpoint, latency: float) -> None:
+        stats = self._stats[endpoint.name]
+        stats.latency = latency if stats.latency is None else self.alpha * latency + (1 - self.alpha) * stats.latency
+        stats.error_rate = (1 - self.alpha) * stats.error_rate
+        stats.consecutive_failures = 0
+        if stats.opened_at is not None:
+            logger.info(f"Endpoint {endpoint.name} recovered")
+        stats.opened_at = None
+
+    def _record_failure(self, endpoint: Endpoint, error: Exception) -> None:
+        stats = self._stats[endpoint.name]
+        stats.failures += 1
+        stats.error_rate = self.alpha + (1 - self.alpha) * stats.error_rate
+        stats.consecutive_failures += 1
+        if stats.opened_at is not None or stats.consecutive_failures >= self.failure_threshold:
+            if stats.opened_at is None:
+                logger.warning(
+                    f"Ejecting endpoint {endpoint.name} after {stats.consecutive_failures} failures: {error}"
+                )
+            stats.opened_at = time.monotonic()
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        tried: set[str] = set()
+        last_error: Exception | None = None
+        while len(tried) < len(self.endpoints):
+            endpoint = self.select(exclude=tried)[0]
+            tried.add(endpoint.name)
+
+            stats = self._stats[endpoint.name]
+            stats.requests += 1
+            stats.in_flight += 1
+            start = time.perf_counter()
+            try:
+                response = await endpoint.model.get_response(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                self._record_failure(endpoint, e)
+                logger.info(f"Endpoint {endpoint.name} failed, failing over: {e}")
+                last_error = e
+                continue
+            finally:
+                stats.in_flight -= 1
+
+            self._record_success(endpoint, time.perf_counter() - start)
+            return response
+
+        assert last_error is not None
+        raise last_error
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        tried: set[str] = set()
+        last_error: Exception | None = None
+        while len(tried) < len(self.endpoints):
+            endpoint = self.select(exclude=tried)[0]
+            tried.add(endpoint.name)
+
+            stats = self._stats[endpoint.name]
+            stats.requests += 1
+            stats.in_flight += 1
+            start = time.perf_counter()
+            started = False
+            try:
+                async for event in endpoint.model.stream_response(*args, **kwargs):
+                    if not started:
+                        # only the time to the first event says something about the endpoint
+                        started = True
+                        self._record_success(endpoint, time.perf_counter() - start)
+                    yield event
+            except Exception as e:
+                # once events have been yielded the stream cannot be replayed elsewhere
+                if started or not is_retryable(e):
+                    raise
+                self._record_failure(endpoint, e)
+                logger.info(f"Endpoint {endpoint.name} failed, failing over: {e}")
+                last_error = e
+                continue
+            finally:
+                stats.in_flight -= 1
+            return
+
+        assert last_error is not None
+        raise last_error
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import cache
+from io import BytesIO
+from pathlib import PurePosixPath
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+import ua_generator
+from aiolimiter import AsyncLimiter
+
+from .boilerplate import clean_markdown
+from .cache import ScrapeCache
+from .cache import ScrapeEntry
+from .cache import get_scrape_cache
+from .model import HTTPSettings
+from .model import LoopAwareTransport
+from .utils import LoopLocal
+
+# the concurrency and rate limits of requests to one host
+HostLimits = tuple[asyncio.Semaphore, AsyncLimiter | None]
+
+
+@dataclass(frozen=True)
+class ScraperSettings:
+    """Connection and concurrency limits of the scraper.
+
+    Args:
+        max_connections (int): The maximum number of open connections.
+        max_connections_per_host (int): The maximum number of requests in flight to one host.
+        requests_per_second_per_host (float | None): The maximum request rate to one host, unlimited if None.
+        connect_timeout (float): The seconds to wait for a connection.
+        read_timeout (float): The seconds to wait for a response.
+        max_bytes (int): The maximum size of a downloaded document.
+        clean (bool): Remove navigation, banners, images and other boilerplate from the converted markdown.
+    """
+
+    max_connections: int = 100
+    max_connections_per_host: int = 4
+    requests_per_second_per_host: float | None = 5.0
+    connect_timeout: float = 10.0
+    read_timeout: float = 30.0
+    max_bytes: int = 20 * 1024 * 1024
+    clean: bool = True
+
+    @property
+    def http_settings(self) -> HTTPSettings:
+        return HTTPSettings(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+            connect_timeout=self.connect_timeout,
+            read_timeout=self.read_timeout,
+        )
+
+
+@dataclass
+class Page:
+    url: str
+    """The URL the document was served from, after redirects."""
+
+    status_code: int
+    content: bytes
+    content_type: str | None = None
+    charset: str | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    cacheable: bool = True
+    """False if the server asked not to store the document (Cache-Control: no-store)."""
+
+
+@dataclass
+class ScrapeResult:
+    url: str
+    markdown: str | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class Scraper:
+    """A shared async scraper that converts web pages to markdown.
+
+    Connections are pooled and kept alive per event loop, the number of requests in flight to a
+    single host is bounded in number and rate, and the CPU-bound conversion to markdown runs in a worker thread so it
+    never blocks the event loop. With a cache, fresh documents skip both the download and the
+    conversion, and stale ones are revalidated with a conditional request.
+
+    Args:
+        settings (ScraperSettings | None): The limits of the scraper, the defaults if None.
+        cache (ScrapeCache | None): The cache of converted documents, no caching if None.
+    """
+
+    def __init__(self, settings: ScraperSettings | None = None, cache: ScrapeCache | None = None) -> None:
+        self.settings = settings or ScraperSettings()
+        self.cache = cache
+        user_agent = ua_generator.generate(
+            device="desktop",
+            platform=("windows", "macos"),
+            browser=("chrome", "edge", "firefox", "safari"),
+        )
+        http_settings = self.settings.http_settings
+        self._transport = LoopAwareTransport(http_settings)
+        self.client = httpx.AsyncClient(
+            transport=self._transport,
+            headers=user_agent.headers.get(),
+            timeout=http_settings.timeout,
+            follow_redirects=True,
+        )
+        self._host_limits: LoopLocal[dict[str, HostLimits]] = LoopLocal(dict)
+        self._markitdown: Any = None
+
+    def _get_host_limits(self, host: str) -> HostLimits:
+        # limits are bound to the loop they are first used on, like the pooled connections
+        host_limits = self._host_limits.get()
+        limits = host_limits.get(host)
+        if limits is None:
+            rate = self.settings.requests_per_second_per_host
+            limits = host_limits[host] = (
+                asyncio.Semaphore(self.settings.max_connections_per_host),
+                AsyncLimiter(rate, 1) if rate else None,
+            )
+        return limits
+
+    async def fetch(self, url: str, headers: dict[str, str] | None = None) -> Page:
+        """Download a document.
+
+        Raises:
+            httpx.HTTPError: If the request fails or the response status is an error.
+            ValueError: If the document is larger than `max_bytes`.
+        """
+        semaphore, limiter = self._get_host_limits(urlsplit(url).netloc.lower())
+        if limiter is not None:
+            await limiter.acquire()
+
+        async with semaphore, self.client.stream("GET", url, headers=headers) as response:
+            # a 304 answers a conditional request, it is not an error
+            if response.status_code != 304:
+                response.raise_for_status()
+
+            buffer = bytearray()
+            async for chunk in response.aiter_bytes():
+                buffer.extend(chunk)
+                if len(buffer) > self.settings.max_bytes:
+                    raise ValueError(f"Document is larger than {self.settings.max_bytes} bytes: {url}")
+
+        content_type = response.headers.get("content-type")
+        return Page(
+            url=str(response.url),
+            status_code=response.status_code,
+            content=bytes(buffer),
+            content_type=content_type.split(";")[0].strip() if content_type else None,
+            charset=response.charset_encoding,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            cacheable="no-store" not in response.headers.get("cache-control", "").lower(),
+        )
+
+    def _get_markitdown(self) -> Any:
+        if self._markitdown is None:
+            try:
+                from markitdown import MarkItDown
+            except ImportError as e:
+                raise ImportError(
+                    "MarkItDown is not installed. Please install it with `pip install agentize[markitdown]`."
+                ) from e
+            self._markitdown = MarkItDown(enable_plugins=False)
+        return self._markitdown
+
+    def _convert(self, page: Page) -> str:
+        from markitdown import MarkItDownException
+        from markitdown import StreamInfo
+
+        stream_info = StreamInfo(
+            mimetype=page.content_type,
+            charset=page.charset,
+            extension=PurePosixPath(urlsplit(page.url).path).suffix or None,
+            url=page.url,
+        )
+        try:
+            markdown = self._get_markitdown().convert_stream(BytesIO(page.content), stream_info=stream_info).markdown
+        except MarkItDownException as e:
+            raise ValueError(f"Cannot convert {page.content_type or 'the document'} to markdown: {page.url}") from e
+        return clean_markdown(markdown) if self.settings.clean else markdown
+
+    async def convert(self, page: Page) -> str:
+        """Convert a downloaded document to markdown in a worker thread, without its boilerplate unless disabled.
+
+        Raises:
+            ValueError: If MarkItDown cannot convert the document, e.g. an unsupported binary format.
+        """
+        self._get_markitdown()
+        return await asyncio.to_thread(self._convert, page)
+
+    async def scrape(self, url: str) -> str:
+        """Download a document and convert it to markdown, answering from the cache when possible."""
+        if self.cache is None:
+            return await self.convert(await self.fetch(url))
+
+        entry = self.cache.get(url)
+        if entry is not None and self.cache.is_fresh(entry):
+            return entry.markdown
+
+        page = await self.fetch(url, headers=entry.conditional_headers() if entry is not None else None)
+        if page.status_code == 304 and entry is not None:
+            self.cache.stats.revalidations += 1
+            entry.fetched_at = time.time()
+            self.cache.set(entry)
+            return entry.markdown
+
+        markdown = await self.convert(page)
+        if page.cacheable:
+            self.cache.set(ScrapeEntry(url, markdown, etag=page.etag, last_modified=page.last_modified))
+        return markdown
+
+    async def scrape_many(self, urls: Sequence[str], concurrency: int = 16) -> list[ScrapeResult]:
+        """Scrape many URLs concurrently and return the results in order.
+
+        Requests to the same host still obey the per-host limits of the scraper, and a failed URL is
+        reported in its result instead of failing the batch.
+
+        Args:
+            urls (Sequence[str]): The URLs to scrape. Duplicates are fetched once.
+            concurrency (int): The maximum number of URLs scraped at once.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def scrape_one(url: str) -> ScrapeResult:
+            async with semaphore:
+                try:
+                    return ScrapeResult(url, markdown=await self.scrape(url))
+                except (httpx.HTTPError, ValueError) as e:
+                    return ScrapeResult(url, error=f"{type(e).__name__}: {e}")
+
+        unique_urls = list(dict.fromkeys(urls))
+        results = await asyncio.gather(*(scrape_one(url) for url in unique_urls))
+        by_url = dict(zip(unique_urls, results, strict=True))
+        return [by_url[url] for url in urls]
+
+    async def aclose(self) -> None:
+        """Close the connections pooled on the running event loop."""
+        await self._transport.aclose()
+
+
+@cache
+def get_scraper() -> Scraper:
+    return Scraper(cache=get_scrape_cache())
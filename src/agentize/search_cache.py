@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Iterator
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cache
+from typing import Any
+from urllib.parse import urlsplit
+from urllib.parse import urlunsplit
+
+from .cache import CacheStats
+from .cache import MemoryTier
+
+
+class _AbandonedSearchError(Exception):
+    """The search a caller waited for was cancelled before it finished."""
+
+
+_seen_urls: ContextVar[set[str] | None] = ContextVar("seen_urls", default=None)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so that queries differing only in case and whitespace share a cache entry.
+
+    Word order, stop words and punctuation change what a search engine returns, so they are kept.
+    """
+    return " ".join(query.casefold().split())
+
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+@contextmanager
+def search_run() -> Iterator[set[str]]:
+    """Deduplicate search results by URL across every search made in the block.
+
+    Tasks and threads started inside the block share the same set of seen URLs.
+    """
+    token = _seen_urls.set(set())
+    try:
+        yield _seen_urls.get() or set()
+    finally:
+        _seen_urls.reset(token)
+
+
+def dedupe_results(results: list[dict[str, Any]], url_key: str = "url") -> list[dict[str, Any]]:
+    """Drop the results whose URL was already returned by a search in the current `search_run`."""
+    seen = _seen_urls.get()
+    if seen is None:
+        return results
+
+    unique = []
+    for result in results:
+        url = result.get(url_key)
+        if not isinstance(url, str):
+            unique.append(result)
+            continue
+
+        key = normalize_url(url)
+        if key not in seen:
+            seen.add(key)
+            unique.append(result)
+    return unique
+
+
+class SearchCache:
+    """An in-process TTL cache of search results with in-flight coalescing.
+
+    Queries are normalized before lookup, and concurrent searches for the same normalized query
+    (from tasks or threads) wait for a single request instead of each sending their own.
+
+    Args:
+        ttl (float): The seconds a search result is reused.
+        max_entries (int): The maximum number of search results kept.
+    """
+
+    def __init__(self, ttl: float = 10 * 60, max_entries: int = 1024) -> None:
+        self.ttl = ttl
+        self.memory = MemoryTier(max_entries=max_entries)
+        self.stats = CacheStats()
+        self._in_flight: dict[str, Future[bytes]] = {}
+        self._lock = threading.Lock()
+
+    def make_key(self, source: str, query: str | None = None, **params: Any) -> str:
+        """Build the key of a search from its source, its free-text query and its other parameters.
+
+        The query is normalized first. Searches made only of parameters, such as a route, leave it None.
+        """
+        query = normalize_query(query) if query is not None else None
+        return json.dumps([source, query, params], sort_keys=True, ensure_ascii=False)
+
+    def _lookup(self, key: str) -> tuple[bytes | None, Future[bytes], bool]:
+        """Return the cached value, or the future of the search in flight and whether the caller leads it."""
+        with self._lock:
+            value = self.memory.get(key)
+            if value is not None:
+                self.stats.memory_hits += 1
+                return value, Future(), False
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.stats.coalesced += 1
+                return None, future, False
+
+            self.stats.misses += 1
+            future = self._in_flight[key] = Future()
+            return None, future, True
+
+    def _store(self, key: str, future: Future[bytes], result: Any) -> None:
+        value = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        self.stats.bytes_written += len(value)
+        self.stats.evictions += self.memory.set(key, value, expires_at=time.time() + self.ttl)
+        with self._lock:
+            self._in_flight.pop(key, None)
+        future.set_result(value)
+
+    def _fail(self, key: str, future: Future[bytes], error: BaseException) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        # a cancelled leader says nothing about the search, so the waiters retry instead of failing with it
+        future.set_exception(error if isinstance(error, Exception) else _AbandonedSearchError())
+
+    def search(self, key: str, search: Callable[[], Any]) -> Any:
+        """Return the cached result of the key, calling `search` on a miss."""
+        while True:
+            value, future, leader = self._lookup(key)
+            if value is not None:
+                return json.loads(value)
+            if leader:
+                break
+            try:
+                return json.loads(future.result())
+            except _AbandonedSearchError:
+                continue
+
+        try:
+            result = search()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        self._store(key, future, result)
+        return result
+
+    async def asearch(self, key: str, search: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached result of the key, awaiting `search` on a miss."""
+        while True:
+            value, future, leader = self._lookup(key)
+            if value is not None:
+                return json.loads(value)
+            if leader:
+                break
+            try:
+                # shielded, so a cancelled waiter does not cancel the future shared with the others
+                shared = await asyncio.shield(asyncio.wrap_future(future))
+            except _AbandonedSearchError:
+                continue
+            return json.loads(shared)
+
+        try:
+            result = await search()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        self._store(key, future, result)
+        return result
+
+    def clear(self) -> None:
+        self.memory.clear()
+
+
+@cache
+def get_search_cache() -> SearchCache:
+    return SearchCache()
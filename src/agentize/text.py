@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Callable
+
+from .utils import CHARS_PER_TOKEN
+from .utils import estimate_tokens
+
+_HEADING = re.compile(r"(#{1,6})\s")
+_FENCE = re.compile(r"\s{0,3}(```|~~~)")
+
+# boundary ranks, lower ranks are preferred split points: headings by level, then paragraphs, then lines
+_PARAGRAPH = 7
+_LINE = 8
+
+
+def _boundary_ranks(lines: list[str]) -> list[int]:
+    """Rank the boundary before every line by how good a split point it is."""
+    ranks = []
+    in_fence = False
+    previous_blank = True
+    for line in lines:
+        rank = _LINE
+        if not in_fence:
+            heading = _HEADING.match(line)
+            if heading is not None:
+                rank = len(heading.group(1))
+            elif previous_blank and line.strip():
+                rank = _PARAGRAPH
+
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        previous_blank = not line.strip()
+        ranks.append(rank)
+    return ranks
+
+
+def _split_line(line: str, max_tokens: int, length: Callable[[str], int]) -> list[str]:
+    pieces = []
+    while line:
+        size = min(len(line), max_tokens * CHARS_PER_TOKEN)
+        while size > 1 and length(line[:size]) > max_tokens:
+            size = max(1, size * max_tokens // length(line[:size]))
+        pieces.append(line[:size])
+        line = line[size:]
+    return pieces
+
+
+def split_markdown(text: str, max_tokens: int, length: Callable[[str], int] = estimate_tokens) -> list[str]:
+    """Split markdown text into chunks of at most `max_tokens` tokens on structure boundaries.
+
+    Sections are split at their highest-level headings first, then at paragraphs and lines, and a
+    single line longer than the budget is cut into pieces. Headings inside code fences are ignored.
+    Small neighbouring pieces are packed into the same chunk, and joining the chunks gives the text back.
+
+    Args:
+        text (str): The markdown text to split.
+        max_tokens (int): The maximum number of tokens of a chunk.
+        length (Callable[[str], int]): Counts the tokens of a text, estimated without a tokenizer by default.
+    """
+    if max_tokens < 1:
+        raise ValueError(f"max_tokens must be at least 1, got: {max_tokens}")
+
+    lines = text.splitlines(keepends=True)
+    ranks = _boundary_ranks(lines)
+    tokens = [length(line) for line in lines]
+
+    def split(start: int, end: int) -> list[str]:
+        if sum(tokens[start:end]) <= max_tokens:
+            return ["".join(lines[start:end])]
+        if end - start == 1:
+            return _split_line(lines[start], max_tokens, length)
+
+        best = min(ranks[start + 1 : end])
+        bounds = [start] + [i for i in range(start + 1, end) if ranks[i] == best] + [end]
+        pieces = []
+        for lo, hi in zip(bounds, bounds[1:], strict=False):
+            pieces.extend(split(lo, hi))
+        return _pack(pieces, max_tokens, length)
+
+    return [chunk for chunk in split(0, len(lines)) if chunk] if lines else []
+
+
+def _pack(pieces: list[str], max_tokens: int, length: Callable[[str], int]) -> list[str]:
+    """Greedily merge neighbouring pieces while they fit in the budget."""
+    chunks: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+    for piece in pieces:
+        piece_tokens = length(piece)
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append("".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append("".join(current))
+    return chunks
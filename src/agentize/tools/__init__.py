@@ -1,14 +1,31 @@
+from .boto3 import UploadResult
 from .boto3 import upload_markdown
+from .boto3 import upload_markdown_many
 from .boto3 import upload_markdown_tool
 from .duckduckgo import duckduckgo_search
 from .firecrawl import firecrawl_scrape
+from .firecrawl import firecrawl_scrape_many
+from .firecrawl import firecrawl_scrape_sync
 from .firecrawl import firecrawl_scrape_tool
 from .firecrawl import map
+from .firecrawl import map_sync
 from .firecrawl import map_tool
 from .firecrawl import search
+from .firecrawl import search_sync
 from .firecrawl import search_tool
+from .markitdown import crawl_site
+from .markitdown import crawl_site_tool
 from .markitdown import markitdown_scrape
+from .markitdown import markitdown_scrape_sync
 from .markitdown import markitdown_scrape_tool
+from .markitdown import scrape_many
+from .markitdown import scrape_many_results
+from .markitdown import scrape_many_tool
+from .telegraph import publish_markdown
+from .telegraph import publish_markdown_many
 from .telegraph import publish_page
+from .tripplus import AwardQuery
 from .tripplus import search_award
+from .tripplus import search_awards
+from .tripplus import search_awards_ranked
 from .wise import query_rate_history
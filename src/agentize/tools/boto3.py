@@ -1,80 +1,155 @@
 from __future__ import annotations
 
-import json
+import gzip
+import hashlib
+import html
 import logging
 import os
 import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
+from functools import cache
 from io import BytesIO
 from pathlib import Path
+from typing import Any
 
 import boto3
+import markdown
 from agents import function_tool
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError
 from botocore.exceptions import ClientError
 
+from ..metrics import instrument_tool
+from ..offload import offload
+
 HTML_TEMPLATE = """<!doctype html>
 <html>
 <head>
   <meta charset="utf-8"/>
+  <meta name="viewport" content="width=device-width, initial-scale=1"/>
   <title>{title}</title>
   <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/github-markdown-css/5.8.1/github-markdown-light.min.css">
 </head>
 <body>
-  <div class="markdown-body" id="content"></div>
-  <script src="https://cdn.jsdelivr.net/npm/marked/marked.min.js"></script>
-  <script>
-    document.getElementById('content').innerHTML =
-      marked.parse({md});
-  </script>
+  <article class="markdown-body">
+{body}
+  </article>
 </body>
 </html>
 """
+MARKDOWN_EXTENSIONS = ["extra", "sane_lists"]
 
+# reports are immutable once published under their date prefix, but may be re-uploaded with fixes
+CACHE_CONTROL = "public, max-age=3600"
 
-def _upload_object(content: str, file_name: str) -> bool:
-    """Upload a file to an S3 bucket.
+# S3 needs parts of at least 5 MiB, anything below the threshold is uploaded with a single request
+TRANSFER_CONFIG = TransferConfig(multipart_threshold=8 * 1024 * 1024, multipart_chunksize=8 * 1024 * 1024)
 
-    Args:
-        content(str) : The content to upload.
-        file_name (str): file name. If not specified then unix timestamp is used.
+# enough connections for the workers of upload_markdown_many and the threads of multipart uploads
+MAX_POOL_CONNECTIONS = 64
 
-    Returns:
-        bool: True if file was uploaded, else False
+
+@dataclass
+class UploadResult:
+    """The outcome of uploading one page.
+
+    `skipped` is True when an identical page was already stored under the key, and `bytes` is the
+    size of the stored (compressed) page.
+    """
+
+    key: str
+    bytes: int
+    latency: float
+    error: str | None = None
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@cache
+def get_s3_client() -> Any:
+    """Return the shared S3 client, for the endpoint in AWS_ENDPOINT_URL if set (e.g. a local S3 stand-in).
+
+    Clients are thread-safe, so creating one (credentials and endpoint resolution) happens once per process.
     """
-    file_obj_bytes = BytesIO(content.encode("utf-8"))
+    return boto3.client(
+        "s3",
+        endpoint_url=os.getenv("AWS_ENDPOINT_URL") or None,
+        config=Config(max_pool_connections=MAX_POOL_CONNECTIONS),
+    )
+
+
+def render_markdown(title: str, content: str) -> str:
+    """Render markdown into a standalone HTML page, so viewers do not need to run a markdown parser."""
+    body = markdown.markdown(content, extensions=MARKDOWN_EXTENSIONS, output_format="html")
+    return HTML_TEMPLATE.format(title=html.escape(title), body=body)
+
+
+def _object_name(file_name: str | None, digest: str) -> str:
+    # If file_name was not specified, name the object after its content, else remove its extension
+    file_name = Path(file_name).stem if file_name else digest[:16]
+
+    # Use the specified file name. upload path yy-mm-dd/<File Name>
+    return f"{datetime.now().strftime('%y-%m-%d')}/{file_name.lower()}"
+
+
+def _get_bucket() -> str:
     bucket = os.getenv("AWS_BUCKET_NAME")
     if bucket is None:
         raise ValueError("AWS_BUCKET_NAME environment variable not set")
+    return bucket
 
-    # If file_name was not specified, use unix timestamp for object name
-    if file_name is None or file_name == "":
-        # Use the current unix timestamp as the object name remove floa<ting point
-        timestamp = int(time.time())
-        # Convert the timestamp to a string
-        file_name = str(timestamp)
-    else:
-        # Remove the file extension from the file name
-        file_name = Path(file_name).stem
 
-    # Use the specified file name. upload path yy-mm-dd/<File Name>
-    object_name = f"{datetime.now().strftime('%y-%m-%d')}/{file_name.lower()}"
+def _is_uploaded(bucket: str, key: str, digest: str) -> bool:
+    """Whether the object already holds the content of the digest, from the metadata stored with it."""
+    try:
+        response = get_s3_client().head_object(Bucket=bucket, Key=key)
+    except ClientError:
+        # missing, or HEAD is not allowed, either way the page is uploaded
+        return False
+    return response.get("Metadata", {}).get("sha256") == digest
+
+
+def _upload_object(bucket: str, content: str, file_name: str) -> UploadResult:
+    """Upload an HTML page to an S3 bucket, gzip-encoded, unless the object already holds the same page.
+
+    Args:
+        bucket (str): The bucket to upload to.
+        content(str) : The content to upload.
+        file_name (str): file name. If not specified then the hash of the content is used.
+    """
+    start = time.perf_counter()
+    # mtime=0 keeps the compressed bytes identical for identical pages
+    body = gzip.compress(content.encode("utf-8"), compresslevel=6, mtime=0)
+    digest = hashlib.sha256(body).hexdigest()
+    key = _object_name(file_name, digest)
 
-    s3_client = boto3.client("s3")
     try:
-        # Upload the file object
-        s3_client.upload_fileobj(
-            Fileobj=file_obj_bytes,
+        if _is_uploaded(bucket, key, digest):
+            return UploadResult(key, len(body), time.perf_counter() - start, skipped=True)
+
+        get_s3_client().upload_fileobj(
+            Fileobj=BytesIO(body),
             Bucket=bucket,
-            Key=object_name,
-            # Content type is set to text/html
+            Key=key,
             ExtraArgs={
                 "ContentType": "text/html; charset=utf-8",
+                "ContentEncoding": "gzip",
+                "CacheControl": CACHE_CONTROL,
+                "Metadata": {"sha256": digest},
             },
+            Config=TRANSFER_CONFIG,
         )
-    except ClientError as e:
+    except (BotoCoreError, ClientError) as e:
         logging.error(e)
-        return False
-    return True
+        return UploadResult(key, len(body), time.perf_counter() - start, error=str(e))
+    return UploadResult(key, len(body), time.perf_counter() - start)
 
 
 def upload_markdown(title: str, content: str, file_name: str) -> bool:
@@ -82,16 +157,33 @@ def upload_markdown(title: str, content: str, file_name: str) -> bool:
     Args:
         title (str): The title of the page.
         content(str) : The markdown content to upload.
-        file_name (str): The file name. If not specified then unix timestamp is used.
+        file_name (str): The file name. If not specified then the hash of the content is used.
 
     Returns:
         bool: True if file was uploaded, else False
     """
+    return _upload_object(_get_bucket(), render_markdown(title, content), file_name).ok
+
+
+def upload_markdown_many(documents: Iterable[tuple[str, str, str]], max_workers: int = 16) -> list[UploadResult]:
+    """Upload many markdown files to an S3 bucket concurrently, in the order given.
+
+    Pages already stored with the same content are skipped, and a failed upload is reported in its
+    result instead of stopping the others.
+
+    Args:
+        documents (Iterable[tuple[str, str, str]]): The (title, content, file_name) of every file.
+        max_workers (int): The maximum number of uploads at once.
+    """
+    bucket = _get_bucket()
+
+    def upload(document: tuple[str, str, str]) -> UploadResult:
+        title, content, file_name = document
+        return _upload_object(bucket, render_markdown(title, content), file_name)
 
-    safe_md = json.dumps(content)
-    # convert markdown to html
-    html = HTML_TEMPLATE.format(title=title, md=safe_md)
-    return _upload_object(html, file_name)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agentize-s3") as executor:
+        return list(executor.map(upload, documents))
 
 
-upload_markdown_tool = function_tool(upload_markdown)
+# the tool uploads in the tool executor, upload_markdown itself stays a blocking function
+upload_markdown_tool = function_tool(instrument_tool(offload(max_concurrency=8, timeout=120)(upload_markdown)))
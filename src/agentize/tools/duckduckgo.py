@@ -5,8 +5,18 @@ import json
 from agents import function_tool
 from duckduckgo_search import DDGS
 
+from ..compaction import compact_tool
+from ..metrics import instrument_tool
+from ..offload import offload
+from ..search_cache import dedupe_results
+from ..search_cache import get_search_cache
 
+
+# DuckDuckGo throttles bursts of requests quickly
 @function_tool
+@instrument_tool
+@compact_tool(max_tokens=2000)
+@offload(max_concurrency=2, timeout=30)
 def duckduckgo_search(query: str, max_results: int) -> str:
     """Perform a web search. Use this function to search DuckDuckGo for a query.
 
@@ -17,11 +27,16 @@ def duckduckgo_search(query: str, max_results: int) -> str:
     Returns:
         The result from DuckDuckGo.
     """
-    ddgs = DDGS()
-    return json.dumps(ddgs.text(keywords=query, max_results=max_results), indent=2)
+    cache = get_search_cache()
+    key = cache.make_key("duckduckgo.text", query, max_results=max_results)
+    results = cache.search(key, lambda: DDGS().text(keywords=query, max_results=max_results))
+    return json.dumps(dedupe_results(results, url_key="href"), indent=2)
 
 
 @function_tool
+@instrument_tool
+@compact_tool(max_tokens=2000)
+@offload(max_concurrency=2, timeout=30)
 def duckduckgo_news(query: str, max_results: int) -> str:
     """Use this function to get the latest news from DuckDuckGo.
     Args:
@@ -31,5 +46,7 @@ def duckduckgo_news(query: str, max_results: int) -> str:
     Returns:
         The latest news from DuckDuckGo.
     """
-    ddgs = DDGS()
-    return json.dumps(ddgs.news(keywords=query, max_results=max_results), indent=2)
+    cache = get_search_cache()
+    key = cache.make_key("duckduckgo.news", query, max_results=max_results)
+    results = cache.search(key, lambda: DDGS().news(keywords=query, max_results=max_results))
+    return json.dumps(dedupe_results(results, url_key="url"), indent=2)
@@ -1,32 +1,83 @@
 from __future__ import annotations
 
-import os
-
 from agents import function_tool
-from firecrawl import FirecrawlApp
+
+from ..background import get_background_loop
+from ..cache import ScrapeEntry
+from ..cache import get_scrape_cache
+from ..compaction import compact_tool
+from ..firecrawl_client import FirecrawlError
+from ..firecrawl_client import get_firecrawl_client
+from ..metrics import instrument_tool
+from ..scraper import ScrapeResult
+from ..search_cache import dedupe_results
+from ..search_cache import get_search_cache
 
 
-def firecrawl_scrape(url: str) -> str:
+@instrument_tool
+async def firecrawl_scrape(url: str) -> str:
     """Scrape the content from the given URL using the Firecrawl API. Slower than the markitdown_scrape_tool.
 
     Args:
         url (str): The URL to scrape.
     """
-    api_key = os.getenv("FIRECRAWL_API_KEY", "")
-    app = FirecrawlApp(api_key=api_key)
-
-    result = app.scrape_url(url, formats=["markdown"])
-    if not result.success:
-        raise Exception(f"Failed to load URL: {url}, got: {result.error}")
-
-    result_markdown = result.markdown
+    # Firecrawl does not revalidate, so only fresh entries save a request (and its credits)
+    cache = get_scrape_cache()
+    entry = cache.get(url, source="firecrawl")
+    if entry is not None and cache.is_fresh(entry):
+        return entry.markdown
+
+    try:
+        document = await get_firecrawl_client().scrape(url)
+    except FirecrawlError as e:
+        raise Exception(f"Failed to load URL: {url}, got: {e}") from e
+
+    result_markdown = document.get("markdown")
     if result_markdown is None:
         raise Exception(f"Failed to scrape URL: {url}, no markdown content found.")
 
+    cache.set(ScrapeEntry(url, result_markdown), source="firecrawl")
     return result_markdown
 
 
-def search(query: str) -> list[dict[str, str]]:
+async def firecrawl_scrape_many(urls: list[str]) -> list[ScrapeResult]:
+    """Scrape many URLs with the Firecrawl API, as a single batch job for the ones not in the cache.
+
+    Args:
+        urls (list[str]): The URLs to scrape.
+    """
+    cache = get_scrape_cache()
+    markdowns: dict[str, str] = {}
+    for url in urls:
+        entry = cache.get(url, source="firecrawl")
+        if entry is not None and cache.is_fresh(entry):
+            markdowns[url] = entry.markdown
+
+    missing = [url for url in dict.fromkeys(urls) if url not in markdowns]
+    error = "no markdown content found"
+    if len(missing) == 1:
+        try:
+            markdowns[missing[0]] = await firecrawl_scrape(missing[0])
+        except Exception as e:
+            error = str(e)
+    elif missing:
+        try:
+            documents = await get_firecrawl_client().batch_scrape(missing)
+        except FirecrawlError as e:
+            documents, error = {}, str(e)
+        for url, document in documents.items():
+            if document.get("markdown") is not None:
+                markdowns[url] = document["markdown"]
+                cache.set(ScrapeEntry(url, document["markdown"]), source="firecrawl")
+
+    return [
+        ScrapeResult(url, markdown=markdowns[url]) if url in markdowns else ScrapeResult(url, error=error)
+        for url in urls
+    ]
+
+
+@instrument_tool
+async def search(query: str) -> list[dict[str, str]]:
     """Perform a web search.
     This function sends the given query to the Firecrawl API and returns the top 3 results.
     If the search fails, it raises an exception with the error message.
@@ -34,17 +85,18 @@ def search(query: str) -> list[dict[str, str]]:
     Args:
         query (str): The search keyword.
     """
-    api_key = os.getenv("FIRECRAWL_API_KEY", "")
-    app = FirecrawlApp(api_key=api_key)
-
-    search_result = app.search(query, limit=3)
-    if not search_result.success:
-        raise Exception(f"Failed to search keyword: {query}, got: {search_result.error}")
-
-    return search_result.data
-
-
-def map(url: str) -> list[str] | None:
+    cache = get_search_cache()
+    try:
+        results = await cache.asearch(
+            cache.make_key("firecrawl", query, limit=3), lambda: get_firecrawl_client().search(query, limit=3)
+        )
+    except FirecrawlError as e:
+        raise Exception(f"Failed to search keyword: {query}, got: {e}") from e
+    return dedupe_results(results)
+
+
+@instrument_tool
+async def map(url: str) -> list[str] | None:
     """Crawl a given URL and return all discovered URLs on the page.
 
     This function uses the Firecrawl API to extract all URLs found on the specified website.
@@ -56,16 +108,40 @@ def map(url: str) -> list[str] | None:
     Returns:
         list[str] | None: A list of discovered URLs if successful; None otherwise.
     """
-    api_key = os.getenv("FIRECRAWL_API_KEY", "")
-    app = FirecrawlApp(api_key=api_key)
+    try:
+        return await get_firecrawl_client().map(url)
+    except FirecrawlError as e:
+        raise Exception(f"Failed to map URL: {url}, got: {e}") from e
 
-    map_result = app.map_url(url)
-    if not map_result.success:
-        raise Exception(f"Failed to map URL: {url}, got: {map_result.error}")
 
-    return map_result.links
+def firecrawl_scrape_sync(url: str) -> str:
+    """Blocking version of `firecrawl_scrape` for sync code, run on the shared background loop.
+
+    Args:
+        url (str): The URL to scrape.
+    """
+    return get_background_loop().run(firecrawl_scrape(url))
+
+
+def search_sync(query: str) -> list[dict[str, str]]:
+    """Blocking version of `search` for sync code, run on the shared background loop.
+
+    Args:
+        query (str): The search keyword.
+    """
+    return get_background_loop().run(search(query))
+
+
+def map_sync(url: str) -> list[str] | None:
+    """Blocking version of `map` for sync code, run on the shared background loop.
+
+    Args:
+        url (str): The target URL to crawl.
+    """
+    return get_background_loop().run(map(url))
 
 
-firecrawl_scrape_tool = function_tool(firecrawl_scrape)
-search_tool = function_tool(search)
-map_tool = function_tool(map)
+# only the tools are compacted, the functions keep their full output for other callers
+firecrawl_scrape_tool = function_tool(compact_tool(max_tokens=8000)(firecrawl_scrape))
+search_tool = function_tool(compact_tool(max_tokens=2000)(search))
+map_tool = function_tool(compact_tool(max_tokens=2000)(map))
@@ -1,42 +1,97 @@
 from __future__ import annotations
 
-import requests
-import ua_generator
+from collections.abc import Sequence
+
+import httpx
 from agents import function_tool
 from loguru import logger
-from requests.exceptions import HTTPError
 
+from ..background import get_background_loop
+from ..compaction import compact_tool
+from ..crawler import CrawlPage
+from ..crawler import CrawlSettings
+from ..crawler import crawl
+from ..metrics import instrument_tool
+from ..scraper import ScrapeResult
+from ..scraper import get_scraper
 from .firecrawl import firecrawl_scrape
+from .firecrawl import firecrawl_scrape_many
 
 
-def markitdown_scrape(url: str) -> str:
+@instrument_tool
+async def markitdown_scrape(url: str) -> str:
     """Scrape the content from the given URL. This is faster than the firecrawl_scrape_tool.
 
     Args:
         url (str): The URL to scrape.
     """
     try:
-        from markitdown import MarkItDown
-    except ImportError as e:
-        raise ImportError(
-            "MarkItDown is not installed. Please install it with `pip install agetnize[markitdown]`."
-        ) from e
-    user_agent = ua_generator.generate(
-        device="desktop",
-        platform=("windows", "macos"),
-        browser=("chrome", "edge", "firefox", "safari"),
-    )
-    requests_session = requests.Session()
-    requests_session.headers.update(user_agent.headers.get())
-    md = MarkItDown(enable_plugins=False, requests_session=requests_session)
-    try:
-        result = md.convert_url(url)
-        result_md = result.markdown
-    except HTTPError:
-        logger.info(f"Fallback: failed to scrape {url} with MarkItDown, using firecrawl_scrape")
-        result_md = firecrawl_scrape(url)
+        return await get_scraper().scrape(url)
+    except httpx.HTTPError as e:
+        logger.info(f"Fallback: failed to scrape {url} with MarkItDown ({e}), using firecrawl_scrape")
+        return await firecrawl_scrape(url)
+
+
+def markitdown_scrape_sync(url: str) -> str:
+    """Blocking version of `markitdown_scrape` for sync code, run on the shared background loop.
+
+    Args:
+        url (str): The URL to scrape.
+    """
+    return get_background_loop().run(markitdown_scrape(url))
+
+
+def format_documents(results: Sequence[ScrapeResult | CrawlPage]) -> str:
+    """Format scraped pages as numbered <document> sections for a model to read."""
+    sections = []
+    for index, result in enumerate(results, start=1):
+        content = result.markdown if result.ok else f"Failed to scrape: {result.error}"
+        sections.append(f'<document index="{index}" url="{result.url}">\n{content}\n</document>')
+    return "\n\n".join(sections)
+
+
+async def scrape_many_results(urls: list[str], concurrency: int = 16) -> list[ScrapeResult]:
+    """Scrape many URLs concurrently, falling back to Firecrawl for the ones that fail to download.
+
+    The failed URLs are sent to Firecrawl together as one batch job.
 
-    return result_md
+    Args:
+        urls (list[str]): The URLs to scrape.
+        concurrency (int): The maximum number of URLs scraped at once.
+    """
+    results = await get_scraper().scrape_many(urls, concurrency=concurrency)
+
+    failed = [result.url for result in results if not result.ok]
+    if failed:
+        logger.info(f"Fallback: failed to scrape {len(failed)} URLs with MarkItDown, using Firecrawl")
+        fallbacks = {result.url: result for result in await firecrawl_scrape_many(failed)}
+        results = [result if result.ok else fallbacks[result.url] for result in results]
+    return results
+
+
+@instrument_tool
+async def scrape_many(urls: list[str]) -> str:
+    """Scrape the content from many URLs at once. Prefer this to calling markitdown_scrape once per URL.
+
+    Args:
+        urls (list[str]): The URLs to scrape.
+    """
+    return format_documents(await scrape_many_results(urls))
+
+
+@instrument_tool
+async def crawl_site(url: str, max_pages: int) -> str:
+    """Crawl a website from a URL and return the content of its pages, following the links between them.
+    Use this to read a whole blog or documentation site at once instead of scraping its pages one by one.
+
+    Args:
+        url (str): The URL to start from, e.g. the home page of the site.
+        max_pages (int): The maximum number of pages to read, at most 100.
+    """
+    settings = CrawlSettings(max_pages=max(1, min(max_pages, 100)))
+    return format_documents([page async for page in crawl(url, settings)])
 
 
-markitdown_scrape_tool = function_tool(markitdown_scrape)
+markitdown_scrape_tool = function_tool(compact_tool(max_tokens=8000)(markitdown_scrape))
+scrape_many_tool = function_tool(compact_tool(max_tokens=24000)(scrape_many))
+crawl_site_tool = function_tool(compact_tool(max_tokens=32000)(crawl_site))
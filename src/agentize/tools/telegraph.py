@@ -1,10 +1,128 @@
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from typing import Any
+
 from agents import function_tool
 from ytelegraph import TelegraphAPI
+from ytelegraph import md_to_dom
+
+from ..metrics import instrument_tool
+from ..offload import offload
+from ..text import split_markdown
+
+Nodes = list[dict[str, Any]]
+
+# Telegraph rejects pages whose content is over 64 KB, leave room for the navigation links
+MAX_CONTENT_BYTES = 60 * 1024
+
+# markdown is not split further than this, whatever the size of its DOM
+MIN_PART_BYTES = 1024
+
+MAX_WORKERS = 8
+
+
+@cache
+def get_telegraph() -> TelegraphAPI:
+    """Return the shared Telegraph client, for the account of TELEGRAPH_ACCESS_TOKEN if set.
+
+    Without a token, ytelegraph reuses the token saved by a previous run (see PH_TOKEN_PATH) or creates an account.
+    """
+    return TelegraphAPI(access_token=os.getenv("TELEGRAPH_ACCESS_TOKEN") or None)
+
+
+def _content_size(nodes: Nodes) -> int:
+    return len(json.dumps(nodes, ensure_ascii=False).encode("utf-8"))
+
+
+def _byte_length(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+def split_page(content: str, max_bytes: int = MAX_CONTENT_BYTES) -> list[Nodes]:
+    """Convert markdown into Telegraph DOM parts that each fit in a page, split on headings where possible.
+
+    Args:
+        content (str): The markdown content.
+        max_bytes (int): The maximum size of the content of a page, as Telegraph counts it.
+    """
+
+    # the DOM of a part is larger than its markdown, so the markdown is aimed at half the limit first
+    def split(text: str, budget: int) -> list[Nodes]:
+        nodes = md_to_dom(text)
+        if _content_size(nodes) <= max_bytes or budget < MIN_PART_BYTES:
+            return [nodes]
+        chunks = split_markdown(text, budget, length=_byte_length)
+        return [part for chunk in chunks for part in split(chunk, budget // 2)]
+
+    return split(content, max_bytes // 2)
+
+
+def _link(url: str, text: str) -> dict[str, Any]:
+    return {"tag": "a", "attrs": {"href": url}, "children": [text]}
+
+
+def _navigation(index_url: str, urls: list[str], i: int) -> dict[str, Any]:
+    links: list[Any] = [_link(index_url, "Contents")]
+    if i > 0:
+        links = [_link(urls[i - 1], "← Previous"), " | ", *links]
+    if i < len(urls) - 1:
+        links = [*links, " | ", _link(urls[i + 1], "Next →")]
+    return {"tag": "p", "children": links}
+
+
+def _publish_parts(telegraph: TelegraphAPI, title: str, parts: list[Nodes]) -> str:
+    titles = [f"{title} ({i}/{len(parts)})" for i in range(1, len(parts) + 1)]
+    with ThreadPoolExecutor(max_workers=min(len(parts), MAX_WORKERS)) as executor:
+        urls = list(executor.map(telegraph.create_page, titles, parts))
+
+        items = [{"tag": "li", "children": [_link(url, name)]} for url, name in zip(urls, titles, strict=True)]
+        index_url = telegraph.create_page(title, [{"tag": "ol", "children": items}])
+
+        # the URLs of the parts are only known once they are created, so the links are added afterwards
+        contents = [[*part, _navigation(index_url, urls, i)] for i, part in enumerate(parts)]
+        list(executor.map(telegraph.edit_page, urls, contents, titles))
+    return index_url
+
+
+def publish_markdown(title: str, content: str) -> str:
+    """Publish markdown as a Telegraph page and return its URL.
+
+    Content over the page size limit is published as linked parts, and the URL of their index page is returned.
+
+    Args:
+        title (str): The title of the page.
+        content (str): The content of the page in Markdown format.
+    """
+    telegraph = get_telegraph()
+    parts = split_page(content, max_bytes=MAX_CONTENT_BYTES)
+    if len(parts) == 1:
+        return telegraph.create_page(title, parts[0])
+    return _publish_parts(telegraph, title, parts)
+
+
+def publish_markdown_many(pages: list[tuple[str, str]], max_workers: int = 4) -> list[str]:
+    """Publish many (title, content) markdown pages concurrently and return their URLs in order.
+
+    Args:
+        pages (list[tuple[str, str]]): The title and markdown content of every page.
+        max_workers (int): The maximum number of pages published at once.
+    """
+    if not pages:
+        return []
+    with ThreadPoolExecutor(max_workers=min(len(pages), max_workers)) as executor:
+        return list(executor.map(lambda page: publish_markdown(*page), pages))
 
 
 @function_tool
+@instrument_tool
+@offload(max_concurrency=4, timeout=60)
 def publish_page(title: str, content: str) -> str:
     """Publish a new Telegraph page with Markdown content.
+    Content too long for one page is published as linked pages, and the URL of their index page is returned.
 
     Args:
         title (str): The title of the page.
@@ -13,5 +131,4 @@ def publish_page(title: str, content: str) -> str:
     Returns:
         url (str): The URL of the created page.
     """
-    ph = TelegraphAPI()
-    return ph.create_page_md(title, content)
+    return publish_markdown(title, content)
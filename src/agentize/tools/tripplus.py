@@ -1,12 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from functools import cache
+from typing import Any
 from typing import Literal
 
 from agents import function_tool
 from loguru import logger
+from pydantic import BaseModel
+from pydantic import Field
 from tripplus import RedemptionRequest
+from tripplus import RedemptionResponse
+from tripplus.awardplus import Item
+
+from ..compaction import compact_tool
+from ..metrics import instrument_tool
+from ..offload import offload
+from ..search_cache import SearchCache
+
+# award availability changes slowly, but the miles of a program can change within the day
+AWARD_TTL = 10 * 60
+
+
+class AwardQuery(BaseModel):
+    ori: str = Field(..., description="Origin airport code")
+    dst: str = Field(..., description="Destination airport code")
+    cabin: Literal["y", "c", "f"] = Field(..., description="Cabin class, y: economy, c: business, f: first")
+    type: Literal["ow", "rt"] = Field(..., description="Redemption type, ow: one way, rt: round trip")
+
+
+@cache
+def get_award_cache() -> SearchCache:
+    return SearchCache(ttl=AWARD_TTL, max_entries=256)
+
+
+def _normalize(query: AwardQuery) -> AwardQuery:
+    return AwardQuery(ori=query.ori.upper(), dst=query.dst.upper(), cabin=query.cabin, type=query.type)
+
+
+def _request_award(query: AwardQuery) -> dict[str, Any]:
+    req = RedemptionRequest(ori=query.ori, dst=query.dst, cabin=query.cabin, type=query.type, programs="ALL")
+    return req.do().model_dump(mode="json")
+
+
+# TripPlus sits behind Cloudflare, so the requests of every search share a small cap
+@offload(max_concurrency=4, timeout=60)
+def _fetch_award(query: AwardQuery) -> RedemptionResponse:
+    query = _normalize(query)
+    cache = get_award_cache()
+    key = cache.make_key("tripplus", **query.model_dump())
+    return RedemptionResponse.model_validate(cache.search(key, lambda: _request_award(query)))
+
+
+def _route(item: Item) -> str:
+    legs = ["-".join(filter(None, [route.origin, route.stop, route.destination])) for route in item.routes]
+    return ", ".join(legs) or f"{item.origin}-{item.destination}"
+
+
+def rank_options(response: RedemptionResponse, per_program: int = 2) -> list[dict[str, Any]]:
+    """Project the redemption options on the fields worth reading, cheapest first, keeping the best of every program.
+
+    Args:
+        response (RedemptionResponse): The response of a search.
+        per_program (int): The maximum number of options kept per program.
+    """
+    kept: dict[str, int] = {}
+    options = []
+    for item in sorted(response.items, key=lambda item: item.miles):
+        if kept.get(item.program_code, 0) >= per_program:
+            continue
+        kept[item.program_code] = kept.get(item.program_code, 0) + 1
+
+        option = {
+            "program": item.program_name,
+            "miles": item.miles,
+            "level": item.level,
+            "route": _route(item),
+        }
+        if item.operating_program_name and item.operating_program_name != item.program_name:
+            option["operated_by"] = item.operating_program_name
+        options.append(option)
+    return options
+
+
+def _fit(results: list[dict[str, Any]], ranked: list[list[dict[str, Any]]], max_chars: int) -> None:
+    """Fill the options of the results in rank order across routes, until the JSON would exceed max_chars."""
+    size = len(json.dumps(results, ensure_ascii=False, separators=(",", ":")))
+    for rank in range(max((len(options) for options in ranked), default=0)):
+        for result, options in zip(results, ranked, strict=True):
+            if rank >= len(options):
+                continue
+            option_size = len(json.dumps(options[rank], ensure_ascii=False, separators=(",", ":"))) + 1
+            if size + option_size > max_chars:
+                return
+            result["options"].append(options[rank])
+            result["omitted"] -= 1
+            size += option_size
+
+
+async def search_awards_ranked(
+    queries: list[AwardQuery],
+    per_program: int = 2,
+    max_chars: int = 4000,
+) -> list[dict[str, Any]]:
+    """Search many award routes concurrently and return the best options of every route within a size budget.
+
+    Args:
+        queries (list[AwardQuery]): The routes to search, searched once each.
+        per_program (int): The maximum number of options kept per program and route.
+        max_chars (int): The maximum size of the results as compact JSON. The cheapest options of
+            every route are kept first, and the number of options left out is reported per route.
+    """
+    queries = list({query.model_dump_json(): query for query in map(_normalize, queries)}.values())
+    responses = await asyncio.gather(*(_fetch_award(query) for query in queries), return_exceptions=True)
+
+    results = []
+    ranked = []
+    for query, response in zip(queries, responses, strict=True):
+        result: dict[str, Any] = {"route": f"{query.ori}-{query.dst}", "cabin": query.cabin, "type": query.type}
+        if isinstance(response, BaseException):
+            logger.error(f"Failed to search for award flights {result['route']}: {response}")
+            result["error"] = "Failed to search for award flights."
+            options = []
+        else:
+            options = rank_options(response, per_program=per_program)
+            result.update(options=[], omitted=len(options))
+        results.append(result)
+        ranked.append(options)
+
+    _fit(results, ranked, max_chars)
+    return results
 
 
 @function_tool
-def search_award(ori: str, dst: str, cabin: Literal["y", "c", "f"], type: Literal["ow", "rt"]) -> str:
+@instrument_tool
+@compact_tool(max_tokens=3000)
+async def search_award(ori: str, dst: str, cabin: Literal["y", "c", "f"], type: Literal["ow", "rt"]) -> str:
     """
     Search for award flight options between two airports.
 
@@ -24,16 +154,26 @@ def search_award(ori: str, dst: str, cabin: Literal["y", "c", "f"], type: Litera
         >>> search_award("LHR", "JFK", "y", "rt")
     """
     try:
-        req = RedemptionRequest(
-            ori=ori,
-            dst=dst,
-            cabin=cabin,
-            type=type,
-            programs="ALL",
-        )
-        resp = req.do()
+        resp = await _fetch_award(AwardQuery(ori=ori, dst=dst, cabin=cabin, type=type))
     except Exception as e:
         logger.error(f"Failed to search for award flights: {e}")
         return "Failed to search for award flights."
 
     return resp.model_dump_json()
+
+
+@function_tool
+@instrument_tool
+async def search_awards(queries: list[AwardQuery]) -> str:
+    """
+    Search award flight options for many routes at once, e.g. several destinations or cabins.
+    Prefer this to calling search_award once per route.
+
+    Args:
+        queries: The routes to search, each with an origin, a destination, a cabin and a redemption type.
+
+    Returns:
+        JSON list with the cheapest options of every program per route, and how many were left out
+    """
+    results = await search_awards_ranked(queries)
+    return json.dumps(results, ensure_ascii=False, separators=(",", ":"))
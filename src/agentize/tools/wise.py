@@ -1,11 +1,141 @@
+from __future__ import annotations
+
+import math
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Awaitable
+from collections.abc import Callable
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from functools import cache
+
 from agents import function_tool
 from loguru import logger
+from wisest.rate import Rate
 from wisest.rate import RateHistoryRequest
 from wisest.rate import Resolution
 from wisest.rate import Unit
 
+from ..compaction import compact_tool
+from ..metrics import instrument_tool
+
+DAY = 24 * 60 * 60
+
+# months and years are rounded up, so a window never starts later than the one Wise returns
+UNIT_SECONDS = {Unit.DAY: DAY, Unit.MONTH: 31 * DAY, Unit.YEAR: 366 * DAY}
+
+Fetch = Callable[[str, str, int, Resolution, Unit], Awaitable[list[Rate]]]
+
+
+async def fetch_rate_history(source: str, target: str, length: int, resolution: Resolution, unit: Unit) -> list[Rate]:
+    req = RateHistoryRequest(source=source, target=target, length=length, resolution=resolution, unit=unit)
+    return await req.async_do()
+
+
+@dataclass
+class RateSeries:
+    """The rate history of a currency pair at one resolution, as sorted arrays of timestamps and rates.
+
+    Args:
+        covered_from (float): The start of the window fetched so far, as a unix timestamp.
+        fetched_at (float): When the series was last fetched, as a unix timestamp.
+    """
+
+    covered_from: float
+    fetched_at: float = 0.0
+    times: array[float] = field(default_factory=lambda: array("d"))
+    values: array[float] = field(default_factory=lambda: array("d"))
+
+    def merge(self, rates: list[Rate]) -> None:
+        """Replace the points from the first of the rates on with the rates."""
+        if not rates:
+            return
+        rates = sorted(rates, key=lambda rate: rate.time)
+        cut = bisect_left(self.times, rates[0].time.timestamp())
+        del self.times[cut:]
+        del self.values[cut:]
+        self.times.extend(rate.time.timestamp() for rate in rates)
+        self.values.extend(rate.value for rate in rates)
+
+    def since(self, start: float) -> tuple[array[float], array[float]]:
+        i = bisect_left(self.times, start)
+        return self.times[i:], self.values[i:]
+
+
+@dataclass
+class RateHistoryStats:
+    local: int = 0
+    """Queries answered from the stored series."""
+
+    tail_fetches: int = 0
+    """Queries that only fetched the points after the stored series."""
+
+    full_fetches: int = 0
+    """Queries that fetched their whole window."""
+
+
+class RateHistoryStore:
+    """An in-process store of rate histories that only fetches what it does not hold yet.
+
+    Every (source, target, resolution) has a single series shared by all queries. A query inside the
+    stored window is answered locally while the series is younger than `max_age`, after that only the
+    points since the last stored one are fetched and merged. A query reaching further back than the
+    stored window fetches its whole window.
+
+    Args:
+        max_age (float): The seconds the latest points are reused before fetching the tail again.
+        fetch (Fetch): Fetches the history of a (source, target, length, resolution, unit) window.
+    """
+
+    def __init__(self, max_age: float = 5 * 60, fetch: Fetch = fetch_rate_history) -> None:
+        self.max_age = max_age
+        self.fetch = fetch
+        self.series: dict[tuple[str, str, Resolution], RateSeries] = {}
+        self.stats = RateHistoryStats()
+
+    async def query(self, source: str, target: str, length: int, resolution: Resolution, unit: Unit) -> list[Rate]:
+        source, target = source.upper(), target.upper()
+        now = time.time()
+        start = now - length * UNIT_SECONDS[unit]
+
+        series = self.series.get((source, target, resolution))
+        if series is None or start < series.covered_from:
+            rates = await self.fetch(source, target, length, resolution, unit)
+            series = self.series.setdefault((source, target, resolution), RateSeries(covered_from=start))
+            series.covered_from = min(series.covered_from, start)
+            series.merge(rates)
+            series.fetched_at = now
+            self.stats.full_fetches += 1
+        elif now - series.fetched_at > self.max_age:
+            last = series.times[-1] if series.times else series.covered_from
+            # the last stored point is fetched again, since the latest point of a period keeps changing
+            days = max(math.ceil((now - last) / DAY), 1)
+            series.merge(await self.fetch(source, target, days, resolution, Unit.DAY))
+            series.fetched_at = now
+            self.stats.tail_fetches += 1
+        else:
+            self.stats.local += 1
+
+        times, values = series.since(start)
+        return [
+            Rate(source=source, target=target, value=value, time=datetime.fromtimestamp(timestamp))
+            for timestamp, value in zip(times, values, strict=True)
+        ]
+
+    def clear(self) -> None:
+        self.series.clear()
+
+
+@cache
+def get_rate_history_store() -> RateHistoryStore:
+    return RateHistoryStore()
+
 
 @function_tool
+@instrument_tool
+@compact_tool(max_tokens=6000)
 async def query_rate_history(source: str, target: str, length: int, resolution: Resolution, unit: Unit) -> str:
     """Query the exchange rate history between two currencies.
 
@@ -18,16 +148,12 @@ async def query_rate_history(source: str, target: str, length: int, resolution:
     """
     logger.debug(f"Querying rate history for {source} to {target}")
 
-    req = RateHistoryRequest(
-        source=source,
-        target=target,
-        length=length,
-        resolution=resolution,
-        unit=unit,
-    )
     try:
-        rates = await req.async_do()
+        rates = await get_rate_history_store().query(source, target, length, resolution, unit)
     except Exception as e:
         logger.error(f"Failed to query rate history: {e}")
         return f"Error: Unable to retrieve rate history for {source} to {target}."
-    return "\n".join([str(rate) for rate in rates])
+    # one "time rate" line per point, newest first, so truncating a long history drops the oldest rates
+    lines = [f"{source.upper()}/{target.upper()} rates, newest first:"]
+    lines += [f"{rate.time:%Y-%m-%d %H:%M} {rate.value:g}" for rate in reversed(rates)]
+    return "\n".join(lines)
@@ -1,13 +1,25 @@
+import asyncio
 import base64
 import json
 import os
+import re
+import threading
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
+from typing import Generic
+from typing import TypeVar
 
 from loguru import logger
 
 PathLike = str | Path
 
+T = TypeVar("T")
+
+# Rough averages for OpenAI tokenizers, good enough for budgeting: about four ASCII characters
+# per token, while CJK and other non-ASCII characters usually take a token each.
+CHARS_PER_TOKEN = 4
+
 
 def save_text(text: str, f: PathLike) -> None:
     with Path(f).open("w", encoding="utf-8") as fp:
@@ -32,6 +44,95 @@ def save_json(data: Any, f: PathLike) -> None:
         json.dump(data, fp, ensure_ascii=False, indent=4)
 
 
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in the text without loading a tokenizer."""
+    num_ascii = len(text.encode("ascii", errors="ignore"))
+    return (num_ascii + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN + len(text) - num_ascii
+
+
+# strings (possibly still open) and the structural characters of a JSON document
+_JSON_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*(?P<close>")?|[{}\[\],]')
+_PARTIAL_UNICODE_ESCAPE = re.compile(r"(\\+)u[0-9a-fA-F]{0,3}$")
+
+
+def parse_partial_json(text: str) -> Any | None:
+    """Parse the longest complete prefix of a JSON document that is still being streamed.
+
+    Open strings, arrays and objects are closed, and a trailing incomplete member (e.g. a key
+    without a value) is dropped. Returns None if nothing can be parsed yet.
+    """
+    end = len(text)
+    while end > 0:
+        candidate, cut = _close_partial_json(text[:end])
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            end = cut
+    return None
+
+
+def _close_partial_json(text: str) -> tuple[str, int]:
+    """Return the text with its open strings and containers closed, and the last position to cut back to."""
+    stack: list[str] = []
+    cut = 0
+    for match in _JSON_TOKEN.finditer(text):
+        token = match.group()
+        if token.startswith('"'):
+            if match.group("close") is None:
+                # the string is still open, drop a dangling escape sequence before closing it
+                head = text[: match.end()]
+                escape = _PARTIAL_UNICODE_ESCAPE.search(head)
+                if escape is not None and len(escape.group(1)) % 2:
+                    head = head[: escape.end(1) - 1]
+                return head + '"' + "".join(reversed(stack)), cut
+        elif token in "{[":
+            stack.append("}" if token == "{" else "]")
+            cut = match.end()
+        elif token in "}]":
+            if stack:
+                stack.pop()
+        else:
+            cut = match.start()
+    return text + "".join(reversed(stack)), cut
+
+
+class LoopLocal(Generic[T]):
+    """A value per event loop, created on first use in a loop and dropped once the loop is closed.
+
+    asyncio primitives and pooled connections are bound to the loop they are first used on, so an
+    object shared by `Runner.run_sync` calls (each on a fresh loop) and background threads keeps
+    one of them per loop instead of a single one.
+
+    Args:
+        factory (Callable[[], T]): Creates the value of a loop, called on the running loop.
+    """
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        self.factory = factory
+        self._values: dict[asyncio.AbstractEventLoop, T] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self) -> T:
+        """Return the value of the running event loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._values:
+                # values may keep their loop alive, so the values of closed loops are dropped here
+                for closed_loop in [other for other in self._values if other.is_closed()]:
+                    del self._values[closed_loop]
+                self._values[loop] = self.factory()
+            return self._values[loop]
+
+    def pop(self) -> T | None:
+        """Remove and return the value of the running event loop, None if it has none."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            return self._values.pop(loop, None)
+
+
 def configure_langfuse(service_name: str | None = None) -> None:
     """Configure OpenTelemetry with Langfuse authentication.
 
@@ -0,0 +1,40 @@
+from unittest.mock import MagicMock
+
+from agents import AgentOutputSchemaBase
+from agents import ModelSettings
+from pydantic import BaseModel
+
+from agentize.agents import AgentRegistry
+
+
+class Plan(BaseModel):
+    steps: list[str]
+
+
+def test_registry_reuses_agents() -> None:
+    registry = AgentRegistry()
+    model = MagicMock()
+
+    agent = registry.get("planner", "Plan it.", model=model, output_type=Plan)
+    assert registry.get("planner", "Plan it.", model=model, output_type=Plan) is agent
+    assert isinstance(agent.output_type, AgentOutputSchemaBase)
+    assert agent.output_type.validate_json('{"steps": ["a"]}') == Plan(steps=["a"])
+
+    assert registry.get("planner", "Plan it.", model=model, model_settings=ModelSettings(temperature=1)) is not agent
+    assert registry.get("planner", "Plan it again.", model=model, output_type=Plan) is not agent
+    assert registry.hits == 1
+    assert registry.misses == 3
+
+
+def test_registry_evicts_least_recently_used() -> None:
+    registry = AgentRegistry(maxsize=2)
+    model = MagicMock()
+
+    first = registry.get("first", model=model)
+    registry.get("second", model=model)
+    registry.get("first", model=model)
+    registry.get("third", model=model)
+
+    assert len(registry) == 2
+    assert registry.get("first", model=model) is first
+    assert registry.misses == 3
@@ -0,0 +1,57 @@
+from collections.abc import Callable
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pytest
+from fake_server import fake_openai_handler
+from fake_server import server_url
+from fake_server import start_server
+
+from agentize.cache import get_scrape_cache
+from agentize.scraper import get_scraper
+from agentize.search_cache import get_search_cache
+
+FakeServer = Callable[..., str]
+HTTPServer = Callable[[type[BaseHTTPRequestHandler]], str]
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Keep the shared scrape cache of every test in a temporary directory and start without search results."""
+    monkeypatch.setenv("AGENTIZE_CACHE_DIR", str(tmp_path / "cache"))
+    get_scrape_cache.cache_clear()
+    get_scraper.cache_clear()
+    get_search_cache.cache_clear()
+    yield
+    if get_scrape_cache.cache_info().currsize:
+        get_scrape_cache().close()
+    get_scrape_cache.cache_clear()
+    get_scraper.cache_clear()
+
+
+@pytest.fixture
+def http_server() -> Iterator[HTTPServer]:
+    """Start local HTTP servers with the request handlers of a test and return their URLs."""
+    servers: list[ThreadingHTTPServer] = []
+
+    def start(handler: type[BaseHTTPRequestHandler]) -> str:
+        server = start_server(handler)
+        servers.append(server)
+        return server_url(server)
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def fake_openai_server(http_server: HTTPServer) -> FakeServer:
+    """Start local OpenAI-compatible servers answering chat completions with a fixed status and delay."""
+
+    def start(status: int = 200, content: str = "ok", delay: float = 0.0) -> str:
+        return http_server(fake_openai_handler(status, content, delay)) + "/v1"
+
+    return start
@@ -7,6 +7,9 @@ from agentize.prompts import summarize
 from agentize.prompts.summary import Reasoning
 from agentize.prompts.summary import Step
 from agentize.prompts.summary import Summary
+from agentize.prompts.summary import _group_summaries
+from agentize.prompts.summary import summarize_hierarchical
+from agentize.utils import estimate_tokens
 
 
 @pytest.mark.asyncio
@@ -36,3 +39,76 @@ async def test_summarize() -> None:
             assert insight in result_str
         for hashtag in hashtags:
             assert hashtag in result_str
+
+
+def make_summary(text: str) -> Summary:
+    return Summary(reasoning=Reasoning(steps=[], final_output=""), summary=text, insights=["insight"], hashtags=["#a"])
+
+
+async def fake_lazy_run(input: str, instructions: str | None = None, padding: int = 0, **kwargs) -> Summary:
+    merged = "partial summaries" in (instructions or "")
+    text = f"merged {input.count('## Part')}" if merged else f"chunk of {len(input)}"
+    return make_summary(text + "." * padding)
+
+
+async def fake_lazy_run_verbose(input: str, instructions: str | None = None, **kwargs) -> Summary:
+    return await fake_lazy_run(input, instructions, padding=600)
+
+
+@pytest.mark.asyncio
+async def test_summarize_hierarchical_maps_and_reduces(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "fake")
+    text = "".join(f"# Section {i}\n\n{'lorem ipsum ' * 50}\n\n" for i in range(20))
+
+    with (
+        patch("agentize.prompts.summary.lazy_run", side_effect=fake_lazy_run) as direct,
+        patch("agentize.lazy.lazy_run", side_effect=fake_lazy_run) as batched,
+    ):
+        summary = await summarize_hierarchical(text, "English", chunk_tokens=400)
+
+    # 20 sections of ~160 tokens, two per chunk, and the partial summaries fit in a single merge
+    assert batched.call_count == 10
+    assert direct.call_count == 1
+    assert summary.summary == "merged 10"
+
+
+@pytest.mark.asyncio
+async def test_summarize_hierarchical_reduces_recursively(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "fake")
+    text = "".join(f"# Section {i}\n\n{'lorem ipsum ' * 50}\n\n" for i in range(20))
+
+    with (
+        patch("agentize.prompts.summary.lazy_run", side_effect=fake_lazy_run_verbose) as direct,
+        patch("agentize.lazy.lazy_run", side_effect=fake_lazy_run_verbose) as batched,
+    ):
+        # every partial summary takes up a whole chunk, so they are merged pairwise
+        summary = await summarize_hierarchical(text, "English", chunk_tokens=200)
+
+    assert batched.call_count == 20 + 10 + 5 + 3 + 2
+    assert direct.call_count == 1
+    assert summary.summary.rstrip(".") == "merged 2"
+
+
+@pytest.mark.asyncio
+async def test_summarize_switches_to_hierarchical_for_long_text() -> None:
+    with (
+        patch("agentize.prompts.summary.lazy_run", side_effect=fake_lazy_run) as direct,
+        patch("agentize.prompts.summary.CHUNK_TOKENS", 100),
+        patch("agentize.prompts.summary.summarize_hierarchical", side_effect=fake_lazy_run) as hierarchical,
+    ):
+        await summarize("short text", "English")
+        await summarize("long text " * 100, "English")
+
+    assert direct.call_count == 1
+    assert hierarchical.call_count == 1
+
+
+@pytest.mark.parametrize("length", [100, 500, 2000])
+def test_group_summaries_stay_within_budget(length: int) -> None:
+    summaries = [make_summary(f"{i} " + "word " * length) for i in range(7)]
+
+    groups = _group_summaries(summaries, max_tokens=400)
+
+    assert all(estimate_tokens(group) <= 400 for group in groups)
+    assert len(groups) < len(summaries)
+    assert sum(group.count("## Part") for group in groups) == len(summaries)
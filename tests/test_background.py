@@ -0,0 +1,56 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from agentize.background import BackgroundLoop
+from agentize.lazy import lazy_run_sync
+
+
+async def current_loop() -> asyncio.AbstractEventLoop:
+    return asyncio.get_running_loop()
+
+
+def test_background_loop_is_shared_across_threads() -> None:
+    background_loop = BackgroundLoop()
+    try:
+        with ThreadPoolExecutor(4) as executor:
+            loops = list(executor.map(lambda _: background_loop.run(current_loop()), range(8)))
+        assert all(loop is background_loop.loop for loop in loops)
+    finally:
+        background_loop.shutdown()
+    assert not background_loop.running
+
+
+def test_background_loop_shutdown_cancels_pending() -> None:
+    background_loop = BackgroundLoop()
+    future = background_loop.submit(asyncio.sleep(60))
+    background_loop.shutdown()
+    assert future.cancelled()
+
+
+def test_background_loop_rejects_blocking_from_its_thread() -> None:
+    background_loop = BackgroundLoop()
+
+    async def nested() -> None:
+        background_loop.run(asyncio.sleep(0))
+
+    try:
+        with pytest.raises(RuntimeError):
+            background_loop.run(nested())
+    finally:
+        background_loop.shutdown()
+
+
+def test_lazy_run_sync_in_background() -> None:
+    threads: list[str] = []
+
+    async def fake_lazy_run(input: str, **kwargs) -> str:
+        threads.append(threading.current_thread().name)
+        return input.upper()
+
+    with patch("agentize.lazy.lazy_run", side_effect=fake_lazy_run):
+        assert lazy_run_sync("hello", background=True) == "HELLO"
+    assert threads == ["agentize-loop"]
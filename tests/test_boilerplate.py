@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from agentize.boilerplate import MarkdownCleaner
+from agentize.boilerplate import clean_lines
+from agentize.boilerplate import clean_markdown
+from agentize.boilerplate import strip_images
+from agentize.scraper import Page
+from agentize.scraper import Scraper
+from agentize.scraper import ScraperSettings
+
+NAVIGATION = "* [Home](/)\n* [Blog](/blog)\n* [About](/about)\n* [Contact](/contact)\n"
+ARTICLE = (
+    "# Kubernetes networking\n\n"
+    "Pods talk to each other through the [CNI plugin](https://example.com/cni) of the cluster.\n\n"
+    "```yaml\nkind:   Pod\n\n\n* [not a link run](/a)\n* [x](/b)\n* [y](/c)\n```\n\n"
+    "Services give pods a stable address.\n"
+)
+
+
+def test_clean_markdown_keeps_article_and_drops_boilerplate() -> None:
+    page = (
+        "Skip to content\n\n"
+        f"{NAVIGATION}\n"
+        "![logo](/logo.png)\n"
+        "[![banner](data:image/png;base64,iVBORw0KGgo=)](/promo)\n\n\n\n"
+        f"{ARTICLE}\n"
+        "We use cookies to improve your experience. [Accept](/accept)\n\n"
+        f"{NAVIGATION}\n"
+        "Share this article with your friends and colleagues\n"
+        "Share this article with your friends and colleagues\n"
+        "© 2025 Example. All rights reserved.\n"
+    )
+
+    cleaned = clean_markdown(page)
+
+    assert cleaned == ARTICLE + "\nShare this article with your friends and colleagues\n"
+
+
+def test_clean_markdown_keeps_short_link_lists_and_collapses_spaces() -> None:
+    text = "See also:\n\n* [Part 1](/1)\n* [Part 2](/2)\n\n| a  |   b |\n|----|-----|\n"
+
+    assert clean_markdown(text) == "See also:\n\n* [Part 1](/1)\n* [Part 2](/2)\n\n| a | b |\n|----|-----|\n"
+
+
+def test_strip_images() -> None:
+    text = 'Logo ![logo](/logo.png) and <img src="data:image/png;base64,iVBORw0KGgo=">'
+    assert strip_images(text) == 'Logo  and <img src="">'
+
+
+def test_clean_lines_streams_before_the_end() -> None:
+    lines = iter(["# Title\n", "\n", "Body text.\n"] + ["filler line\n"] * 1000)
+    cleaned = clean_lines(lines, MarkdownCleaner())
+
+    assert next(cleaned) == "# Title\n"
+    assert next(cleaned) == "\n"
+    assert next(cleaned) == "Body text.\n"
+
+
+def test_clean_markdown_runs_in_linear_time() -> None:
+    def timed(repeat: int) -> float:
+        text = (NAVIGATION + ARTICLE.replace("Services", "{i} services")) * repeat
+        start = time.perf_counter()
+        clean_markdown(text.replace("{i}", "x"))
+        return time.perf_counter() - start
+
+    small, large = timed(500), timed(5000)
+    assert large < small * 25
+
+
+@pytest.mark.asyncio
+async def test_scraper_cleans_converted_pages() -> None:
+    html = (
+        b"<html><body><nav><ul><li><a href='/'>Home</a></li><li><a href='/a'>A</a></li>"
+        b"<li><a href='/b'>B</a></li></ul></nav><h1>Title</h1><p>Article text.</p>"
+        b"<img src='data:image/png;base64,iVBORw0KGgo='></body></html>"
+    )
+    page = Page("https://example.com/post", 200, html, content_type="text/html", charset="utf-8")
+
+    cleaned = await Scraper().convert(page)
+    raw = await Scraper(ScraperSettings(clean=False)).convert(page)
+
+    assert cleaned == "# Title\n\nArticle text.\n"
+    assert "Home" in raw and "base64" in raw
@@ -0,0 +1,109 @@
+import time
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from agents import Model
+from agents import ModelSettings
+from agents import OpenAIChatCompletionsModel
+from openai import AsyncOpenAI
+from pydantic import BaseModel
+
+from agentize.cache import ResponseCache
+from agentize.lazy import lazy_run
+from agentize.metrics import InstrumentedModel
+
+
+class Answer(BaseModel):
+    text: str
+    score: int
+
+
+def test_memory_tier_is_lru() -> None:
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"
+
+    cache.set("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.stats.evictions == 1
+
+
+def test_disk_tier_survives_reopen(tmp_path) -> None:
+    path = tmp_path / "cache.sqlite"
+    cache = ResponseCache(path)
+    cache.set("key", b"value")
+    cache.close()
+
+    cache = ResponseCache(path)
+    assert cache.get("key") == b"value"
+    assert cache.stats.disk_hits == 1
+
+    assert cache.get("key") == b"value"
+    assert cache.stats.memory_hits == 1
+
+
+def test_ttl_expiry(tmp_path) -> None:
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl=0.01)
+    cache.set("key", b"value")
+    time.sleep(0.02)
+    assert cache.get("key") is None
+    assert cache.stats.misses == 1
+
+
+def test_disk_size_eviction(tmp_path) -> None:
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_entries=1, max_bytes=10)
+    cache.set("a", b"12345")
+    cache.set("b", b"12345")
+    cache.set("c", b"12345")
+    assert cache.disk is not None
+    assert cache.disk.total_bytes <= 10
+    assert cache.get("a") is None
+
+
+def test_make_key_depends_on_settings_and_output_type() -> None:
+    cache = ResponseCache()
+    model = MagicMock(model="gpt-4o-mini")
+    key = cache.make_key("input", "instructions", model, ModelSettings(), Answer)
+
+    assert key == cache.make_key("input", "instructions", model, ModelSettings(), Answer)
+    assert key != cache.make_key("input", "instructions", model, ModelSettings(temperature=0.5), Answer)
+    assert key != cache.make_key("input", "instructions", model, ModelSettings(), None)
+
+
+def test_make_key_depends_on_the_endpoint() -> None:
+    cache = ResponseCache()
+
+    def make_key(model: Model) -> str | None:
+        return cache.make_key("input", None, model, ModelSettings(), None)
+
+    local = OpenAIChatCompletionsModel("llama", AsyncOpenAI(api_key="key", base_url="http://localhost:1/v1"))
+    other = OpenAIChatCompletionsModel("llama", AsyncOpenAI(api_key="key", base_url="http://localhost:2/v1"))
+
+    assert make_key(local) != make_key(other)
+    assert make_key(InstrumentedModel(local)) == make_key(local)
+    # a model without a name cannot be told apart from others of its class, so it is not cached
+    assert make_key(MagicMock(spec=Model)) is None
+
+
+@pytest.mark.asyncio
+async def test_lazy_run_uses_cache() -> None:
+    cache = ResponseCache()
+    result = MagicMock()
+    result.final_output_as.return_value = Answer(text="hello", score=1)
+
+    with patch("agentize.lazy.Runner.run", new_callable=AsyncMock) as mock_run:
+        mock_run.return_value = result
+        model = MagicMock(model="gpt-4o-mini")
+
+        first = await lazy_run("input", "instructions", model=model, output_type=Answer, cache=cache)
+        second = await lazy_run("input", "instructions", model=model, output_type=Answer, cache=cache)
+
+    assert mock_run.await_count == 1
+    assert isinstance(second, Answer)
+    assert second == first
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
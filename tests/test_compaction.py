@@ -0,0 +1,59 @@
+import json
+
+import pytest
+from agents import function_tool
+
+from agentize.compaction import OutputPolicy
+from agentize.compaction import compact_output
+from agentize.compaction import compact_tool
+from agentize.compaction import truncate
+from agentize.metrics import get_metrics_registry
+from agentize.utils import estimate_tokens
+
+
+def test_compact_output_minifies_json_and_drops_empty_fields() -> None:
+    output = json.dumps([{"title": "a", "body": None, "tags": [], "meta": {"x": ""}}, {}], indent=2)
+
+    assert compact_output(output) == '[{"title":"a"}]'
+    assert compact_output({"a": [1, None]}, OutputPolicy(drop_empty=False)) == '{"a":[1,null]}'
+
+
+def test_compact_output_strips_markdown_boilerplate() -> None:
+    text = "# Title  \n\n\n\n![logo](data:image/png;base64,iVBORw0KGgo=)\n<!-- nav -->\nBody text\n"
+
+    assert compact_output(text) == "# Title\n\nBody text"
+
+
+def test_truncate_fits_budget_with_marker() -> None:
+    text = "\n".join(f"line {i} " + "word " * 10 for i in range(500))
+
+    truncated = truncate(text, 200)
+
+    assert estimate_tokens(truncated) <= 200
+    assert truncated.endswith("tokens omitted]")
+    assert text.startswith(truncated.split("\n\n[truncated")[0])
+    assert truncate("short", 200) == "short"
+
+
+@pytest.mark.asyncio
+async def test_compact_tool_keeps_schema_and_counts_saved_tokens() -> None:
+    async def lookup(query: str) -> str:
+        """Look something up.
+
+        Args:
+            query (str): The query.
+        """
+        return json.dumps({"query": query, "results": [{"title": "x" * 40, "snippet": None}] * 50}, indent=4)
+
+    plain = function_tool(lookup)
+    tool = function_tool(compact_tool(max_tokens=100)(lookup))
+    assert tool.params_json_schema == plain.params_json_schema
+    assert tool.description == plain.description
+
+    registry = get_metrics_registry()
+    saved = registry.tool_output_tokens.value("lookup", "saved")
+
+    output = await tool.on_invoke_tool(None, json.dumps({"query": "q"}))  # type: ignore[arg-type]
+
+    assert estimate_tokens(output) <= 100
+    assert registry.tool_output_tokens.value("lookup", "saved") > saved
@@ -0,0 +1,108 @@
+import re
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from fake_server import QuietHandler
+
+from agentize import crawler
+from agentize.crawler import CrawlSettings
+from agentize.crawler import crawl
+from agentize.crawler import normalize_crawl_url
+from agentize.scraper import Scraper
+from agentize.scraper import ScraperSettings
+
+ROBOTS = b"User-agent: *\nDisallow: /private\n"
+
+
+class BlogHandler(QuietHandler):
+    """A small blog: the home page links to 5 posts, every post links home and to a deeper page."""
+
+    requests: list[str]
+
+    def links(self) -> list[str]:
+        if self.path == "/":
+            posts = [f"/post/{i}" for i in range(5)]
+            return [*posts, "/post/1#comments", "/post/2/?utm_source=home", "/private/admin", "/logo.png"]
+        match = re.fullmatch(r"/post/(\d+)((?:/deep)*)", self.path)
+        if match:
+            return ["/", f"{self.path}/deep", "https://elsewhere.example/"]
+        return []
+
+    def do_GET(self) -> None:
+        self.requests.append(self.path)
+        if self.path == "/robots.txt":
+            self.reply(200, ROBOTS, {"Content-Type": "text/plain"})
+            return
+
+        anchors = "".join(f'<li><a href="{link}">{link}</a></li>' for link in self.links())
+        html = f"<html><body><h1>Page {self.path}</h1><p>Text of {self.path}.</p><ul>{anchors}</ul></body></html>"
+        self.reply(200, html.encode(), {"Content-Type": "text/html; charset=utf-8"})
+
+
+@pytest.fixture
+def blog(http_server) -> tuple[str, list[str]]:
+    requests: list[str] = []
+    return http_server(type("Handler", (BlogHandler,), {"requests": requests})), requests
+
+
+def scraper() -> Scraper:
+    return Scraper(ScraperSettings(requests_per_second_per_host=None))
+
+
+def test_normalize_crawl_url() -> None:
+    assert (
+        normalize_crawl_url("HTTPS://Example.COM:443//a//b?z=1&utm_source=x&a=2#top")
+        == "https://example.com/a/b?a=2&z=1"
+    )
+    assert normalize_crawl_url("http://example.com:8080") == "http://example.com:8080/"
+    assert normalize_crawl_url("mailto:someone@example.com") is None
+    assert normalize_crawl_url("javascript:void(0)") is None
+
+
+@pytest.mark.asyncio
+async def test_crawl_follows_links_within_budgets(blog) -> None:
+    base_url, requests = blog
+
+    pages = [page async for page in crawl(f"{base_url}/", CrawlSettings(max_depth=1), scraper=scraper())]
+
+    assert sorted(page.url.removeprefix(base_url) for page in pages) == ["/", *[f"/post/{i}" for i in range(5)]]
+    assert all(page.ok and page.markdown and "# Page" in page.markdown for page in pages)
+    assert {page.depth for page in pages} == {0, 1}
+    # robots.txt is read once, the disallowed, duplicate, external and image links are not fetched
+    assert requests.count("/robots.txt") == 1
+    assert len(requests) == 7
+
+
+@pytest.mark.asyncio
+async def test_crawl_stops_at_page_budget(blog) -> None:
+    base_url, requests = blog
+
+    pages = [page async for page in crawl(base_url, CrawlSettings(max_pages=3), scraper=scraper())]
+
+    assert len(pages) == 3
+    assert len([path for path in requests if path != "/robots.txt"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_crawl_streams_and_can_stop_early(blog) -> None:
+    base_url, requests = blog
+
+    async for page in crawl(base_url, CrawlSettings(concurrency=1), scraper=scraper()):
+        assert page.url == f"{base_url}/"
+        break
+
+    assert len(requests) <= 4
+
+
+@pytest.mark.asyncio
+async def test_crawl_seeds_from_map(blog) -> None:
+    base_url, _ = blog
+    client = MagicMock()
+    client.map = AsyncMock(return_value=[f"{base_url}/post/9/deep/deep", "https://elsewhere.example/"])
+
+    with patch.object(crawler, "get_firecrawl_client", return_value=client):
+        pages = [page async for page in crawl(base_url, CrawlSettings(max_depth=0), use_map=True, scraper=scraper())]
+
+    assert sorted(page.url.removeprefix(base_url) for page in pages) == ["/", "/post/9/deep/deep"]
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+from fake_server import QuietHandler
+
+from agentize.firecrawl_client import FirecrawlClient
+from agentize.firecrawl_client import FirecrawlError
+from agentize.tools.firecrawl import firecrawl_scrape
+from agentize.tools.firecrawl import firecrawl_scrape_many
+from agentize.tools.firecrawl import firecrawl_scrape_sync
+
+
+class FirecrawlHandler(QuietHandler):
+    """A local stand-in of the Firecrawl API that rate-limits the first request to every path."""
+
+    state: dict
+
+    def do_POST(self) -> None:
+        data = json.loads(self.read_body())
+        self.state["requests"].append((self.path, data))
+        if self.path not in self.state["limited"]:
+            self.state["limited"].append(self.path)
+            self.reply_json(429, {"success": False, "error": "rate limited"}, {"Retry-After": "0"})
+        elif self.path == "/v1/scrape":
+            if "missing" in data["url"]:
+                self.reply_json(404, {"success": False, "error": "not found"})
+            else:
+                self.reply_json(200, {"success": True, "data": {"markdown": f"# {data['url']}"}})
+        elif self.path == "/v1/batch/scrape":
+            self.state["batch"] = data["urls"]
+            self.reply_json(200, {"success": True, "id": "job", "url": "unused"})
+
+    def do_GET(self) -> None:
+        self.state["requests"].append((self.path, None))
+        # the first page has the first document, the next page the others except the missing ones
+        if self.path == "/v1/batch/scrape/job":
+            urls = self.state["batch"][:1]
+            next_url = f"http://{self.headers['Host']}/v1/batch/scrape/job?skip=1"
+        else:
+            urls = [url for url in self.state["batch"][1:] if "missing" not in url]
+            next_url = None
+        documents = [{"markdown": f"# {url}", "metadata": {"sourceURL": url}} for url in urls]
+        self.reply_json(200, {"success": True, "status": "completed", "data": documents, "next": next_url})
+
+
+@pytest.fixture
+def firecrawl_server(http_server, monkeypatch: pytest.MonkeyPatch) -> dict[str, list]:
+    state: dict[str, list] = {"requests": [], "limited": []}
+    monkeypatch.setenv("FIRECRAWL_API_URL", http_server(type("Handler", (FirecrawlHandler,), {"state": state})))
+    monkeypatch.setenv("FIRECRAWL_API_KEY", "fake")
+    return state
+
+
+@pytest.mark.asyncio
+async def test_client_retries_rate_limited_requests(firecrawl_server) -> None:
+    client = FirecrawlClient("fake", backoff=0.01)
+
+    document = await client.scrape("https://example.com/a")
+
+    assert document["markdown"] == "# https://example.com/a"
+    assert [path for path, _ in firecrawl_server["requests"]] == ["/v1/scrape", "/v1/scrape"]
+
+    with pytest.raises(FirecrawlError, match="not found"):
+        await client.scrape("https://example.com/missing")
+
+
+@pytest.mark.asyncio
+async def test_client_gives_up_after_max_retries(firecrawl_server) -> None:
+    client = FirecrawlClient("fake", max_retries=0)
+
+    with pytest.raises(FirecrawlError, match="429"):
+        await client.scrape("https://example.com/a")
+
+
+@pytest.mark.asyncio
+async def test_scrape_many_uses_one_batch_job_and_the_cache(firecrawl_server) -> None:
+    assert await firecrawl_scrape("https://example.com/cached") == "# https://example.com/cached"
+
+    urls = [
+        "https://example.com/cached",
+        "https://example.com/b",
+        "https://example.com/missing",
+        "https://example.com/c",
+    ]
+    results = await firecrawl_scrape_many(urls)
+
+    assert [result.url for result in results] == urls
+    assert [result.ok for result in results] == [True, True, False, True]
+    assert results[1].markdown == "# https://example.com/b"
+    assert firecrawl_server["batch"] == urls[1:]
+    assert [path for path, _ in firecrawl_server["requests"]].count("/v1/scrape") == 2
+
+
+def test_firecrawl_scrape_sync(firecrawl_server) -> None:
+    assert firecrawl_scrape_sync("https://example.com/a") == "# https://example.com/a"
@@ -0,0 +1,67 @@
+import asyncio
+from typing import Any
+
+import pytest
+from agents import Model
+
+from agentize.hedging import HedgedModel
+from agentize.hedging import HedgingPolicy
+
+
+class SleepyModel(Model):
+    def __init__(self, name: str, latencies: list[float]) -> None:
+        self.name = name
+        self.latencies = latencies
+        self.calls = 0
+        self.cancelled = 0
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> Any:
+        latency = self.latencies[min(self.calls, len(self.latencies) - 1)]
+        self.calls += 1
+        try:
+            await asyncio.sleep(latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return self.name
+
+    def stream_response(self, *args: Any, **kwargs: Any) -> Any:
+        raise NotImplementedError
+
+
+@pytest.mark.asyncio
+async def test_hedged_model_hedges_slow_requests() -> None:
+    primary = SleepyModel("primary", [0.01] * 10 + [1.0])
+    alternate = SleepyModel("alternate", [0.01])
+    model = HedgedModel(
+        primary,
+        HedgingPolicy(percentile=0.9, max_hedge_rate=0.5, min_samples=10, min_delay=0.0),
+        alternate=alternate,
+    )
+
+    for _ in range(10):
+        assert await model.get_response() == "primary"
+    assert alternate.calls == 0
+
+    assert await model.get_response() == "alternate"
+    await asyncio.sleep(0)
+    assert primary.cancelled == 1
+    assert model.stats.hedges == 1
+    assert model.stats.hedge_wins == 1
+    assert model.stats.hedge_rate == pytest.approx(1 / 11)
+
+
+@pytest.mark.asyncio
+async def test_hedged_model_respects_hedge_budget() -> None:
+    primary = SleepyModel("primary", [0.01] * 5 + [0.1] * 5)
+    alternate = SleepyModel("alternate", [0.01])
+    model = HedgedModel(
+        primary,
+        HedgingPolicy(percentile=0.5, max_hedge_rate=0.1, min_samples=5, min_delay=0.0),
+        alternate=alternate,
+    )
+
+    for _ in range(10):
+        await model.get_response()
+
+    assert model.stats.hedges <= 0.1 * model.stats.requests
@@ -0,0 +1,130 @@
+import asyncio
+import gc
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from agents import RawResponsesStreamEvent
+from openai.types.responses import ResponseTextDeltaEvent
+from pydantic import BaseModel
+
+from agentize.lazy import BatchStats
+from agentize.lazy import FinalOutput
+from agentize.lazy import PartialOutput
+from agentize.lazy import TextDelta
+from agentize.lazy import lazy_run_many
+from agentize.lazy import lazy_run_stream
+
+
+@pytest.mark.asyncio
+async def test_lazy_run_many() -> None:
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_lazy_run(input: str, **kwargs) -> str:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01 * (5 - int(input)))
+        in_flight -= 1
+        if input == "3":
+            raise RuntimeError("boom")
+        return f"output {input}"
+
+    stats = BatchStats()
+    with patch("agentize.lazy.lazy_run", side_effect=fake_lazy_run):
+        results = [
+            result
+            async for result in lazy_run_many(
+                [str(i) for i in range(5)],
+                model=MagicMock(),
+                output_type=str,
+                concurrency=2,
+                stats=stats,
+            )
+        ]
+
+    assert [result.index for result in results] == [0, 1, 2, 3, 4]
+    assert results[0].output == "output 0"
+    assert isinstance(results[3].error, RuntimeError)
+    assert max_in_flight == 2
+    assert stats.succeeded == 4
+    assert stats.failed == 1
+    assert stats.throughput > 0
+
+
+@pytest.mark.asyncio
+async def test_lazy_run_many_stops_on_early_break() -> None:
+    errors: list[dict] = []
+    asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+    started: list[str] = []
+
+    async def fake_lazy_run(input: str, **kwargs) -> str:
+        started.append(input)
+        await asyncio.sleep(0.01)
+        return input
+
+    outputs = []
+    with patch("agentize.lazy.lazy_run", side_effect=fake_lazy_run):
+        results = lazy_run_many([str(i) for i in range(20)], model=MagicMock(), output_type=str, concurrency=2)
+        async for result in results:
+            outputs.append(result.output)
+            if len(outputs) == 2:
+                break
+        # the abandoned generator is closed by the loop once it is collected
+        del results
+        gc.collect()
+        await asyncio.sleep(0.05)
+
+    assert outputs == ["0", "1"]
+    assert len(started) <= 4
+    assert errors == []
+
+
+@pytest.mark.asyncio
+async def test_lazy_run_many_as_completed() -> None:
+    async def fake_lazy_run(input: str, **kwargs) -> str:
+        await asyncio.sleep(0.05 * (3 - int(input)))
+        return input
+
+    with patch("agentize.lazy.lazy_run", side_effect=fake_lazy_run):
+        results = [
+            result.output
+            async for result in lazy_run_many(
+                ["0", "1", "2"], model=MagicMock(), output_type=str, concurrency=3, ordered=False
+            )
+        ]
+
+    assert results == ["2", "1", "0"]
+
+
+class Summary(BaseModel):
+    summary: str
+    insights: list[str]
+
+
+@pytest.mark.asyncio
+async def test_lazy_run_stream() -> None:
+    text = '{"summary": "Short.", "insights": ["one", "two"]}'
+    deltas = [text[i : i + 7] for i in range(0, len(text), 7)]
+
+    async def stream_events():
+        for delta in deltas:
+            yield RawResponsesStreamEvent(data=ResponseTextDeltaEvent.model_construct(delta=delta))
+
+    result = MagicMock()
+    result.stream_events = stream_events
+    result.final_output_as.return_value = Summary.model_validate_json(text)
+
+    with patch("agentize.lazy.Runner.run_streamed", return_value=result):
+        events = [event async for event in lazy_run_stream("input", model=MagicMock(), output_type=Summary)]
+
+    assert "".join(event.delta for event in events if isinstance(event, TextDelta)) == text
+
+    partials = [event for event in events if isinstance(event, PartialOutput)]
+    first_complete_summary = next(event for event in partials if event.output.summary == "Short.")
+    assert "insights" not in first_complete_summary.fields
+    assert partials[-1].output.insights == ["one", "two"]
+
+    assert isinstance(events[-1], FinalOutput)
+    assert events[-1].output == Summary(summary="Short.", insights=["one", "two"])
@@ -0,0 +1,121 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+
+import pytest
+from agents import FunctionTool
+from agents import OpenAIChatCompletionsModel
+from agents import function_tool
+from agents import set_tracing_disabled
+from openai import InternalServerError
+
+from agentize.lazy import lazy_run
+from agentize.metrics import InstrumentedModel
+from agentize.metrics import MetricsRegistry
+from agentize.metrics import get_metrics_registry
+from agentize.metrics import instrument_tool
+from agentize.model import get_openai_client
+
+
+def test_registry_renders_prometheus_text() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("test_requests_total", "Requests.", ["status"])
+    histogram = registry.histogram("test_latency_seconds", "Latency.", ["route"], buckets=[0.1, 1.0])
+
+    counter.inc("ok")
+    counter.inc("ok", amount=2)
+    histogram.observe(0.05, 'a"b')
+    histogram.observe(0.5, 'a"b')
+
+    text = registry.render()
+    assert "# TYPE test_requests_total counter" in text
+    assert 'test_requests_total{status="ok"} 3' in text
+    assert 'test_latency_seconds_bucket{route="a\\"b",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{route="a\\"b",le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{route="a\\"b",le="+Inf"} 2' in text
+    assert 'test_latency_seconds_count{route="a\\"b"} 2' in text
+    assert registry.counter("test_requests_total", "Requests.", ["status"]) is counter
+
+
+@pytest.mark.asyncio
+async def test_instrumented_model_records_calls() -> None:
+    registry = get_metrics_registry()
+    wrapped = MagicMock(model="instrumented-test")
+    wrapped.get_response = AsyncMock(return_value=MagicMock(usage=MagicMock(input_tokens=7, output_tokens=3)))
+    model = InstrumentedModel(wrapped)
+
+    await model.get_response()
+    wrapped.get_response.side_effect = RuntimeError("boom")
+    with pytest.raises(RuntimeError):
+        await model.get_response()
+
+    assert registry.model_requests.value("instrumented-test", "ok") == 1
+    assert registry.model_requests.value("instrumented-test", "error") == 1
+    assert registry.model_tokens.value("instrumented-test", "input") == 7
+    assert registry.model_tokens.value("instrumented-test", "output") == 3
+    assert registry.model_latency.count("instrumented-test") == 2
+
+
+@pytest.mark.asyncio
+async def test_instrumented_model_counts_cancelled_calls_apart() -> None:
+    registry = get_metrics_registry()
+    wrapped = MagicMock(model="cancelled-test")
+    wrapped.get_response = AsyncMock(side_effect=asyncio.Event().wait)
+    model = InstrumentedModel(wrapped)
+
+    # like the losing request of a hedge
+    task = asyncio.create_task(model.get_response())
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert registry.model_requests.value("cancelled-test", "cancelled") == 1
+    assert registry.model_requests.value("cancelled-test", "error") == 0
+
+
+@pytest.mark.asyncio
+async def test_instrument_tool_keeps_schema() -> None:
+    def lookup(city: str) -> str:
+        """Look up the weather of a city.
+
+        Args:
+            city (str): The name of the city.
+        """
+        if not city:
+            raise ValueError("empty city")
+        return f"sunny in {city}"
+
+    plain = function_tool(lookup)
+    instrumented = function_tool(instrument_tool(lookup))
+    assert isinstance(instrumented, FunctionTool)
+    assert instrumented.name == plain.name
+    assert instrumented.description == plain.description
+    assert instrumented.params_json_schema == plain.params_json_schema
+
+    registry = get_metrics_registry()
+    assert await instrumented.on_invoke_tool(MagicMock(), json.dumps({"city": "Taipei"})) == "sunny in Taipei"
+    instrument_tool(lookup)("Tokyo")
+    with pytest.raises(ValueError):
+        instrument_tool(lookup)("")
+
+    assert registry.tool_calls.value("lookup", "ok") == 2
+    assert registry.tool_calls.value("lookup", "error") == 1
+    assert registry.tool_latency.count("lookup") == 3
+
+
+@pytest.mark.asyncio
+async def test_retries_are_counted(fake_openai_server) -> None:
+    set_tracing_disabled(True)
+    base_url = fake_openai_server(status=500)
+    registry = get_metrics_registry()
+    before = registry.model_retries.value("127.0.0.1")
+
+    client = get_openai_client(base_url=base_url, api_key="key").with_options(max_retries=1)
+    model = InstrumentedModel(OpenAIChatCompletionsModel("retry-test", openai_client=client))
+    with pytest.raises(InternalServerError):
+        await lazy_run("hello", model=model)
+
+    assert registry.model_retries.value("127.0.0.1") == before + 1
+    assert registry.model_requests.value("retry-test", "error") == 1
@@ -0,0 +1,48 @@
+import asyncio
+
+import httpx
+import pytest
+from fake_server import QuietHandler
+
+from agentize.model import HTTPSettings
+from agentize.model import LoopAwareTransport
+from agentize.model import get_openai_client
+
+
+class OKHandler(QuietHandler):
+    def do_GET(self) -> None:
+        self.reply(200, b"ok")
+
+
+@pytest.fixture
+def server_url(http_server) -> str:
+    return http_server(OKHandler)
+
+
+def test_transport_pools_per_event_loop(server_url: str) -> None:
+    transport = LoopAwareTransport(HTTPSettings())
+    client = httpx.AsyncClient(transport=transport)
+
+    async def fetch() -> str:
+        resp = await client.get(server_url)
+        return resp.text
+
+    # each asyncio.run creates a new loop; reusing its connections would fail with a closed loop
+    assert asyncio.run(fetch()) == "ok"
+    assert asyncio.run(fetch()) == "ok"
+
+    async def fetch_twice() -> None:
+        await fetch()
+        await fetch()
+        assert len(transport._pools) == 1
+        await transport.aclose()
+
+    asyncio.run(fetch_twice())
+
+
+def test_get_openai_client_is_shared_per_endpoint() -> None:
+    settings = HTTPSettings(max_connections=10)
+    client = get_openai_client(base_url="http://localhost:1/v1", api_key="key", http_settings=settings)
+
+    assert client is get_openai_client(base_url="http://localhost:1/v1", api_key="key", http_settings=settings)
+    assert client is not get_openai_client(base_url="http://localhost:2/v1", api_key="key", http_settings=settings)
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import threading
+import time
+from contextvars import ContextVar
+
+import pytest
+from agents import function_tool
+
+from agentize.offload import offload
+
+request_id: ContextVar[str] = ContextVar("request_id", default="")
+
+
+def lookup(query: str, limit: int) -> str:
+    """Look something up.
+
+    Args:
+        query (str): The query.
+        limit (int): The maximum number of results.
+    """
+    return f"{query}:{limit}:{threading.current_thread().name}:{request_id.get()}"
+
+
+def test_offload_keeps_tool_schema() -> None:
+    plain = function_tool(lookup)
+    offloaded = function_tool(offload(max_concurrency=2, timeout=1)(lookup))
+
+    assert offloaded.name == plain.name
+    assert offloaded.description == plain.description
+    assert offloaded.params_json_schema == plain.params_json_schema
+
+
+@pytest.mark.asyncio
+async def test_offload_runs_in_tool_thread_with_context() -> None:
+    tool = function_tool(offload()(lookup))
+    request_id.set("abc")
+
+    result = await tool.on_invoke_tool(None, json.dumps({"query": "q", "limit": 3}))  # type: ignore[arg-type]
+
+    query, limit, thread_name, context_value = result.split(":")
+    assert (query, limit) == ("q", "3")
+    assert thread_name.startswith("agentize-tool")
+    assert context_value == "abc"
+
+
+@pytest.mark.asyncio
+async def test_offload_limits_concurrency_without_blocking_loop() -> None:
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    @offload(max_concurrency=2)
+    def blocking() -> None:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    ticks = 0
+
+    async def heartbeat() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    task = asyncio.create_task(heartbeat())
+    await asyncio.gather(*(blocking() for _ in range(6)))
+    task.cancel()
+
+    assert peak == 2
+    # 3 rounds of 50ms leave plenty of time for the heartbeat
+    assert ticks >= 10
+
+
+@pytest.mark.asyncio
+async def test_offload_timeout_keeps_slot_until_thread_finishes() -> None:
+    release = threading.Event()
+
+    @offload(max_concurrency=1, timeout=0.05)
+    def stuck() -> str:
+        release.wait(1)
+        return "done"
+
+    with pytest.raises(TimeoutError, match="stuck did not finish in 0.05s"):
+        await stuck()
+
+    # the first call still holds the only slot
+    second = asyncio.create_task(stuck())
+    await asyncio.sleep(0.02)
+    release.set()
+    assert await second == "done"
@@ -0,0 +1,137 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from agentize.pipeline import ResearchPipeline
+from agentize.pipeline import ResearchSettings
+from agentize.prompts.financial_research import FINANCIAL_RESEARCH_PROMPTS
+from agentize.prompts.financial_research import FinancialReportData
+from agentize.prompts.financial_research import FinancialSearchItem
+from agentize.prompts.financial_research import FinancialSearchPlan
+from agentize.prompts.financial_research import VerificationResult
+from agentize.prompts.research import RESEARCH_PROMPTS
+
+REPORT = FinancialReportData(short_summary="Summary.", markdown_report="# Report", follow_up_questions=[])
+
+
+def fake_runner(search_delays: dict[str, float], plan_delay: float = 0.0, fail: frozenset[str] = frozenset()):
+    calls: list[str] = []
+
+    async def run(agent, input: str):
+        role = agent.name.split("_")[1]
+        calls.append(role)
+        output: Any
+        if role in fail:
+            raise RuntimeError(f"{role} failed")
+        if role == "planner":
+            await asyncio.sleep(plan_delay)
+            searches = [FinancialSearchItem(reason="why", query=query) for query in search_delays]
+            output = FinancialSearchPlan(searches=searches)
+        elif role == "search":
+            query = input.splitlines()[0].removeprefix("Search term: ")
+            await asyncio.sleep(search_delays.get(query, 0.0))
+            output = f"summary of {query}"
+        elif role == "writer":
+            assert "summary of" in input
+            output = REPORT
+        else:
+            output = VerificationResult(verified=True, issues="")
+        return SimpleNamespace(final_output=output, final_output_as=lambda _: output)
+
+    return run, calls
+
+
+def make_pipeline(settings: ResearchSettings | None = None, prompts=FINANCIAL_RESEARCH_PROMPTS) -> ResearchPipeline:
+    return ResearchPipeline(prompts, settings=settings, reasoning_model=MagicMock(), search_model=MagicMock())
+
+
+@pytest.mark.asyncio
+async def test_run_plans_searches_writes_and_verifies() -> None:
+    run, calls = fake_runner({"a": 0.0, "b": 0.0, "c": 0.0})
+
+    with patch("agentize.pipeline.Runner.run", side_effect=run):
+        result = await make_pipeline().run("query")
+
+    assert result.ok
+    assert result.search_results == ["summary of a", "summary of b", "summary of c"]
+    assert result.report == REPORT
+    assert isinstance(result.verification, VerificationResult)
+    assert result.verification.verified
+    assert [timing.name for timing in result.timings] == ["plan", "search", "write", "verify"]
+    assert result.timings[1].completed == 3
+    assert calls.count("search") == 3
+
+
+@pytest.mark.asyncio
+async def test_stragglers_are_cancelled_after_the_quorum() -> None:
+    run, _ = fake_runner({"a": 0.0, "b": 0.0, "c": 0.0, "slow": 10.0})
+    settings = ResearchSettings(search_quorum=0.75, straggler_grace=0.1)
+
+    with patch("agentize.pipeline.Runner.run", side_effect=run):
+        result = await make_pipeline(settings).run("query")
+
+    assert result.ok
+    assert result.search_results == ["summary of a", "summary of b", "summary of c"]
+    search = result.timings[1]
+    assert (search.completed, search.failed, search.cancelled) == (3, 0, 1)
+    assert search.duration < 1
+
+
+@pytest.mark.asyncio
+async def test_stragglers_are_waited_for_by_default() -> None:
+    run, _ = fake_runner({"a": 0.0, "b": 0.0, "c": 0.0, "slow": 0.2})
+
+    with patch("agentize.pipeline.Runner.run", side_effect=run):
+        result = await make_pipeline().run("query")
+
+    assert result.search_results == ["summary of a", "summary of b", "summary of c", "summary of slow"]
+    assert result.timings[1].cancelled == 0
+
+
+@pytest.mark.asyncio
+async def test_search_deadline_and_concurrency() -> None:
+    run, _ = fake_runner({f"q{i}": 0.1 for i in range(6)})
+    settings = ResearchSettings(search_concurrency=2, search_deadline=0.25, search_quorum=1.0)
+
+    with patch("agentize.pipeline.Runner.run", side_effect=run):
+        result = await make_pipeline(settings).run("query")
+
+    # two at a time, so only two rounds of searches finish before the deadline
+    search = result.timings[1]
+    assert (search.completed, search.cancelled) == (4, 2)
+    assert result.report == REPORT
+
+
+@pytest.mark.asyncio
+async def test_partial_results_when_stages_fail() -> None:
+    run, calls = fake_runner({"a": 0.0}, plan_delay=1.0, fail=frozenset({"writer"}))
+    settings = ResearchSettings(plan_timeout=0.05)
+
+    with patch("agentize.pipeline.Runner.run", side_effect=run):
+        result = await make_pipeline(settings, prompts=RESEARCH_PROMPTS).run("query")
+
+    # the query itself is searched when planning times out, and the summaries survive the writer failing
+    assert result.plan is None
+    assert result.search_results == ["summary of query"]
+    assert result.report is None
+    assert not result.ok
+    assert result.errors == ["plan: TimeoutError: deadline exceeded", "write: RuntimeError: writer failed"]
+    assert [timing.name for timing in result.timings] == ["plan", "search", "write"]
+    assert "verifier" not in calls
+
+
+@pytest.mark.asyncio
+async def test_no_report_without_enough_search_results() -> None:
+    run, calls = fake_runner({"a": 0.0, "b": 0.0}, fail=frozenset({"search"}))
+
+    with patch("agentize.pipeline.Runner.run", side_effect=run):
+        result = await make_pipeline().run("query")
+
+    assert result.search_results == []
+    assert result.timings[1].failed == 2
+    assert result.errors == ["search: 0 of 2 searches finished"]
+    assert "writer" not in calls
@@ -0,0 +1,79 @@
+import pytest
+from agents import ModelSettings
+from agents import ModelTracing
+from openai import BadRequestError
+from openai.types.responses import ResponseOutputMessage
+from openai.types.responses import ResponseOutputText
+
+from agentize.router import Endpoint
+from agentize.router import RouterModel
+
+
+async def ask(model: RouterModel) -> str:
+    response = await model.get_response(
+        system_instructions=None,
+        input="hello",
+        model_settings=ModelSettings(),
+        tools=[],
+        output_schema=None,
+        handoffs=[],
+        tracing=ModelTracing.DISABLED,
+        previous_response_id=None,
+    )
+    message = response.output[0]
+    assert isinstance(message, ResponseOutputMessage)
+    content = message.content[0]
+    assert isinstance(content, ResponseOutputText)
+    return content.text
+
+
+@pytest.mark.asyncio
+async def test_router_fails_over_and_ejects(fake_openai_server) -> None:
+    router = RouterModel(
+        [
+            Endpoint.from_openai("broken", "fake", base_url=fake_openai_server(status=503), api_key="key"),
+            Endpoint.from_openai("rate-limited", "fake", base_url=fake_openai_server(status=429), api_key="key"),
+            Endpoint.from_openai("healthy", "fake", base_url=fake_openai_server(content="hi"), api_key="key"),
+        ],
+        failure_threshold=2,
+    )
+
+    for _ in range(3):
+        assert await ask(router) == "hi"
+
+    stats = router.stats()
+    assert not stats["broken"].healthy
+    assert not stats["rate-limited"].healthy
+    assert stats["healthy"].healthy
+    assert stats["healthy"].latency is not None
+    # once ejected, the unhealthy endpoints are no longer tried
+    assert stats["broken"].requests == 2
+    assert stats["rate-limited"].requests == 2
+
+
+@pytest.mark.asyncio
+async def test_router_prefers_faster_endpoint(fake_openai_server) -> None:
+    router = RouterModel(
+        [
+            Endpoint.from_openai("slow", "fake", base_url=fake_openai_server(content="slow", delay=0.1), api_key="key"),
+            Endpoint.from_openai("fast", "fake", base_url=fake_openai_server(content="fast"), api_key="key"),
+        ]
+    )
+
+    answers = [await ask(router) for _ in range(6)]
+    assert answers.count("fast") >= 5
+
+
+@pytest.mark.asyncio
+async def test_router_does_not_fail_over_client_errors(fake_openai_server) -> None:
+    router = RouterModel(
+        [
+            Endpoint.from_openai("bad-request", "fake", base_url=fake_openai_server(status=400), api_key="key"),
+            Endpoint.from_openai("healthy", "fake", base_url=fake_openai_server(), api_key="key"),
+        ]
+    )
+    router.stats()["healthy"].latency = 1.0
+    router.stats()["bad-request"].latency = 0.001
+
+    with pytest.raises(BadRequestError):
+        await ask(router)
@@ -0,0 +1,181 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from fake_server import QuietHandler
+
+from agentize.cache import ScrapeCache
+from agentize.cache import ScrapeEntry
+from agentize.scraper import Scraper
+from agentize.scraper import ScraperSettings
+from agentize.tools.markitdown import markitdown_scrape
+from agentize.tools.markitdown import markitdown_scrape_sync
+
+HTML = b"<html><head><title>Hello</title></head><body><h1>Hello</h1><p>Some <b>bold</b> text.</p></body></html>"
+
+
+@pytest.fixture
+def site(http_server) -> tuple[str, dict[str, int]]:
+    state = {"in_flight": 0, "max_in_flight": 0}
+    lock = threading.Lock()
+
+    class Handler(QuietHandler):
+        def do_GET(self) -> None:
+            with lock:
+                state["in_flight"] += 1
+                state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            try:
+                if self.path.startswith("/slow"):
+                    time.sleep(0.05)
+                state["requests"] = state.get("requests", 0) + 1
+                if self.path == "/etag" and self.headers.get("If-None-Match") == '"v1"':
+                    self.reply(304, headers={"ETag": '"v1"'})
+                    return
+
+                if self.path == "/binary":
+                    self.reply(200, bytes(range(256)) * 8, {"Content-Type": "application/x-foo"})
+                    return
+
+                headers = {"Content-Type": "text/html; charset=utf-8"}
+                if self.path == "/etag":
+                    headers["ETag"] = '"v1"'
+                self.reply(403 if self.path == "/forbidden" else 200, HTML, headers)
+            finally:
+                with lock:
+                    state["in_flight"] -= 1
+
+    return http_server(Handler), state
+
+
+@pytest.mark.asyncio
+async def test_scraper_converts_html_to_markdown(site) -> None:
+    base_url, _ = site
+    markdown = await Scraper().scrape(f"{base_url}/page")
+
+    assert "# Hello" in markdown
+    assert "**bold**" in markdown
+
+
+@pytest.mark.asyncio
+async def test_scraper_limits_requests_per_host(site) -> None:
+    base_url, state = site
+    scraper = Scraper(ScraperSettings(max_connections_per_host=2, requests_per_second_per_host=None))
+
+    await asyncio.gather(*(scraper.fetch(f"{base_url}/slow/{i}") for i in range(8)))
+
+    assert state["max_in_flight"] == 2
+
+
+def test_scraper_works_across_event_loops(site) -> None:
+    base_url, _ = site
+    scraper = Scraper()
+
+    for _ in range(2):
+        page = asyncio.run(scraper.fetch(f"{base_url}/page"))
+        assert page.content == HTML
+        assert page.content_type == "text/html"
+
+
+@pytest.mark.asyncio
+async def test_markitdown_scrape_falls_back_to_firecrawl(site) -> None:
+    base_url, _ = site
+
+    with patch("agentize.tools.markitdown.firecrawl_scrape", return_value="from firecrawl") as firecrawl_scrape:
+        assert await markitdown_scrape(f"{base_url}/forbidden") == "from firecrawl"
+
+    firecrawl_scrape.assert_called_once_with(f"{base_url}/forbidden")
+
+
+def test_markitdown_scrape_sync(site) -> None:
+    base_url, _ = site
+
+    assert "Some **bold** text." in markitdown_scrape_sync(f"{base_url}/page")
+
+
+@pytest.mark.asyncio
+async def test_scraper_answers_fresh_documents_from_the_cache(site, tmp_path) -> None:
+    base_url, state = site
+    cache = ScrapeCache(tmp_path / "scrape.sqlite")
+    scraper = Scraper(cache=cache)
+
+    with patch.object(scraper, "convert", wraps=scraper.convert) as convert:
+        first = await scraper.scrape(f"{base_url}/page")
+        second = await scraper.scrape(f"{base_url}/page")
+
+    assert first == second
+    assert state["requests"] == 1
+    assert convert.call_count == 1
+
+    # a new process reads the entry from disk
+    assert await Scraper(cache=ScrapeCache(tmp_path / "scrape.sqlite")).scrape(f"{base_url}/page") == first
+    assert state["requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scraper_revalidates_stale_documents(site) -> None:
+    base_url, state = site
+    cache = ScrapeCache(ttl=0)
+    scraper = Scraper(cache=cache)
+
+    markdown = await scraper.scrape(f"{base_url}/etag")
+    with patch.object(scraper, "convert", wraps=scraper.convert) as convert:
+        assert await scraper.scrape(f"{base_url}/etag") == markdown
+
+    assert state["requests"] == 2
+    assert convert.call_count == 0
+    assert cache.stats.revalidations == 1
+
+
+def test_scrape_cache_domain_ttls(tmp_path) -> None:
+    cache = ScrapeCache(ttl=60, domain_ttls={"example.com": 0, "static.example.com": 3600})
+
+    assert cache.ttl_for("https://www.example.com/a") == 0
+    assert cache.ttl_for("https://static.example.com/a") == 3600
+    assert cache.ttl_for("https://other.org/a") == 60
+
+    cache.set(ScrapeEntry("https://news.example.com/", "# News", etag='"x"'))
+    entry = cache.get("https://news.example.com/")
+    assert entry is not None
+    assert not cache.is_fresh(entry)
+    assert entry.conditional_headers() == {"If-None-Match": '"x"'}
+    assert cache.get("https://news.example.com/", source="firecrawl") is None
+
+
+@pytest.mark.asyncio
+async def test_scrape_many_keeps_order_and_reports_errors(site) -> None:
+    base_url, state = site
+    scraper = Scraper()
+    urls = [f"{base_url}/slow/1", f"{base_url}/forbidden", f"{base_url}/page", f"{base_url}/slow/1"]
+
+    results = await scraper.scrape_many(urls)
+
+    assert [result.url for result in results] == urls
+    assert [result.ok for result in results] == [True, False, True, True]
+    assert "403" in (results[1].error or "")
+    assert state["requests"] == 3
+
+
+@pytest.mark.asyncio
+async def test_scrape_many_reports_unconvertible_documents(site) -> None:
+    base_url, _ = site
+    urls = [f"{base_url}/binary", f"{base_url}/page"]
+
+    results = await Scraper().scrape_many(urls)
+
+    assert [result.ok for result in results] == [False, True]
+    assert "Cannot convert application/x-foo" in (results[0].error or "")
+    assert "Some **bold** text." in (results[1].markdown or "")
+
+
+@pytest.mark.asyncio
+async def test_scraper_rate_limits_requests_per_host(site) -> None:
+    base_url, state = site
+    scraper = Scraper(ScraperSettings(requests_per_second_per_host=10))
+
+    start = time.perf_counter()
+    await scraper.scrape_many([f"{base_url}/page/{i}" for i in range(15)])
+
+    # a burst of 10, then 10 per second
+    assert time.perf_counter() - start >= 0.4
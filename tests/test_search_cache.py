@@ -0,0 +1,170 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from agentize.search_cache import SearchCache
+from agentize.search_cache import dedupe_results
+from agentize.search_cache import normalize_query
+from agentize.search_cache import search_run
+from agentize.tools.duckduckgo import duckduckgo_search
+
+
+async def search(**arguments) -> str:
+    return await duckduckgo_search.on_invoke_tool(MagicMock(), json.dumps(arguments))
+
+
+def test_normalize_query() -> None:
+    assert normalize_query("  Kubernetes\tScheduler ") == normalize_query("kubernetes scheduler")
+    assert normalize_query("scheduler kubernetes") != normalize_query("kubernetes scheduler")
+    assert normalize_query("what is the kubernetes scheduler?") != normalize_query("kubernetes scheduler")
+    assert normalize_query("The Who") == "the who"
+
+
+def test_search_cache_reuses_results_until_they_expire() -> None:
+    cache = SearchCache(ttl=0.05)
+    calls = []
+
+    def search() -> list[dict[str, str]]:
+        calls.append(1)
+        return [{"url": "https://example.com"}]
+
+    key = cache.make_key("test", "Python asyncio", max_results=5)
+    assert cache.search(key, search) == cache.search(cache.make_key("test", "python  ASYNCIO", max_results=5), search)
+    assert len(calls) == 1
+    assert cache.search(cache.make_key("test", "python asyncio", max_results=10), search)
+    assert len(calls) == 2
+
+    time.sleep(0.06)
+    cache.search(key, search)
+    assert len(calls) == 3
+
+
+def test_make_key_without_a_query() -> None:
+    cache = SearchCache()
+
+    assert cache.make_key("test", ori="TPE", dst="NRT") == cache.make_key("test", dst="NRT", ori="TPE")
+    assert cache.make_key("test", ori="TPE") != cache.make_key("test", "", ori="TPE")
+
+
+@pytest.mark.asyncio
+async def test_search_cache_coalesces_searches_in_flight() -> None:
+    cache = SearchCache()
+    calls = []
+
+    async def search() -> list[str]:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return ["result"]
+
+    key = cache.make_key("test", "query")
+    results = await asyncio.gather(*(cache.asearch(key, search) for _ in range(5)))
+
+    assert results == [["result"]] * 5
+    assert len(calls) == 1
+    assert cache.stats.coalesced == 4
+
+
+@pytest.mark.asyncio
+async def test_search_cache_retries_when_the_leader_is_cancelled() -> None:
+    cache = SearchCache()
+    calls = []
+
+    async def search() -> list[str]:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return ["result"]
+
+    key = cache.make_key("test", "query")
+    leader = asyncio.create_task(cache.asearch(key, search))
+    await asyncio.sleep(0)
+    waiters = [asyncio.create_task(cache.asearch(key, search)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    assert await asyncio.gather(*waiters) == [["result"]] * 3
+    assert leader.cancelled()
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_search_cache_ignores_cancelled_waiters() -> None:
+    cache = SearchCache()
+
+    async def search() -> list[str]:
+        await asyncio.sleep(0.05)
+        return ["result"]
+
+    key = cache.make_key("test", "query")
+    leader = asyncio.create_task(cache.asearch(key, search))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.asearch(key, search))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+
+    assert await leader == ["result"]
+    assert waiter.cancelled()
+
+
+def test_search_cache_coalesces_searches_across_threads() -> None:
+    cache = SearchCache()
+    started = threading.Event()
+    calls = []
+
+    def search() -> list[str]:
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return ["result"]
+
+    key = cache.make_key("test", "query")
+    with ThreadPoolExecutor(4) as executor:
+        leader = executor.submit(cache.search, key, search)
+        started.wait()
+        followers = [executor.submit(cache.search, key, search) for _ in range(3)]
+        results = [leader.result()] + [future.result() for future in followers]
+
+    assert results == [["result"]] * 4
+    assert len(calls) == 1
+
+
+def test_search_cache_does_not_cache_errors() -> None:
+    cache = SearchCache()
+    key = cache.make_key("test", "query")
+
+    def fail() -> list[str]:
+        raise RuntimeError("throttled")
+
+    with pytest.raises(RuntimeError):
+        cache.search(key, fail)
+    assert cache.search(key, lambda: ["result"]) == ["result"]
+
+
+def test_results_are_deduplicated_within_a_run() -> None:
+    results = [{"href": "https://example.com/a/"}, {"href": "https://EXAMPLE.com/a#top"}, {"href": "https://b.org"}]
+    assert dedupe_results(results, url_key="href") == results
+
+    with search_run():
+        assert dedupe_results(results, url_key="href") == [results[0], results[2]]
+        assert dedupe_results([{"href": "https://b.org/"}, {"href": "https://c.org"}], url_key="href") == [
+            {"href": "https://c.org"}
+        ]
+
+
+@pytest.mark.asyncio
+async def test_duckduckgo_search_is_cached_and_deduplicated() -> None:
+    hits = [{"title": "A", "href": "https://example.com/a"}, {"title": "B", "href": "https://example.com/b"}]
+
+    with patch("agentize.tools.duckduckgo.DDGS") as ddgs, search_run():
+        ddgs.return_value.text.return_value = hits
+        first = json.loads(await search(query="Python packaging", max_results=5))
+        second = json.loads(await search(query="python  packaging", max_results=5))
+
+    assert first == hits
+    assert second == []
+    assert ddgs.return_value.text.call_count == 1
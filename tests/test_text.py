@@ -0,0 +1,48 @@
+from agentize.text import split_markdown
+from agentize.utils import estimate_tokens
+
+DOCUMENT = """# Title
+
+Intro paragraph.
+
+## First
+
+First section body that is fairly long and keeps going for a while.
+
+```python
+# not a heading
+print("hello")
+```
+
+## Second
+
+Second section body.
+"""
+
+
+def test_split_markdown_keeps_small_text_whole() -> None:
+    assert split_markdown(DOCUMENT, max_tokens=1000) == [DOCUMENT]
+    assert split_markdown("", max_tokens=10) == []
+
+
+def test_split_markdown_splits_on_headings() -> None:
+    chunks = split_markdown(DOCUMENT, max_tokens=40)
+
+    assert "".join(chunks) == DOCUMENT
+    assert all(estimate_tokens(chunk) <= 40 for chunk in chunks)
+    assert chunks[-1].startswith("## Second")
+    # the comment in the code block is not a split point
+    assert not any(chunk.startswith("# not a heading") for chunk in chunks)
+
+
+def test_split_markdown_cuts_long_lines() -> None:
+    text = "word " * 1000
+    chunks = split_markdown(text, max_tokens=100)
+
+    assert "".join(chunks) == text
+    assert all(estimate_tokens(chunk) <= 100 for chunk in chunks)
+
+    text = "字" * 250
+    chunks = split_markdown(text, max_tokens=100)
+    assert "".join(chunks) == text
+    assert [len(chunk) for chunk in chunks] == [100, 100, 50]
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from agentize.utils import LoopLocal
+from agentize.utils import estimate_tokens
+from agentize.utils import parse_partial_json
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("", None),
+        ("{", {}),
+        ('{"a": "He', {"a": "He"}),
+        ('{"a": "x", "b', {"a": "x"}),
+        ('{"a": [1, 2, ', {"a": [1, 2]}),
+        ('{"a": tr', {}),
+        ('{"a": "q\\"b', {"a": 'q"b'}),
+        ('{"a": "x\\u12', {"a": "x"}),
+        ('{"a": {"b": [{"c": 1}, {"c', {"a": {"b": [{"c": 1}, {}]}}),
+        ('{"a": 1}', {"a": 1}),
+    ],
+)
+def test_parse_partial_json(text: str, expected) -> None:
+    assert parse_partial_json(text) == expected
+
+
+def test_estimate_tokens() -> None:
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("台灣") == 2
+
+
+def test_loop_local() -> None:
+    local = LoopLocal(asyncio.Event)
+
+    async def get() -> asyncio.Event:
+        assert local.get() is local.get()
+        return local.get()
+
+    first = asyncio.run(get())
+    second = asyncio.run(get())
+
+    # every loop has its own value, and the values of closed loops are dropped
+    assert first is not second
+    assert len(local) == 1
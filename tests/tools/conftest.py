@@ -0,0 +1,108 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass
+from dataclasses import field
+from urllib.parse import parse_qs
+from urllib.parse import unquote
+from urllib.parse import urlsplit
+
+import pytest
+from fake_server import QuietHandler
+
+from agentize.tools.boto3 import get_s3_client
+
+# the headers S3 stores with an object and returns on GET and HEAD
+STORED_HEADERS = ("content-type", "content-encoding", "cache-control")
+
+
+@dataclass
+class S3Object:
+    body: bytes
+    headers: dict[str, str]
+
+
+@dataclass
+class S3State:
+    objects: dict[str, S3Object] = field(default_factory=dict)
+    uploads: dict[str, tuple[dict[str, str], dict[int, bytes]]] = field(default_factory=dict)
+    requests: list[tuple[str, str]] = field(default_factory=list)
+    delay: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class S3Handler(QuietHandler):
+    """A local stand-in of S3 with path-style single and multipart uploads, HEAD and GET."""
+
+    state: S3State
+
+    def target(self) -> tuple[str, dict[str, list[str]]]:
+        time.sleep(self.state.delay)
+        parts = urlsplit(self.path)
+        return unquote(parts.path), parse_qs(parts.query, keep_blank_values=True)
+
+    def object_headers(self) -> dict[str, str]:
+        return {
+            name: value
+            for name, value in self.headers.items()
+            if name.lower() in STORED_HEADERS or name.lower().startswith("x-amz-meta-")
+        }
+
+    def do_PUT(self) -> None:
+        path, query = self.target()
+        body = self.read_body()
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        with self.state.lock:
+            self.state.requests.append(("PUT", path))
+            if "uploadId" in query:
+                self.state.uploads[query["uploadId"][0]][1][int(query["partNumber"][0])] = body
+            else:
+                self.state.objects[path] = S3Object(body, self.object_headers())
+        self.reply(200, headers={"ETag": etag})
+
+    def do_POST(self) -> None:
+        path, query = self.target()
+        self.read_body()
+        with self.state.lock:
+            self.state.requests.append(("POST", path))
+            if "uploads" in query:
+                upload_id = uuid.uuid4().hex
+                self.state.uploads[upload_id] = (self.object_headers(), {})
+                xml = f"<InitiateMultipartUploadResult><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>"
+            else:
+                headers, parts = self.state.uploads.pop(query["uploadId"][0])
+                self.state.objects[path] = S3Object(b"".join(parts[n] for n in sorted(parts)), headers)
+                etag = f'"{uuid.uuid4().hex}-{len(parts)}"'
+                xml = f"<CompleteMultipartUploadResult><ETag>{etag}</ETag></CompleteMultipartUploadResult>"
+        self.reply(200, xml.encode(), {"Content-Type": "application/xml"})
+
+    def do_GET(self) -> None:
+        path, _ = self.target()
+        with self.state.lock:
+            self.state.requests.append((self.command, path))
+            obj = self.state.objects.get(path)
+        if obj is None:
+            self.reply(404, b"<Error><Code>NoSuchKey</Code></Error>", {"Content-Type": "application/xml"})
+        else:
+            self.reply(200, obj.body, obj.headers)
+
+    def do_HEAD(self) -> None:
+        self.do_GET()
+
+
+@pytest.fixture
+def s3_server(http_server, monkeypatch: pytest.MonkeyPatch) -> Iterator[S3State]:
+    """Point the shared S3 client at a local S3 stand-in with a `reports` bucket."""
+    state = S3State()
+    monkeypatch.setenv("AWS_ENDPOINT_URL", http_server(type("Handler", (S3Handler,), {"state": state})))
+    monkeypatch.setenv("AWS_BUCKET_NAME", "reports")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    # checksums would otherwise be sent as aws-chunked trailers
+    monkeypatch.setenv("AWS_REQUEST_CHECKSUM_CALCULATION", "when_required")
+    get_s3_client.cache_clear()
+    yield state
+    get_s3_client.cache_clear()
@@ -0,0 +1,91 @@
+import gzip
+import os
+import time
+
+import pytest
+from boto3.s3.transfer import TransferConfig
+
+from agentize.tools import boto3 as boto3_tools
+from agentize.tools.boto3 import get_s3_client
+from agentize.tools.boto3 import render_markdown
+from agentize.tools.boto3 import upload_markdown
+from agentize.tools.boto3 import upload_markdown_many
+
+
+def test_render_markdown_escapes_title_and_renders_tables() -> None:
+    page = render_markdown("<R&D>", "# Report\n\n| a | b |\n|---|---|\n| 1 | 2 |\n")
+
+    assert "<title>&lt;R&amp;D&gt;</title>" in page
+    assert "<h1>Report</h1>" in page
+    assert "<td>1</td>" in page
+    assert "<script" not in page
+
+
+def test_upload_markdown_stores_compressed_html(s3_server) -> None:
+    assert upload_markdown("Weekly", "# Weekly\n\nAll good.", "weekly.md")
+
+    (key,) = s3_server.objects
+    obj = s3_server.objects[key]
+    assert key.startswith("/reports/") and key.endswith("/weekly")
+    assert obj.headers["Content-Encoding"] == "gzip"
+    assert obj.headers["Content-Type"] == "text/html; charset=utf-8"
+    assert obj.headers["Cache-Control"] == boto3_tools.CACHE_CONTROL
+    assert "<h1>Weekly</h1>" in gzip.decompress(obj.body).decode()
+
+
+def test_upload_markdown_reuses_client(s3_server) -> None:
+    upload_markdown("a", "a", "a")
+    upload_markdown("b", "b", "b")
+
+    assert get_s3_client.cache_info().misses == 1
+    assert len(s3_server.objects) == 2
+
+
+def test_large_report_uses_multipart_upload(s3_server, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(boto3_tools, "TRANSFER_CONFIG", TransferConfig(multipart_threshold=1024))
+    content = os.urandom(4096).hex()
+
+    assert upload_markdown("Large", content, "large")
+
+    (obj,) = s3_server.objects.values()
+    assert ("POST", next(iter(s3_server.objects))) in s3_server.requests
+    assert obj.headers["Content-Encoding"] == "gzip"
+    assert content in gzip.decompress(obj.body).decode()
+
+
+def test_upload_markdown_many_skips_identical_pages(s3_server) -> None:
+    documents = [(f"Report {i}", f"# Report {i}", f"report-{i}") for i in range(5)]
+    assert all(result.ok and not result.skipped for result in upload_markdown_many(documents))
+
+    changed = [*documents[:4], ("Report 4", "# Report 4, revised", "report-4")]
+    results = upload_markdown_many(changed)
+
+    assert [result.skipped for result in results] == [True, True, True, True, False]
+    assert [result.key.rsplit("/", 1)[1] for result in results] == [f"report-{i}" for i in range(5)]
+    assert sum(method == "PUT" for method, _ in s3_server.requests) == 6
+    assert all(result.bytes > 0 and result.latency > 0 for result in results)
+
+
+def test_upload_markdown_many_reports_errors_per_object(s3_server, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("AWS_ENDPOINT_URL", "http://127.0.0.1:1")
+    monkeypatch.setenv("AWS_MAX_ATTEMPTS", "1")
+    get_s3_client.cache_clear()
+
+    results = upload_markdown_many([("a", "a", "a"), ("b", "b", "")])
+
+    assert [result.ok for result in results] == [False, False]
+    assert all(result.error for result in results)
+    # unnamed pages are named after their content
+    assert len(results[1].key.rsplit("/", 1)[1]) == 16
+
+
+def test_upload_markdown_many_scales_with_workers(s3_server) -> None:
+    s3_server.delay = 0.1
+    documents = [(str(i), str(i), str(i)) for i in range(16)]
+
+    start = time.perf_counter()
+    results = upload_markdown_many(documents, max_workers=16)
+
+    assert all(result.ok for result in results)
+    # a HEAD and a PUT per page, 3.2s one at a time
+    assert time.perf_counter() - start < 1.5
@@ -0,0 +1,69 @@
+from collections.abc import Iterator
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from agentize.tools import telegraph
+from agentize.tools.telegraph import get_telegraph
+from agentize.tools.telegraph import publish_markdown
+from agentize.tools.telegraph import publish_markdown_many
+from agentize.tools.telegraph import split_page
+
+SECTION = "## Section {i}\n\n" + "Lorem ipsum dolor sit amet. " * 40 + "\n\n"
+
+
+@pytest.fixture
+def client() -> Iterator[MagicMock]:
+    client = MagicMock()
+    client.create_page.side_effect = lambda title, content: f"https://telegra.ph/{title.replace(' ', '-')}"
+    client.edit_page.side_effect = lambda url, content, title: url
+    with patch.object(telegraph, "get_telegraph", return_value=client):
+        yield client
+
+
+def test_get_telegraph_reuses_account(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TELEGRAPH_ACCESS_TOKEN", "token")
+    get_telegraph.cache_clear()
+    with patch.object(telegraph, "TelegraphAPI") as api:
+        assert get_telegraph() is get_telegraph()
+    api.assert_called_once_with(access_token="token")
+    get_telegraph.cache_clear()
+
+
+def test_split_page_splits_on_headings() -> None:
+    content = "".join(SECTION.format(i=i) for i in range(20))
+
+    parts = split_page(content, max_bytes=4096)
+
+    assert len(parts) > 1
+    # every part starts at a section heading, which Telegraph renders as h4
+    assert all(part[0]["tag"] == "h4" for part in parts)
+    assert sum(len(part) for part in parts) == len(split_page(content, max_bytes=10**6)[0])
+
+
+def test_publish_markdown_short_page(client: MagicMock) -> None:
+    assert publish_markdown("Short", "# Short\n\nHello") == "https://telegra.ph/Short"
+    client.edit_page.assert_not_called()
+
+
+def test_publish_markdown_long_page_returns_index(client: MagicMock, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(telegraph, "MAX_CONTENT_BYTES", 4096)
+    content = "".join(SECTION.format(i=i) for i in range(20))
+
+    url = publish_markdown("Report", content)
+
+    assert url == "https://telegra.ph/Report"
+    titles = [call.args[0] for call in client.create_page.call_args_list]
+    parts = [title for title in titles if title != "Report"]
+    assert len(parts) > 1 and f"Report (1/{len(parts)})" in parts
+    # every part links back to the index
+    for call in client.edit_page.call_args_list:
+        navigation = call.args[1][-1]
+        assert {"tag": "a", "attrs": {"href": url}, "children": ["Contents"]} in navigation["children"]
+
+
+def test_publish_markdown_many_keeps_order(client: MagicMock) -> None:
+    urls = publish_markdown_many([(f"Page {i}", f"page {i}") for i in range(6)])
+
+    assert urls == [f"https://telegra.ph/Page-{i}" for i in range(6)]
@@ -0,0 +1,136 @@
+import json
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from agentize.tools import tripplus
+from agentize.tools.tripplus import AwardQuery
+from agentize.tools.tripplus import get_award_cache
+from agentize.tools.tripplus import search_awards
+from agentize.tools.tripplus import search_awards_ranked
+
+
+def item(program: str, miles: int, ori: str = "TPE", dst: str = "NRT") -> dict[str, Any]:
+    return {
+        "origin": ori,
+        "destination": dst,
+        "type": "ow",
+        "cabin": "c",
+        "bookmark_id": None,
+        "bookmarked": False,
+        "route_stop_desc": [],
+        "tags": [{"type": "info", "text": "long description " * 20}],
+        "resources": {"type": "none", "items": []},
+        "miles": miles,
+        "miles_desc": f"{miles:,}",
+        "program_code": program,
+        "program_name": f"{program} Miles",
+        "program_link": None,
+        "program_link_desc": None,
+        "program_tel": None,
+        "program_email": None,
+        "program_expiration_desc": None,
+        "operating_program_code": program,
+        "operating_program_name": f"{program} Miles",
+        "level": "saver",
+        "systems": [],
+        "routes": [
+            {
+                "miles_desc": f"{miles:,}",
+                "origin": ori,
+                "stop": None,
+                "destination": dst,
+                "operating_program_code": program,
+                "operating_program_name": f"{program} Miles",
+            }
+        ],
+    }
+
+
+class FakeTripPlus:
+    def __init__(self) -> None:
+        self.requests: list[AwardQuery] = []
+        self.running = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, query: AwardQuery) -> dict[str, Any]:
+        with self.lock:
+            self.requests.append(query)
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.05)
+        with self.lock:
+            self.running -= 1
+        if query.dst == "XXX":
+            raise RuntimeError("blocked")
+        items = [item(program, miles, query.ori, query.dst) for program in "ABC" for miles in (30000, 20000, 25000)]
+        return {"meta": {"count": len(items), "referral_products": []}, "items": items}
+
+
+@pytest.fixture
+def fake() -> Iterator[FakeTripPlus]:
+    fake = FakeTripPlus()
+    get_award_cache.cache_clear()
+    with patch.object(tripplus, "_request_award", fake):
+        yield fake
+    get_award_cache.cache_clear()
+
+
+def queries(*destinations: str) -> list[AwardQuery]:
+    return [AwardQuery(ori="TPE", dst=dst, cabin="c", type="ow") for dst in destinations]
+
+
+@pytest.mark.asyncio
+async def test_search_awards_ranks_best_per_program(fake: FakeTripPlus) -> None:
+    (result,) = await search_awards_ranked(queries("NRT"), per_program=2, max_chars=10_000)
+
+    assert [(option["program"], option["miles"]) for option in result["options"]] == [
+        ("A Miles", 20000),
+        ("B Miles", 20000),
+        ("C Miles", 20000),
+        ("A Miles", 25000),
+        ("B Miles", 25000),
+        ("C Miles", 25000),
+    ]
+    assert result["omitted"] == 0
+    assert result["options"][0]["route"] == "TPE-NRT"
+
+
+@pytest.mark.asyncio
+async def test_search_awards_concurrent_cached_and_capped(fake: FakeTripPlus) -> None:
+    routes = queries("NRT", "KIX", "HND", "OKA", "CTS", "FUK", "nrt", "XXX")
+
+    results = await search_awards_ranked(routes)
+    await search_awards_ranked(queries("nrt", "KIX"))
+
+    assert len(results) == 7
+    assert results[-1]["error"]
+    assert len(fake.requests) == 7
+    assert fake.peak == 4
+
+
+@pytest.mark.asyncio
+async def test_search_awards_tool_fits_budget(fake: FakeTripPlus) -> None:
+    output = await search_awards.on_invoke_tool(
+        MagicMock(), json.dumps({"queries": [query.model_dump() for query in queries("NRT", "KIX", "HND")]})
+    )
+
+    assert len(output) <= 4000
+    results = json.loads(output)
+    # every route gets its cheapest options before any route gets more
+    assert all(result["options"][0]["miles"] == 20000 for result in results)
+
+
+@pytest.mark.asyncio
+async def test_search_awards_budget_reports_omitted(fake: FakeTripPlus) -> None:
+    results = await search_awards_ranked(queries("NRT", "KIX"), max_chars=400)
+
+    assert len(json.dumps(results, separators=(",", ":"))) <= 400
+    assert all(result["omitted"] == 6 - len(result["options"]) for result in results)
+    assert sum(result["omitted"] for result in results) > 0
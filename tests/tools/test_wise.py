@@ -0,0 +1,92 @@
+import json
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from wisest.rate import Rate
+from wisest.rate import Resolution
+from wisest.rate import Unit
+
+from agentize.tools.wise import DAY
+from agentize.tools.wise import UNIT_SECONDS
+from agentize.tools.wise import RateHistoryStore
+from agentize.tools.wise import query_rate_history
+
+
+class FakeWise:
+    """Answers rate history requests with one point a day, the rate being the day number."""
+
+    def __init__(self) -> None:
+        self.requests: list[tuple[int, Unit]] = []
+
+    async def __call__(self, source: str, target: str, length: int, resolution: Resolution, unit: Unit) -> list[Rate]:
+        self.requests.append((length, unit))
+        today = int(time.time() // DAY)
+        days = length * UNIT_SECONDS[unit] // DAY
+        return [
+            Rate(source=source, target=target, value=float(day), time=datetime.fromtimestamp(day * DAY))
+            for day in range(today - days + 1, today + 1)
+        ]
+
+
+@pytest.mark.asyncio
+async def test_repeated_and_narrower_queries_are_local() -> None:
+    wise = FakeWise()
+    store = RateHistoryStore(fetch=wise)
+
+    first = await store.query("eur", "usd", 30, Resolution.DAILY, Unit.DAY)
+    second = await store.query("EUR", "USD", 30, Resolution.DAILY, Unit.DAY)
+    narrower = await store.query("EUR", "USD", 7, Resolution.DAILY, Unit.DAY)
+
+    assert first == second
+    assert narrower == first[-len(narrower) :] and 6 <= len(narrower) <= 7
+    assert wise.requests == [(30, Unit.DAY)]
+    assert store.stats.local == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_series_fetches_only_the_tail() -> None:
+    wise = FakeWise()
+    store = RateHistoryStore(max_age=60, fetch=wise)
+    first = await store.query("EUR", "USD", 30, Resolution.DAILY, Unit.DAY)
+
+    series = store.series[("EUR", "USD", Resolution.DAILY)]
+    series.fetched_at -= 120
+    # pretend the last two days are missing
+    del series.times[-2:]
+    del series.values[-2:]
+
+    rates = await store.query("EUR", "USD", 30, Resolution.DAILY, Unit.DAY)
+
+    assert rates == first
+    assert wise.requests[-1][1] == Unit.DAY and wise.requests[-1][0] <= 3
+    assert store.stats.tail_fetches == 1
+
+
+@pytest.mark.asyncio
+async def test_wider_window_fetches_again() -> None:
+    wise = FakeWise()
+    store = RateHistoryStore(fetch=wise)
+
+    await store.query("EUR", "USD", 7, Resolution.DAILY, Unit.DAY)
+    rates = await store.query("EUR", "USD", 1, Resolution.DAILY, Unit.MONTH)
+
+    assert wise.requests == [(7, Unit.DAY), (1, Unit.MONTH)]
+    assert len(rates) == 31
+    assert len(store.series) == 1
+
+
+@pytest.mark.asyncio
+async def test_truncated_history_keeps_the_latest_rates() -> None:
+    store = RateHistoryStore(fetch=FakeWise())
+    arguments = {"source": "EUR", "target": "USD", "length": 5, "resolution": "daily", "unit": "year"}
+
+    with patch("agentize.tools.wise.get_rate_history_store", return_value=store):
+        output = await query_rate_history.on_invoke_tool(MagicMock(), json.dumps(arguments))
+
+    today = int(time.time() // DAY)
+    lines = output.splitlines()
+    assert "[truncated:" in output
+    assert lines[1] == f"{datetime.fromtimestamp(today * DAY):%Y-%m-%d %H:%M} {today}"